@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Headless batch runner for the SAT and resolution solvers.
+
+Runs every KB matched by the given paths with every selected strategy and
+writes one JSON object per run (JSON Lines). The Prolog engine is loaded
+once per invocation and reused for all instances. A run that exhausts one
+of its limits is recorded with status "unknown", the limit as "reason" and
+the engine's progress, including a DP run's best partial assignment.
+
+    python batch.py sat/kbs --solver dp --timeout 10
+    python batch.py 'resolution/kbs/*.pl' --solver resolution -s ordered -o out.jsonl
+    python batch.py resolution/kbs --solver resolution --max-clauses 5000 --inferences 100000000
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from engines import ENGINES, Limits, is_memory_error, is_timeout
+
+
+SOLVERS = {
+    'dp': {'extensions': (".pl", ".cnf")},
+    'resolution': {'extensions': (".pl",)},
+}
+
+
+def load_solver(solver):
+    ENGINES[solver]().load()
+
+
+def available_strategies(solver):
+    return ENGINES[solver]().strategies()
+
+
+def collect_files(paths, extensions):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = [
+                os.path.join(path, fname) for fname in os.listdir(path)
+                if fname.endswith(extensions)
+            ]
+        else:
+            matches = glob.glob(path)
+        files.extend(sorted(m for m in matches if m.endswith(extensions)))
+    return files
+
+
+def run_instance(solver, file_path, strategy, timeout, preprocess=False, memory_mb=None, threads=1,
+                 inferences=None, max_clauses=None):
+    record = {'file': file_path, 'solver': solver, 'strategy': strategy}
+    limits = Limits(timeout=timeout, memory_mb=memory_mb, inferences=inferences, max_clauses=max_clauses)
+
+    start = time.perf_counter()
+    try:
+        answer = ENGINES[solver]().solve_file(
+            os.path.abspath(file_path), strategy, preprocess=preprocess, limits=limits, threads=threads
+        )
+    except Exception as e:
+        record['time'] = time.perf_counter() - start
+        if is_timeout(e):
+            record['status'] = 'timeout'
+        elif is_memory_error(e):
+            record['status'] = 'memory'
+        else:
+            record['status'] = 'error'
+            record['error'] = str(e)
+        return record
+    record['time'] = time.perf_counter() - start
+
+    if solver == 'dp':
+        record['status'] = answer.status
+        record['model'] = answer.model
+        record['steps'] = answer.steps
+        record['propagations'] = answer.propagations
+        if answer.engine is not None:
+            record['engine'] = answer.engine
+    else:
+        record['status'] = answer.result
+        record['steps'] = answer.generated
+    if answer.reason is not None:
+        record['reason'] = answer.reason
+        record['progress'] = answer.progress
+    if preprocess:
+        record['preprocess'] = answer.preprocess
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the solvers on a batch of knowledge bases.")
+    parser.add_argument('paths', nargs='+', help="KB files, directories or glob patterns")
+    parser.add_argument('--solver', choices=sorted(SOLVERS), default='dp')
+    parser.add_argument(
+        '-s', '--strategy', action='append', dest='strategies',
+        help="strategy to run (repeatable, default: all available)"
+    )
+    parser.add_argument('-t', '--timeout', type=float, default=None, help="per-instance time limit in seconds")
+    parser.add_argument('-o', '--output', default=None, help="JSON Lines output file (default: stdout)")
+    parser.add_argument('--preprocess', action='store_true', help="simplify each KB before solving")
+    parser.add_argument('-m', '--memory-mb', type=int, default=None, help="per-instance Prolog stack limit in MB")
+    parser.add_argument('--inferences', type=int, default=None, help="per-instance Prolog inference limit")
+    parser.add_argument(
+        '--max-clauses', type=int, default=None, help="per-instance limit on clauses kept by resolution"
+    )
+    parser.add_argument(
+        '-j', '--threads', type=int, default=1, help="worker threads per instance (resolvents or DP cubes)"
+    )
+    args = parser.parse_args(argv)
+
+    load_solver(args.solver)
+    strategies = args.strategies or available_strategies(args.solver)
+    files = collect_files(args.paths, SOLVERS[args.solver]['extensions'])
+    if not files:
+        parser.error("no knowledge base files matched")
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for file_path in files:
+            for strategy in strategies:
+                record = run_instance(
+                    args.solver, file_path, strategy, args.timeout, args.preprocess, args.memory_mb, args.threads,
+                    args.inferences, args.max_clauses
+                )
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
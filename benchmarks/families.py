@@ -0,0 +1,130 @@
+"""Seeded instance generators for the benchmark harness.
+
+DP families are written as DIMACS files (read by sat/dimacs.pl), resolution
+families as clause-list KBs with a `% Question` section, like the files in
+resolution/kbs.
+"""
+import os
+import random
+
+
+def random_ksat(n, seed, k=3, ratio=4.26):
+    """Uniform random k-SAT near the satisfiability phase transition"""
+    rng = random.Random(seed)
+    clauses = []
+    for _ in range(round(n * ratio)):
+        variables = rng.sample(range(1, n + 1), k)
+        clauses.append([v if rng.random() < 0.5 else -v for v in variables])
+    return n, clauses
+
+
+def pigeonhole(n, seed=None):
+    """n + 1 pigeons in n holes; always unsatisfiable"""
+    def var(pigeon, hole):
+        return pigeon * n + hole + 1
+
+    clauses = [[var(p, h) for h in range(n)] for p in range(n + 1)]
+    for h in range(n):
+        for p in range(n + 1):
+            for q in range(p + 1, n + 1):
+                clauses.append([-var(p, h), -var(q, h)])
+    return (n + 1) * n, clauses
+
+
+def xor_chain(variables, parity, next_var, clauses):
+    """Encode XOR(variables) = parity with fresh chaining variables"""
+    acc = variables[0]
+    for x in variables[1:]:
+        t = next_var
+        next_var += 1
+        # t <-> acc xor x
+        clauses.extend([[-t, acc, x], [-t, -acc, -x], [t, -acc, x], [t, acc, -x]])
+        acc = t
+    clauses.append([acc] if parity else [-acc])
+    return next_var
+
+
+def parity(n, seed):
+    """Two XOR chains over the same n variables with opposite parity"""
+    rng = random.Random(seed)
+    variables = list(range(1, n + 1))
+    shuffled = variables[:]
+    rng.shuffle(shuffled)
+    clauses = []
+    next_var = xor_chain(variables, 1, n + 1, clauses)
+    next_var = xor_chain(shuffled, 0, next_var, clauses)
+    return next_var - 1, clauses
+
+
+def write_dimacs(path, nvars, clauses):
+    with open(path, 'w') as f:
+        f.write(f"p cnf {nvars} {len(clauses)}\n")
+        for clause in clauses:
+            f.write(" ".join(map(str, clause)) + " 0\n")
+
+
+def implication_chain(n, seed=None):
+    """p0(a), p(i-1)(X) -> p(i)(X); question p(n)(a)"""
+    axioms = ["[p0(a)]."]
+    axioms += [f"[neg(p{i - 1}(X)), p{i}(X)]." for i in range(1, n + 1)]
+    return axioms, [f"[neg(p{n}(a))]."]
+
+
+def numeral(n):
+    return "zero" if n == 0 else f"succ({numeral(n - 1)})"
+
+
+def peano_plus(n, seed=None):
+    """Prove that plus(n, n, Z) holds for some Z"""
+    axioms = [
+        "[plus(zero, X, X)].",
+        "[neg(plus(X, Y, Z)), plus(succ(X), Y, succ(Z))].",
+    ]
+    return axioms, [f"[neg(plus({numeral(n)}, {numeral(n)}, _))]."]
+
+
+def transitive_order(n, seed):
+    """A shuffled chain of lt/2 facts and transitivity; question lt(c0, cn)"""
+    rng = random.Random(seed)
+    facts = [f"[lt(c{i}, c{i + 1})]." for i in range(n)]
+    rng.shuffle(facts)
+    axioms = facts + ["[neg(lt(X, Y)), neg(lt(Y, Z)), lt(X, Z)]."]
+    return axioms, [f"[neg(lt(c0, c{n}))]."]
+
+
+def write_resolution_kb(path, axioms, question):
+    with open(path, 'w') as f:
+        f.write("\n".join(axioms) + "\n\n% Question\n" + "\n".join(question) + "\n")
+
+
+DP_FAMILIES = {
+    'random_3sat': (random_ksat, [20, 40, 60]),
+    'pigeonhole': (pigeonhole, [4, 5, 6]),
+    'parity': (parity, [8, 12, 16]),
+}
+
+RESOLUTION_FAMILIES = {
+    'implication_chain': (implication_chain, [10, 50, 100]),
+    'peano_plus': (peano_plus, [5, 10, 20]),
+    'transitive_order': (transitive_order, [3, 4, 5]),
+}
+
+
+def generate(directory, seed):
+    """Write every family at every size; returns (family, size, solver, path) rows"""
+    os.makedirs(directory, exist_ok=True)
+    instances = []
+
+    for family, (generator, sizes) in DP_FAMILIES.items():
+        for size in sizes:
+            path = os.path.join(directory, f"{family}_{size}.cnf")
+            write_dimacs(path, *generator(size, seed))
+            instances.append((family, size, 'dp', path))
+
+    for family, (generator, sizes) in RESOLUTION_FAMILIES.items():
+        for size in sizes:
+            path = os.path.join(directory, f"{family}_{size}.pl")
+            write_resolution_kb(path, *generator(size, seed))
+            instances.append((family, size, 'resolution', path))
+
+    return instances
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Benchmark harness: generate seeded instance families, run every strategy
+on them and record time, steps and peak memory to CSV.
+
+Each run happens in a fresh process so that the peak RSS belongs to that
+run alone and a run that exceeds the timeout can simply be killed. With
+--baseline, times are compared against an earlier CSV and the exit status
+is non-zero when any run got slower than the threshold allows.
+
+    python benchmarks/run.py -o bench.csv
+    python benchmarks/run.py -o new.csv --baseline bench.csv --threshold 1.25
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import families
+
+
+FIELDS = ['family', 'size', 'seed', 'solver', 'strategy', 'status', 'time', 'steps', 'peak_rss_kb']
+
+# Runs faster than this are too noisy to flag as regressions
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def measure(solver, path, strategy, conn):
+    import batch
+
+    batch.load_solver(solver)
+    record = batch.run_instance(solver, path, strategy, None)
+    # ru_maxrss is in kilobytes on Linux
+    record['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    conn.send(record)
+    conn.close()
+
+
+def strategies_for(solver):
+    context = multiprocessing.get_context("spawn")
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=list_strategies, args=(solver, child))
+    process.start()
+    strategies = parent.recv()
+    process.join()
+    return strategies
+
+
+def list_strategies(solver, conn):
+    import batch
+
+    batch.load_solver(solver)
+    conn.send(batch.available_strategies(solver))
+    conn.close()
+
+
+def run_one(solver, path, strategy, timeout):
+    context = multiprocessing.get_context("spawn")
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=measure, args=(solver, path, strategy, child))
+    process.start()
+    child.close()
+
+    if parent.poll(timeout):
+        record = parent.recv()
+        process.join()
+        return record
+
+    process.terminate()
+    process.join()
+    return {'status': 'timeout', 'time': timeout}
+
+
+def run_suite(instances, seed, timeout, solvers):
+    strategies = {solver: strategies_for(solver) for solver in solvers}
+    rows = []
+    for family, size, solver, path in instances:
+        if solver not in solvers:
+            continue
+        for strategy in strategies[solver]:
+            record = run_one(solver, path, strategy, timeout)
+            row = {
+                'family': family,
+                'size': size,
+                'seed': seed,
+                'solver': solver,
+                'strategy': strategy,
+                'status': record['status'],
+                'time': f"{record['time']:.4f}",
+                'steps': record.get('steps', ''),
+                'peak_rss_kb': record.get('peak_rss_kb', ''),
+            }
+            print(",".join(str(row[f]) for f in FIELDS), flush=True)
+            rows.append(row)
+    return rows
+
+
+def row_key(row):
+    return (row['family'], str(row['size']), row['solver'], row['strategy'])
+
+
+def find_regressions(rows, baseline_path, threshold):
+    with open(baseline_path, newline='') as f:
+        baseline = {row_key(row): row for row in csv.DictReader(f)}
+
+    regressions = []
+    for row in rows:
+        old = baseline.get(row_key(row))
+        if old is None:
+            continue
+        if old['status'] != 'timeout' and row['status'] == 'timeout':
+            regressions.append((row, old))
+            continue
+        if row['status'] == 'timeout' or old['status'] == 'timeout':
+            continue
+        new_time, old_time = float(row['time']), float(old['time'])
+        if new_time > old_time * threshold and new_time - old_time > MIN_REGRESSION_SECONDS:
+            regressions.append((row, old))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the DP and resolution solvers.")
+    parser.add_argument('-o', '--output', default="benchmark.csv", help="CSV file to write")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-t', '--timeout', type=float, default=60.0, help="per-run time limit in seconds")
+    parser.add_argument('--solver', choices=['dp', 'resolution'], action='append', dest='solvers')
+    parser.add_argument('--instances', default=None, help="directory for generated instances (default: temporary)")
+    parser.add_argument('--baseline', default=None, help="earlier CSV to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25, help="allowed slowdown factor against the baseline")
+    args = parser.parse_args(argv)
+
+    solvers = args.solvers or ['dp', 'resolution']
+    with tempfile.TemporaryDirectory() as tmp:
+        instances = families.generate(args.instances or tmp, args.seed)
+        print(",".join(FIELDS), flush=True)
+        rows = run_suite(instances, args.seed, args.timeout, solvers)
+
+    with open(args.output, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    if args.baseline:
+        regressions = find_regressions(rows, args.baseline, args.threshold)
+        for row, old in regressions:
+            print(
+                f"REGRESSION {row['family']} {row['size']} {row['solver']}/{row['strategy']}: "
+                f"{old['time']}s ({old['status']}) -> {row['time']}s ({row['status']})",
+                file=sys.stderr
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
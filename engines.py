@@ -0,0 +1,253 @@
+"""Typed facade over the Prolog solvers, used by both GUIs and batch.py.
+
+Every goal below is a fixed string: file paths, strategies, clauses and
+limits are passed as janus bindings, never spliced into Prolog source.
+Answers come back as Prolog dicts, so a DP model arrives as a Python dict
+from atom name to bool.
+
+Limits are enforced inside the engines (see sat/budget.pl). A run that
+exhausts one is not an error: its answer has status 'unknown', the name of
+the limit as reason and the progress made so far, and a DP answer's model
+is then the longest partial assignment the search reached.
+
+    engine = DPEngine()
+    engine.load()
+    answer = engine.solve_file("sat/kbs/test_i.pl", "cdcl", preprocess=True)
+    answer.satisfiable, answer.model
+
+    answer = engine.solve_file("sat/kbs/test_i.pl", "vsids", limits=Limits(timeout=5, inferences=10**7))
+    answer.status, answer.reason, answer.model
+
+    encoded = engine.encode([["a", "b"], ["neg(a)"]])
+    engine.solve_encoded(encoded, "vsids")
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from janus_swi import query_once, consult
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DP_FILE = os.path.join(ROOT, "sat", "dp_sat.pl")
+RESOLUTION_FILE = os.path.join(ROOT, "resolution", "resolution.pl")
+
+# Literals use the KB syntax: "a" or "neg(a)"
+Clause = Sequence[str]
+
+
+class EngineError(RuntimeError):
+    pass
+
+
+@dataclass
+class Limits:
+    timeout: Optional[float] = None
+    memory_mb: Optional[int] = None
+    inferences: Optional[int] = None
+    max_clauses: Optional[int] = None
+
+    def budget(self) -> Dict[str, Any]:
+        """The budget dict read by budget_options/2; unset limits are left out"""
+        budget: Dict[str, Any] = {}
+        if self.timeout:
+            budget['time'] = float(self.timeout)
+        if self.inferences:
+            budget['inferences'] = int(self.inferences)
+        if self.memory_mb:
+            budget['stack'] = int(self.memory_mb) * 1024 * 1024
+        if self.max_clauses:
+            budget['clauses'] = int(self.max_clauses)
+        return budget
+
+
+@dataclass
+class EncodedKB:
+    """Integer clauses as produced by read_encoded_kb/4; names[i - 1] is variable i"""
+    clauses: List[List[int]]
+    nvars: int
+    names: List[str]
+
+
+@dataclass
+class SatAnswer:
+    satisfiable: bool
+    model: Dict[str, bool]
+    steps: int
+    propagations: int
+    stats: Dict[str, Any] = field(default_factory=dict)
+    reason: Optional[str] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def status(self) -> str:
+        if self.reason is not None:
+            return 'unknown'
+        return 'sat' if self.satisfiable else 'unsat'
+
+    @property
+    def result_type(self) -> str:
+        return self.status.upper()
+
+    @property
+    def engine(self) -> Optional[str]:
+        """Engine run in place of the strategy's own, e.g. 'trail' for a large KB"""
+        return self.stats.get('large_instance')
+
+    @property
+    def preprocess(self) -> List[str]:
+        return self.stats.get('preprocess', "").splitlines()
+
+    def model_text(self) -> str:
+        return model_text(self.model)
+
+
+@dataclass
+class ResolutionAnswer:
+    result: str
+    generated: int
+    stats: Dict[str, Any] = field(default_factory=dict)
+    reason: Optional[str] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def preprocess(self) -> List[str]:
+        return self.stats.get('preprocess', "").splitlines()
+
+
+def parse_literal(lit: str) -> Tuple[str, bool]:
+    """Split a KB-syntax literal into its atom name and sign"""
+    lit = lit.strip()
+    negative = lit.startswith("neg(") and lit.endswith(")")
+    return (lit[4:-1].strip() if negative else lit), not negative
+
+
+def model_text(model: Dict[str, bool]) -> str:
+    """Display form of a model, as format_model/2 writes it"""
+    return ", ".join(f"{atom}/{'true' if value else 'false'}" for atom, value in model.items())
+
+
+def budget(limits: Optional[Limits]) -> Dict[str, Any]:
+    return {} if limits is None else limits.budget()
+
+
+def run_goal(goal: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    result = query_once(goal, inputs)
+    if not result['truth']:
+        raise EngineError("Query failed")
+    return result
+
+
+def is_timeout(error: Exception) -> bool:
+    return 'time_limit_exceeded' in str(error)
+
+
+def is_memory_error(error: Exception) -> bool:
+    return 'resource_error' in str(error) or 'stack_overflow' in str(error)
+
+
+class Engine:
+    prolog_file = None
+    strategy_goal = None
+    canonical_goal = None
+
+    def load(self) -> None:
+        consult(self.prolog_file)
+        query_once("use_module(library(time))")
+
+    def strategies(self) -> List[str]:
+        return list(run_goal(self.strategy_goal, {})['Strategies'])
+
+    def canonical_kb(self, path: str) -> str:
+        """Canonical KB text, the result cache key"""
+        return run_goal(self.canonical_goal, {'File': path})['Canonical']
+
+
+class DPEngine(Engine):
+    prolog_file = DP_FILE
+    strategy_goal = "findall(S, dp_strategy(S), Strategies)"
+    canonical_goal = "atom_string(FileName, File), canonical_kb(FileName, Canonical)"
+
+    def solve_file(self, path: str, strategy: str, preprocess: bool = False, profile: bool = False,
+                   limits: Optional[Limits] = None, threads: int = 1) -> SatAnswer:
+        """threads > 1 solves list-based strategies by cube and conquer on that many threads"""
+        result = run_goal(
+            "dp_answer_file(File, Strategy, Preprocess, Profile, Threads, Budget, Answer)",
+            {
+                'File': path, 'Strategy': strategy, 'Preprocess': preprocess, 'Profile': profile,
+                'Threads': threads, 'Budget': budget(limits),
+            }
+        )
+        return sat_answer(result['Answer'])
+
+    def read_encoded(self, path: str) -> EncodedKB:
+        """Parse and encode a KB file once, e.g. to ship it to worker processes"""
+        result = run_goal(
+            "atom_string(FileName, File), read_encoded_kb(FileName, Clauses, NVars, Names)", {'File': path}
+        )
+        return EncodedKB(list(result['Clauses']), result['NVars'], list(result['Names']))
+
+    def encode(self, clauses: Sequence[Clause]) -> EncodedKB:
+        """Intern KB-syntax literals to integers in order of first occurrence"""
+        table: Dict[str, int] = {}
+        encoded = []
+        for clause in clauses:
+            ints = set()
+            for lit in clause:
+                atom, positive = parse_literal(lit)
+                var = table.setdefault(atom, len(table) + 1)
+                ints.add(var if positive else -var)
+            encoded.append(sorted(ints))
+        return EncodedKB(encoded, len(table), list(table))
+
+    def solve_encoded(self, kb: EncodedKB, strategy: str, preprocess: bool = False, profile: bool = False,
+                      limits: Optional[Limits] = None, threads: int = 1) -> SatAnswer:
+        result = run_goal(
+            "dp_answer_encoded(Clauses, NVars, Names, Strategy, Preprocess, Profile, Threads, Budget, Answer)",
+            {
+                'Clauses': kb.clauses, 'NVars': kb.nvars, 'Names': kb.names,
+                'Strategy': strategy, 'Preprocess': preprocess, 'Profile': profile, 'Threads': threads,
+                'Budget': budget(limits),
+            }
+        )
+        return sat_answer(result['Answer'])
+
+    def solve_clauses(self, clauses: Sequence[Clause], strategy: str, **options) -> SatAnswer:
+        return self.solve_encoded(self.encode(clauses), strategy, **options)
+
+
+class ResolutionEngine(Engine):
+    prolog_file = RESOLUTION_FILE
+    strategy_goal = "findall(S, resolution_strategy(S), Strategies)"
+    canonical_goal = "atom_string(FileName, File), canonical_kb(FileName, Canonical)"
+
+    def solve_file(self, path: str, strategy: str, preprocess: bool = False, profile: bool = False,
+                   limits: Optional[Limits] = None, threads: int = 1) -> ResolutionAnswer:
+        """threads > 1 generates the resolvents of each given clause on that many threads"""
+        result = run_goal(
+            "resolution_answer_file(File, Strategy, Preprocess, Profile, Threads, Budget, Answer)",
+            {
+                'File': path, 'Strategy': strategy, 'Preprocess': preprocess, 'Profile': profile,
+                'Threads': threads, 'Budget': budget(limits),
+            }
+        )
+        answer = result['Answer']
+        return ResolutionAnswer(
+            answer['result'], answer['generated'], dict(answer['stats']),
+            answer.get('reason'), dict(answer.get('progress', {}))
+        )
+
+
+def sat_answer(answer: Dict[str, Any]) -> SatAnswer:
+    return SatAnswer(
+        satisfiable=answer['satisfiable'],
+        model=dict(answer['model']),
+        steps=answer['steps'],
+        propagations=answer['propagations'],
+        stats=dict(answer['stats']),
+        reason=answer.get('reason'),
+        progress=dict(answer.get('progress', {})),
+    )
+
+
+ENGINES = {'dp': DPEngine, 'resolution': ResolutionEngine}
@@ -1,14 +1,37 @@
 #!/usr/bin/env python3
+import argparse
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import sys
 import os
+import time
+import queue
+import threading
+import uuid
 from io import StringIO
-from janus_swi import query_once, consult
+from janus_swi import query_once
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engines import EngineError, Limits, ResolutionAnswer, ResolutionEngine
+from result_cache import ResultCache, cache_key
+from solver_client import SolverClient, strategy_request_id
+
+
+# Progress counters maintained by resolution.pl while a worker runs
+PROGRESS_COUNTERS = ["given", "clauses"]
+POLL_INTERVAL_MS = 100
+
+# Result cache entries for this solver
+SOLVER_NAME = 'resolution'
+CACHED_FIELDS = ['result', 'generated', 'stats']
+
+
+def is_cancellation(error):
+    return 'cancelled' in str(error)
 
 
 class ResolutionGUI:
-    def __init__(self, root):
+    def __init__(self, root, server=None):
         self.root = root
         self.root.title("Resolution Algorithm")
         width = 900
@@ -23,9 +46,26 @@ class ResolutionGUI:
         
         self.file_path = tk.StringVar()
         self.prolog_loaded = False
+        self.strategies = []
+        
+        self.worker = None
+        self.worker_id = None
+        self.request_id = None
+        self.remote_requests = []
+        self.final_status = "Ready"
+        self.messages = queue.Queue()
+        self.cache = ResultCache()
+        self.engine = ResolutionEngine()
+        self.cancel_event = threading.Event()
+        # With a server URL the GUI is a thin client of solver_server.py
+        self.client = SolverClient(server) if server else None
         
         self.create_widgets()
-        self.load_prolog_file()
+        if self.client is not None:
+            self.connect_server()
+        else:
+            self.load_prolog_file()
+        self.load_strategies()
     
     
     def create_widgets(self):
@@ -66,7 +106,7 @@ class ResolutionGUI:
         load_file_btn.grid(row=0, column=3, padx=5)
         
         # Problem selection frame
-        problem_frame = ttk.LabelFrame(main_frame, text="Select Problem", padding="10")
+        problem_frame = ttk.LabelFrame(main_frame, text="Select Problem and Strategy", padding="10")
         problem_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
         
         ttk.Label(problem_frame, text="Problem:").grid(row=0, column=0, sticky=tk.W)
@@ -89,24 +129,102 @@ class ResolutionGUI:
             state='readonly',
             width=40
         )
-        problem_combo.grid(row=0, column=1, padx=10)
+        problem_combo.grid(row=0, column=1, padx=10, pady=5)
         problem_combo.current(0)
         
+        ttk.Label(problem_frame, text="Strategy:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        
+        self.strategy_var = tk.StringVar()
+        self.strategy_combo = ttk.Combobox(
+            problem_frame, 
+            textvariable=self.strategy_var, 
+            values=self.strategies,
+            state='readonly',
+            width=40
+        )
+        self.strategy_combo.grid(row=1, column=1, padx=10, pady=5)
+        
+        self.profile_var = tk.BooleanVar(value=False)
+        profile_check = ttk.Checkbutton(
+            problem_frame, 
+            text="Run under the Prolog profiler", 
+            variable=self.profile_var
+        )
+        profile_check.grid(row=2, column=1, sticky=tk.W, padx=10, pady=5)
+        
+        self.preprocess_var = tk.BooleanVar(value=False)
+        preprocess_check = ttk.Checkbutton(
+            problem_frame, 
+            text="Preprocess the CNF before solving", 
+            variable=self.preprocess_var
+        )
+        preprocess_check.grid(row=3, column=1, sticky=tk.W, padx=10, pady=5)
+        
+        # Worker threads for resolvent generation; 1 keeps it sequential
+        ttk.Label(problem_frame, text="Threads:").grid(row=4, column=0, sticky=tk.W, pady=5)
+        self.threads_var = tk.IntVar(value=1)
+        threads_spin = ttk.Spinbox(
+            problem_frame, 
+            from_=1, 
+            to=os.cpu_count() or 1, 
+            textvariable=self.threads_var, 
+            width=5
+        )
+        threads_spin.grid(row=4, column=1, sticky=tk.W, padx=10, pady=5)
+        
+        # Run budgets; 0 means no limit. A run that exhausts one reports unknown
+        ttk.Label(problem_frame, text="Time limit (s):").grid(row=5, column=0, sticky=tk.W, pady=5)
+        self.timeout_var = tk.IntVar(value=0)
+        timeout_spin = ttk.Spinbox(
+            problem_frame, 
+            from_=0, 
+            to=3600, 
+            textvariable=self.timeout_var, 
+            width=8
+        )
+        timeout_spin.grid(row=5, column=1, sticky=tk.W, padx=10, pady=5)
+        
+        ttk.Label(problem_frame, text="Max clauses:").grid(row=6, column=0, sticky=tk.W, pady=5)
+        self.max_clauses_var = tk.IntVar(value=0)
+        max_clauses_entry = ttk.Entry(problem_frame, textvariable=self.max_clauses_var, width=14)
+        max_clauses_entry.grid(row=6, column=1, sticky=tk.W, padx=10, pady=5)
+        
         run_btn = ttk.Button(
             problem_frame, 
             text="Run Resolution", 
             command=self.run_resolution, 
             style='Accent.TButton'
         )
-        run_btn.grid(row=0, column=2, padx=10)
+        run_btn.grid(row=0, column=2, padx=10, rowspan=2)
         
-        # Configure accent button style
+        compare_btn = ttk.Button(
+            problem_frame, 
+            text="Compare Strategies", 
+            command=self.compare_strategies,
+            style='Compare.TButton'
+        )
+        compare_btn.grid(row=0, column=3, padx=10, rowspan=2)
+        
+        self.cancel_btn = ttk.Button(
+            problem_frame, 
+            text="Cancel", 
+            command=self.cancel_run,
+            state='disabled'
+        )
+        self.cancel_btn.grid(row=0, column=4, padx=10, rowspan=2)
+        
+        # Configure button styles
         style = ttk.Style()
         style.configure(
             'Accent.TButton', 
             foreground='blue', 
             font=('Arial', 10, 'bold')
         )
+        style.configure(
+            'Compare.TButton', 
+            foreground='green', 
+            font=('Arial', 10, 'bold')
+        )
         
         # Results frame
         results_frame = ttk.LabelFrame(main_frame, text="Results", padding="10")
@@ -132,16 +250,16 @@ class ResolutionGUI:
     
     
     def load_prolog_file(self):
-        prolog_file = "resolution.pl"
+        prolog_file = os.path.basename(self.engine.prolog_file)
         
-        if not os.path.exists(prolog_file):
-            self.log_result(f"Warning: {prolog_file} not found in current directory.\n")
-            self.log_result(f"Please make sure {prolog_file} is in the same directory as this script.\n")
+        if not os.path.exists(self.engine.prolog_file):
+            self.log_result(f"Warning: {self.engine.prolog_file} not found.\n")
+            self.log_result(f"Please make sure {prolog_file} is next to this script.\n")
             self.status_var.set("Prolog file not found")
             return
         
         try:
-            consult(prolog_file)
+            self.engine.load()
             
             self.prolog_loaded = True
             
@@ -155,6 +273,37 @@ class ResolutionGUI:
             messagebox.showerror("Error", f"Failed to load Prolog file:\n{str(e)}")
     
     
+    def connect_server(self):
+        try:
+            self.client.status()
+            self.prolog_loaded = True
+            self.log_result(f"Connected to solver server at {self.client.url}\n")
+            self.log_result("="*60 + "\n\n")
+            self.status_var.set("Connected to solver server")
+        except Exception as e:
+            self.log_result(f"Error connecting to solver server: {str(e)}\n")
+            self.status_var.set("Solver server unavailable")
+    
+    
+    def load_strategies(self):
+        if not self.prolog_loaded:
+            return
+        
+        try:
+            if self.client is not None:
+                self.strategies.extend(self.client.strategies(SOLVER_NAME))
+            else:
+                self.strategies.extend(self.engine.strategies())
+            
+            if self.strategies:
+                self.strategy_combo['values'] = self.strategies
+                self.strategy_combo.current(0)
+                self.log_result(f"Loaded strategies: {', '.join(self.strategies)}\n\n")
+            
+        except Exception as e:
+            self.log_result(f"Error loading strategies: {str(e)}\n")
+    
+    
     def browse_file(self):
         filename = filedialog.askopenfilename(
             title="Select Knowledge Base File",
@@ -181,25 +330,24 @@ class ResolutionGUI:
             messagebox.showerror("Error", "Prolog file not loaded!")
             return
         
-        try:
-            self.log_result(f"\n{'='*60}\n")
-            self.log_result(f"Loading KB from file: {file_path}\n")
-            self.log_result(f"{'='*60}\n\n")
-            
-            result = query_once(f"run_resolution_file('{file_path}', Result)")
-            
-            if result:
-                res_value = result.get('Result', 'unknown')
-                self.log_result(f"Resolution Result: {res_value}\n\n")
-                self.status_var.set(f"Completed - Result: {res_value}")
-            else:
-                self.log_result("Query failed or returned no results.\n\n")
-                self.status_var.set("Query failed")
+        strategy = self.strategy_var.get()
+        if not strategy:
+            messagebox.showwarning("Warning", "Please select a strategy!")
+            return
         
-        except Exception as e:
-            self.log_result(f"Error: {str(e)}\n\n")
-            self.status_var.set("Error occurred")
-            messagebox.showerror("Error", f"Error running resolution:\n{str(e)}")
+        if self.is_running():
+            messagebox.showwarning("Warning", "A solver run is already in progress!")
+            return
+        
+        self.log_result(f"\n{'='*60}\n")
+        self.log_result(f"Loading KB from file: {file_path}\n")
+        self.log_result(f"Strategy: {strategy}\n")
+        self.log_result(f"{'='*60}\n\n")
+        
+        self.run_in_background(
+            self.resolve_file, file_path, strategy, self.profile_var.get(), self.preprocess_var.get(),
+            1, self.current_limits()
+        )
     
     
     def run_resolution(self):
@@ -214,40 +362,352 @@ class ResolutionGUI:
             messagebox.showwarning("Warning", "Please select a problem!")
             return
         
+        strategy = self.strategy_var.get()
+        if not strategy:
+            messagebox.showwarning("Warning", "Please select a strategy!")
+            return
+        
+        if self.is_running():
+            messagebox.showwarning("Warning", "A solver run is already in progress!")
+            return
+        
         self.log_result(f"\n{'='*60}\n")
         self.log_result(f"Running: {problem_display}\n")
+        self.log_result(f"Strategy: {strategy}\n")
+        self.log_result(f"\n{'='*60}\n")
+        self.log_result(f"Loading KB from file: {problem_path}\n")
+        self.log_result(f"{'='*60}\n\n")
+        
+        self.run_in_background(
+            self.resolve_file, problem_path, strategy,
+            self.profile_var.get(), self.preprocess_var.get(), self.threads_var.get(), self.current_limits()
+        )
+    
+    
+    def current_limits(self):
+        return Limits(timeout=self.timeout_var.get() or None, max_clauses=self.max_clauses_var.get() or None)
+    
+    
+    def resolve_file(self, file_path, strategy, profile=False, preprocess=False, threads=1, limits=None):
+        """Worker task: run resolution on one KB file and log the result"""
+        if self.client is not None:
+            self.resolve_remote(file_path, strategy, preprocess, threads, limits or Limits())
+            return
+        
+        # Preprocessed and parallel runs are cached apart from plain ones;
+        # every thread count above 1 gives the same resolvents
+        cache_strategy = f"{strategy}+preprocess" if preprocess else strategy
+        if threads > 1:
+            cache_strategy += "+parallel"
+        key, cached = self.lookup_cache(file_path, cache_strategy)
+        from_cache = cached is not None and not profile
+        
+        if from_cache:
+            answer = ResolutionAnswer(**cached)
+        else:
+            answer = self.engine.solve_file(
+                file_path, strategy, preprocess=preprocess, profile=profile, limits=limits, threads=threads
+            )
+            # An unknown answer only says how far this budget got
+            if answer.reason is None:
+                self.store_result(key, cache_strategy, answer)
+        
+        cache_note = " (cached)" if from_cache else ""
+        self.log_answer(answer.result, answer.generated, answer.reason, answer.progress)
+        self.log_result(f"Source: {'cache' if from_cache else 'solver'}\n\n")
+        self.log_stats(answer.stats)
+        self.set_status(f"Completed - Result: {answer.result}{cache_note}")
+    
+    
+    def resolve_remote(self, file_path, strategy, preprocess, threads, limits):
+        """Worker task body in thin-client mode: the server runs resolution"""
+        self.remote_requests = [self.request_id]
+        record = self.client.run_cancellable(
+            lambda: self.client.solve(
+                SOLVER_NAME, strategy, path=file_path, preprocess=preprocess, threads=threads,
+                request_id=self.request_id, timeout=limits.timeout, max_clauses=limits.max_clauses
+            ),
+            self.remote_requests,
+            self.cancel_event
+        )
+        if record['status'] not in ('satisfiable', 'unsatisfiable', 'unknown'):
+            self.log_result(f"Query failed: {record.get('error', record['status'])}\n\n")
+            self.set_status(f"Query failed ({record['status']})")
+            return
+        
+        self.log_answer(record['status'], record['steps'], record.get('reason'), record.get('progress', {}))
+        self.log_result(f"Time: {record['time']:.4f}s\n")
+        self.log_result(f"Source: server\n")
+        if record.get('preprocess'):
+            self.log_result("\nPreprocessing:\n" + "\n".join(record['preprocess']) + "\n")
+        self.log_result("\n")
+        self.set_status(f"Completed - Result: {record['status']}")
+    
+    
+    def log_answer(self, result, generated, reason=None, progress=None):
+        if reason is None:
+            self.log_result(f"Resolution Result: {result}\n")
+        else:
+            self.log_result(f"Resolution Result: unknown ({reason} limit reached)\n")
+            if progress and 'clauses' in progress:
+                self.log_result(f"Clauses kept: {progress['clauses']}\n")
+        self.log_result(f"Clauses generated: {generated}\n")
+    
+    
+    def run_strategy(self, problem_path, strategy, threads=1, limits=None):
+        """Return (result, generated, reason) for one comparison run"""
+        if self.client is not None:
+            limits = limits or Limits()
+            request_id = strategy_request_id(self.request_id, strategy)
+            self.remote_requests = [request_id]
+            record = self.client.run_cancellable(
+                lambda: self.client.solve(
+                    SOLVER_NAME, strategy, path=problem_path, threads=threads,
+                    request_id=request_id, timeout=limits.timeout, max_clauses=limits.max_clauses
+                ),
+                self.remote_requests,
+                self.cancel_event
+            )
+            if record['status'] not in ('satisfiable', 'unsatisfiable', 'unknown'):
+                return None, None, None
+            return record['status'], record['steps'], record.get('reason')
         
         try:
-            self.log_result(f"\n{'='*60}\n")
-            self.log_result(f"Loading KB from file: {problem_path}\n")
-            self.log_result(f"{'='*60}\n\n")
-            
-            result = query_once(f"run_resolution_file('{problem_path}', Result)")
+            answer = self.engine.solve_file(problem_path, strategy, threads=threads, limits=limits)
+        except EngineError:
+            return None, None, None
+        return answer.result, answer.generated, answer.reason
+    
+    
+    def lookup_cache(self, file_path, strategy):
+        """Return the cache key for a KB file and strategy, and the cached result if any"""
+        key = cache_key(SOLVER_NAME, strategy, self.engine.canonical_kb(file_path))
+        cached = self.cache.get(key)
+        # Entries written before the engine facade use other field names
+        if cached is not None and set(cached) != set(CACHED_FIELDS):
+            cached = None
+        return key, cached
+    
+    
+    def store_result(self, key, strategy, answer):
+        payload = {name: getattr(answer, name) for name in CACHED_FIELDS}
+        # A profile report belongs to the run that produced it
+        payload['stats'] = {k: v for k, v in answer.stats.items() if k != 'profile'}
+        self.cache.put(key, SOLVER_NAME, strategy, payload)
+    
+    
+    def log_stats(self, stats):
+        stats = dict(stats)
+        report = stats.pop('profile', None)
+        passes = stats.pop('preprocess', None)
+        
+        self.log_result("Statistics:\n")
+        for name, value in stats.items():
+            if isinstance(value, float):
+                value = f"{value:.4f}"
+            self.log_result(f"  {name}: {value}\n")
+        
+        if passes:
+            self.log_result(f"\nPreprocessing:\n{passes}\n")
+        if report:
+            self.log_result(f"\nProfile:\n{report}\n")
+        self.log_result("\n")
+    
+    
+    def compare_strategies(self):
+        if not self.prolog_loaded:
+            messagebox.showerror("Error", "Prolog file not loaded!")
+            return
+        
+        problem_display = self.problem_var.get()
+        problem_path = self.problems.get(problem_display)
+        
+        if not problem_path:
+            messagebox.showwarning("Warning", "Please select a problem!")
+            return
+        
+        if len(self.strategies) < 2:
+            messagebox.showwarning("Warning", "Need at least 2 strategies to compare!")
+            return
+        
+        if self.is_running():
+            messagebox.showwarning("Warning", "A solver run is already in progress!")
+            return
+        
+        self.log_result(f"\n{'='*60}\n")
+        self.log_result(f"COMPARING STRATEGIES\n")
+        self.log_result(f"Problem: {problem_display}\n")
+        self.log_result(f"{'='*60}\n")
+        
+        self.run_in_background(
+            self.compare_task, problem_path, list(self.strategies), self.threads_var.get(), self.current_limits()
+        )
+    
+    
+    def compare_task(self, problem_path, strategies, threads=1, limits=None):
+        """Worker task: run every strategy on one problem and summarize"""
+        results = []
+        
+        for strategy in strategies:
+            self.log_result(f"\nStrategy: {strategy}\n")
+            self.log_result(f"{'-'*40}\n")
             
-            if result:
-                res_value = result.get('Result', 'unknown')
-                self.log_result(f"Resolution Result: {res_value}\n\n")
-                self.status_var.set(f"Completed - Result: {res_value}")
+            try:
+                start = time.perf_counter()
+                res_value, generated, reason = self.run_strategy(problem_path, strategy, threads, limits)
+                elapsed = time.perf_counter() - start
+                
+                if generated is not None:
+                    self.log_answer(res_value, generated, reason)
+                    self.log_result(f"Time: {elapsed:.4f}s\n")
+                    if reason is not None:
+                        res_value = f"{reason} limit reached"
+                    results.append((strategy, res_value, generated, elapsed))
+                else:
+                    self.log_result("Query failed\n")
+                    results.append((strategy, None, None, None))
+                    
+            except Exception as e:
+                if is_cancellation(e):
+                    raise
+                self.log_result(f"Query failed\n")
+                results.append((strategy, None, None, None))
+        
+        self.log_result(f"\n{'='*60}\n")
+        self.log_result(f"COMPARISON SUMMARY\n")
+        self.log_result(f"{'='*60}\n")
+        
+        for strategy, res_value, generated, elapsed in results:
+            if generated is not None:
+                self.log_result(f"{strategy}: {res_value}, {generated} clauses, {elapsed:.4f}s\n")
             else:
-                self.log_result("Query failed or returned no results.\n\n")
-                self.status_var.set("Query failed")
+                self.log_result(f"{strategy}: Failed\n")
+        
+        valid_results = [r for r in results if r[1] in ('satisfiable', 'unsatisfiable')]
+        if len(valid_results) >= 2:
+            fewest = min(valid_results, key=lambda r: r[2])
+            fastest = min(valid_results, key=lambda r: r[3])
+            
+            self.log_result(f"\nFewest clauses: {fewest[0]} ({fewest[2]} clauses)\n")
+            self.log_result(f"Fastest: {fastest[0]} ({fastest[3]:.4f}s)\n")
+            
+            answers = {r[1] for r in valid_results}
+            if len(answers) > 1:
+                self.log_result(f"Warning: strategies disagree on the result ({', '.join(sorted(answers))})\n")
         
+        self.log_result("\n")
+        self.set_status("Comparison completed")
+    
+    
+    def is_running(self):
+        return self.worker is not None
+    
+    
+    def run_in_background(self, task, *args):
+        """Run task(*args) on a worker thread so the window stays responsive"""
+        self.worker_id = None
+        # Requests sent to the server in thin-client mode carry this id
+        self.request_id = uuid.uuid4().hex
+        self.remote_requests = []
+        self.final_status = "Ready"
+        self.cancel_event.clear()
+        self.worker = threading.Thread(target=self.worker_main, args=(task, args), daemon=True)
+        self.cancel_btn.state(['!disabled'])
+        self.status_var.set("Running...")
+        self.worker.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+    
+    
+    def worker_main(self, task, args):
+        # janus gives every Python thread its own Prolog engine; the thread
+        # id is what progress_value/3 and progress_cancel/1 refer to.
+        try:
+            if self.client is None:
+                result = query_once("progress_enable(Names, Id)", {"Names": PROGRESS_COUNTERS})
+                self.worker_id = result['Id']
+            task(*args)
         except Exception as e:
-            self.log_result(f"Error: {str(e)}\n\n")
-            self.status_var.set("Error occurred")
-            messagebox.showerror("Error", f"Error running resolution:\n{str(e)}")
+            if is_cancellation(e):
+                self.log_result("Cancelled.\n\n")
+                self.set_status("Cancelled")
+            else:
+                self.log_result(f"Error: {str(e)}\n\n")
+                self.set_status("Error occurred")
+                self.messages.put(('error', str(e)))
+        finally:
+            self.messages.put(('done', None))
+    
+    
+    def poll_worker(self):
+        finished = False
+        while True:
+            try:
+                kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'log':
+                self.log_result(payload)
+            elif kind == 'status':
+                self.final_status = payload
+            elif kind == 'error':
+                messagebox.showerror("Error", f"Error running resolution:\n{payload}")
+            elif kind == 'done':
+                finished = True
+        
+        if finished:
+            self.worker = None
+            self.worker_id = None
+            self.cancel_btn.state(['disabled'])
+            self.status_var.set(self.final_status)
+            return
+        
+        if self.worker_id is not None:
+            try:
+                given = query_once("progress_value(Id, given, Value)", {"Id": self.worker_id})
+                kept = query_once("progress_value(Id, clauses, Value)", {"Id": self.worker_id})
+                self.status_var.set(f"Running... given clauses: {given['Value']}, clauses kept: {kept['Value']}")
+            except Exception:
+                pass
+        self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+    
+    
+    def cancel_run(self):
+        self.cancel_event.set()
+        if self.client is not None:
+            self.client.cancel_all(self.remote_requests)
+            self.status_var.set("Cancelling...")
+            return
+        if self.worker_id is None:
+            return
+        query_once("progress_cancel(Id)", {"Id": self.worker_id})
+        self.status_var.set("Cancelling...")
+    
+    
+    def set_status(self, message):
+        """Set the status bar, deferring to the main loop from a worker thread"""
+        if threading.current_thread() is not threading.main_thread():
+            self.messages.put(('status', message))
+        else:
+            self.status_var.set(message)
     
     
     def log_result(self, message):
         """Append message to result text area"""
+        if threading.current_thread() is not threading.main_thread():
+            self.messages.put(('log', message))
+            return
         self.result_text.insert(tk.END, message)
         self.result_text.see(tk.END)
         self.root.update_idletasks()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Resolution GUI.")
+    parser.add_argument('--server', default=None, help="solver_server.py URL to use instead of a local engine")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = ResolutionGUI(root)
+    app = ResolutionGUI(root, server=args.server)
     root.mainloop()
 
 
@@ -1,3 +1,8 @@
+:- ensure_loaded('../sat/progress').
+:- ensure_loaded('../sat/stats').
+:- ensure_loaded('../sat/preprocess').
+:- ensure_loaded('../sat/budget').
+
 neg(neg(L), L) :- !.
 neg(L, neg(L)).
 
@@ -8,27 +13,46 @@ is_tautology(C) :-
     L2 == NL,
     !.
 
+% There is no factoring, so a clause never subsumes a shorter one: kept
+% in place of [p(a)], [p(X), p(Y)] cannot refute [neg(p(U)), neg(p(V))].
 subsumes(General, Specific) :-
+    length(General, GeneralLength),
+    length(Specific, SpecificLength),
+    GeneralLength =< SpecificLength,
     copy_term(General, G),
-    forall(
-        member(L, G),
-        member(L, Specific)
-    ).
+    copy_term(Specific, S),
+    numbervars(S, 0, _),
+    subset_match(G, S),
+    !.
+
+subset_match([], _).
+subset_match([L|Ls], Specific) :-
+    member(L, Specific),
+    subset_match(Ls, Specific).
 
 normalize(C, N) :- sort(C, N).
 
 rename_var(C, R) :- copy_term(C, R).
 
 resolve(C1, C2, Resolvent) :-
+    nth1(I, C1, _),
+    resolve_at(C1, I, C2, Resolvent).
+
+resolve_at(C1, I, C2, Resolvent) :-
     rename_var(C1, R1),
     rename_var(C2, R2),
-    select(L1, R1, Rest1),
+    nth1(I, R1, L1, Rest1),
     neg(L1, NL1),
     select(L2, R2, Rest2),
+    stats_count(unifications),
     unify_with_occurs_check(NL1, L2),
     append(Rest1, Rest2, Temp),
     normalize(Temp, Resolvent),
-    \+ is_tautology(Resolvent).
+    \+ discarded_tautology(Resolvent).
+
+discarded_tautology(Clause) :-
+    is_tautology(Clause),
+    stats_count(tautologies).
 
 all_resolvents(Clauses, Resolvents) :-
     findall(
@@ -43,45 +67,517 @@ all_resolvents(Clauses, Resolvents) :-
     ),
     sort(All, Resolvents).
 
-new_resolvents(Clauses, New) :-
-    all_resolvents(Clauses, All),
-    include(is_good_resolvent(Clauses), All, New).
+% % % % % % % % % % % % %
+% Feature-vector index over the kept clauses:
+% fv_index(Entries, Postings, Variants)
+%   Entries   Id -> Features-Clause
+%   Postings  Feature -> ordset of Ids, a feature being +(Name/Arity)
+%             or -(Name/Arity) for a positive or negated literal.
+%   Variants  variant key -> Id, so renamed copies of a kept clause
+%             are rejected without a subsumption test.
+% A clause can only subsume clauses whose features include its own.
+
+literal_feature(neg(Atom), -(Name/Arity)) :-
+    !,
+    functor(Atom, Name, Arity).
+literal_feature(Atom, +(Name/Arity)) :-
+    functor(Atom, Name, Arity).
+
+clause_features(Clause, Features) :-
+    maplist(literal_feature, Clause, All),
+    sort(All, Features).
 
-is_good_resolvent(Clauses, R) :-
-    \+ member(R, Clauses),
-    \+ is_subsumed_by_any(R, Clauses).
+empty_feature_index(fv_index(Entries, Postings, Variants)) :-
+    empty_assoc(Entries),
+    empty_assoc(Postings),
+    empty_assoc(Variants).
 
-is_subsumed_by_any(C, Clauses) :-
-    member(C2, Clauses), 
-    C2 \== C, 
-    subsumes(C2, C),
+variant_key(Clause, Key) :-
+    canonical_clause(Clause, Canonical),
+    variant_sha1(Canonical, Key).
+
+feature_index_add(Id, Clause, fv_index(E0, P0, V0), fv_index(E, P, V)) :-
+    clause_features(Clause, Features),
+    put_assoc(Id, E0, Features-Clause, E),
+    foldl(posting_add(Id), Features, P0, P),
+    variant_key(Clause, Key),
+    put_assoc(Key, V0, Id, V).
+
+feature_index_remove(Id, fv_index(E0, P0, V0), fv_index(E, P, V)) :-
+    del_assoc(Id, E0, Features-Clause, E),
+    foldl(posting_remove(Id), Features, P0, P),
+    variant_key(Clause, Key),
+    del_assoc(Key, V0, _, V).
+
+posting_add(Id, Feature, P0, P) :-
+    (get_assoc(Feature, P0, Ids0) -> true ; Ids0 = []),
+    ord_add_element(Ids0, Id, Ids),
+    put_assoc(Feature, P0, Ids, P).
+
+posting_remove(Id, Feature, P0, P) :-
+    get_assoc(Feature, P0, Ids0),
+    ord_del_element(Ids0, Id, Ids),
+    (
+        Ids == [] ->
+        del_assoc(Feature, P0, _, P) ;
+        put_assoc(Feature, P0, Ids, P)
+    ).
+
+feature_posting(Postings, Feature, Ids) :-
+    get_assoc(Feature, Postings, Ids).
+
+forward_subsumed(Clause, fv_index(_, _, Variants)) :-
+    variant_key(Clause, Key),
+    get_assoc(Key, Variants, _),
+    !,
+    stats_count(variants).
+forward_subsumed(Clause, fv_index(Entries, Postings, _)) :-
+    clause_features(Clause, Features),
+    findall(Ids, (member(F, Features), feature_posting(Postings, F, Ids)), Lists),
+    ord_union(Lists, Candidates),
+    member(Id, Candidates),
+    get_assoc(Id, Entries, CandidateFeatures-Candidate),
+    ord_subset(CandidateFeatures, Features),
+    subsumes(Candidate, Clause),
     !.
 
+backward_subsumed(Clause, fv_index(Entries, Postings, _), Subsumed) :-
+    clause_features(Clause, Features),
+    (
+        maplist(feature_posting(Postings), Features, [First|Rest]) ->
+        foldl(ord_intersection, Rest, First, Candidates),
+        include(subsumed_entry(Clause, Entries), Candidates, Subsumed) ;
+        Subsumed = []
+    ).
+
+subsumed_entry(Clause, Entries, Id) :-
+    get_assoc(Id, Entries, _-Candidate),
+    subsumes(Clause, Candidate).
+
+% % % % % % % % % % % % %
+% Partner index over the processed clauses: Feature -> (ArgKey -> Ids),
+% where ArgKey is the Name/Arity of the first argument of the literal,
+% or `var` when it is unbound or the predicate has no arguments. A
+% literal only looks up clauses holding its complement under a matching
+% or `var` first argument.
+
+literal_atom(neg(Atom), Atom) :- !.
+literal_atom(Atom, Atom).
+
+first_arg_key(Atom, ArgKey) :-
+    (
+        compound(Atom),
+        arg(1, Atom, First),
+        nonvar(First) ->
+        functor(First, Name, Arity),
+        ArgKey = Name/Arity ;
+        ArgKey = var
+    ).
+
+literal_key(Lit, Feature-ArgKey) :-
+    literal_feature(Lit, Feature),
+    literal_atom(Lit, Atom),
+    first_arg_key(Atom, ArgKey).
+
+partner_index_add(Id, Clause, Index0, Index) :-
+    maplist(literal_key, Clause, Keys0),
+    sort(Keys0, Keys),
+    foldl(partner_key_add(Id), Keys, Index0, Index).
+
+partner_index_remove(Id, Clause, Index0, Index) :-
+    maplist(literal_key, Clause, Keys0),
+    sort(Keys0, Keys),
+    foldl(partner_key_remove(Id), Keys, Index0, Index).
+
+partner_key_add(Id, Feature-ArgKey, Index0, Index) :-
+    (get_assoc(Feature, Index0, Inner0) -> true ; empty_assoc(Inner0)),
+    posting_add(Id, ArgKey, Inner0, Inner),
+    put_assoc(Feature, Index0, Inner, Index).
+
+partner_key_remove(Id, Feature-ArgKey, Index0, Index) :-
+    get_assoc(Feature, Index0, Inner0),
+    posting_remove(Id, ArgKey, Inner0, Inner),
+    (
+        empty_assoc(Inner) ->
+        del_assoc(Feature, Index0, _, Index) ;
+        put_assoc(Feature, Index0, Inner, Index)
+    ).
+
+partner_candidates(Lit, Index, Ids) :-
+    neg(Lit, Comp),
+    literal_key(Comp, Feature-ArgKey),
+    (
+        get_assoc(Feature, Index, Inner) ->
+        (
+            ArgKey == var ->
+            assoc_to_values(Inner, Lists),
+            ord_union(Lists, Ids) ;
+            (get_assoc(var, Inner, VarIds) -> true ; VarIds = []),
+            (get_assoc(ArgKey, Inner, KeyIds) -> true ; KeyIds = []),
+            ord_union(VarIds, KeyIds, Ids)
+        ) ;
+        Ids = []
+    ).
+
+% % % % % % % % % % % % %
+% Given-clause saturation: unprocessed clauses wait in a queue ordered
+% by the strategy's priority, with every pick_given_ratio-th pick taken
+% by age instead. Clause ids grow with insertion, so the id doubles as
+% the age.
+%
+% Strategies:
+%   unrestricted      every kept clause is queued, lightest first
+%   set_of_support    axioms go straight to the processed set, so only
+%                     clauses descended from the support set are given
+%   unit_preference   shorter clauses first, units before anything else
+%   ordered           only resolve on literals whose predicate is
+%                     maximal (by standard order of Name/Arity) in
+%                     both parent clauses
+
+resolution_strategy(unrestricted).
+resolution_strategy(set_of_support).
+resolution_strategy(unit_preference).
+resolution_strategy(ordered).
+
+pick_given_ratio(5).
+
+symbol_count(Term, 1) :-
+    var(Term),
+    !.
+symbol_count(Term, Count) :-
+    Term =.. [_|Args],
+    foldl(add_symbol_count, Args, 1, Count).
+
+add_symbol_count(Term, Count0, Count) :-
+    symbol_count(Term, N),
+    Count is Count0 + N.
+
+clause_weight(Clause, Weight) :-
+    foldl(add_symbol_count, Clause, 0, Weight).
+
+clause_priority(unit_preference, Clause, Length-Weight) :-
+    !,
+    length(Clause, Length),
+    clause_weight(Clause, Weight).
+clause_priority(_, Clause, Weight) :-
+    clause_weight(Clause, Weight).
+
+empty_clause_queue(queue(ByPriority, ByAge, 0)) :-
+    empty_assoc(ByPriority),
+    empty_assoc(ByAge).
+
+queue_add(Strategy, Id, Clause, queue(W0, A0, Picks), queue(W, A, Picks)) :-
+    clause_priority(Strategy, Clause, Priority),
+    put_assoc(Priority-Id, W0, Clause, W),
+    put_assoc(Id, A0, Priority, A).
+
+queue_remove(Id, queue(W0, A0, Picks), queue(W, A, Picks)) :-
+    del_assoc(Id, A0, Priority, A),
+    del_assoc(Priority-Id, W0, _, W).
+
+queue_pop(queue(W0, A0, Picks0), Id, Clause, queue(W, A, Picks)) :-
+    Picks is Picks0 + 1,
+    pick_given_ratio(Ratio),
+    (
+        Picks mod Ratio =:= 0 ->
+        del_min_assoc(A0, Id, Priority, A),
+        del_assoc(Priority-Id, W0, Clause, W) ;
+        del_min_assoc(W0, Priority-Id, Clause, W),
+        del_assoc(Id, A0, _, A)
+    ).
+
+literal_predicate(Lit, Name/Arity) :-
+    literal_atom(Lit, Atom),
+    functor(Atom, Name, Arity).
+
+maximal_literal(Clause, Lit) :-
+    literal_predicate(Lit, Predicate),
+    \+ (
+        member(Other, Clause),
+        literal_predicate(Other, OtherPredicate),
+        OtherPredicate @> Predicate
+    ).
+
+eligible_literal(ordered, Clause, Lit) :-
+    !,
+    maximal_literal(Clause, Lit).
+eligible_literal(_, _, _).
+
+given_resolvents(Strategy, Given, Processed, Partners, Resolvents) :-
+    resolution_threads(Threads),
+    (
+        Threads > 1 ->
+        findall(
+            I-C,
+            given_partner(Strategy, Given, Processed, Partners, I, C),
+            Pairs
+        ),
+        parallel_resolvents(Threads, Given, Pairs, Resolvents) ;
+        findall(
+            R,
+            (
+                given_partner(Strategy, Given, Processed, Partners, I, C),
+                resolve_at(Given, I, C, R)
+            ),
+            All
+        ),
+        sort(All, Resolvents)
+    ).
+
+given_partner(Strategy, Given, Processed, Partners, I, C) :-
+    nth1(I, Given, Lit),
+    eligible_literal(Strategy, Given, Lit),
+    partner_candidates(Lit, Partners, Ids),
+    member(Id, Ids),
+    get_assoc(Id, Processed, C),
+    neg(Lit, Comp),
+    eligible_literal(Strategy, C, Comp).
+
+% % % % % % % % % % % % %
+% Parallel resolvent generation: the (literal, partner) pairs of one
+% given clause are cut into contiguous chunks, one per worker thread,
+% and each chunk is resolved by concurrent/3. Chunk results are copied
+% back in completion order, so they are merged by canonical clause
+% rather than by sort/2 (which orders variables by address): the
+% resolvents, and so the whole saturation, are then the same for every
+% thread count above 1. Below parallel_min_pairs/1 pairs the chunks run
+% in the calling thread. The thread count is per Prolog thread and
+% defaults to 1, which keeps the sequential path above; the entry points
+% taking a thread count set it for that call only.
+
+parallel_min_pairs(64).
+
+set_resolution_threads(Threads) :-
+    must_be(positive_integer, Threads),
+    nb_setval(resolution_threads, Threads).
+
+resolution_threads(Threads) :-
+    (nb_current(resolution_threads, Threads) -> true ; Threads = 1).
+
+% Runs Goal with set_resolution_threads(Threads) and puts the thread's
+% previous setting back afterwards.
+with_resolution_threads(Threads, Goal) :-
+    (nb_current(resolution_threads, Saved) -> true ; Saved = none),
+    setup_call_cleanup(set_resolution_threads(Threads), Goal, restore_resolution_threads(Saved)).
+
+restore_resolution_threads(none) :-
+    !,
+    nb_delete(resolution_threads).
+restore_resolution_threads(Saved) :-
+    nb_setval(resolution_threads, Saved).
+
+parallel_resolvents(Threads, Given, Pairs, Resolvents) :-
+    length(Pairs, Count),
+    parallel_min_pairs(Min),
+    (nb_current(engine_stats, _) -> Counting = true ; Counting = false),
+    (
+        Count >= Min ->
+        Size is (Count + Threads - 1) // Threads,
+        split_chunks(Pairs, Size, Chunks),
+        maplist(chunk_goal(Given, Counting), Chunks, Goals, Results),
+        concurrent(Threads, Goals, []),
+        maplist(merge_chunk_stats(Counting), Results, Lists) ;
+        findall(R, (member(I-C, Pairs), resolve_at(Given, I, C, R)), All),
+        Lists = [All]
+    ),
+    merge_resolvents(Lists, Resolvents).
+
+split_chunks([], _, []) :-
+    !.
+split_chunks(Pairs, Size, [Chunk|Chunks]) :-
+    length(Pairs, Count),
+    (
+        Count > Size ->
+        length(Chunk, Size),
+        append(Chunk, Rest, Pairs) ;
+        Chunk = Pairs,
+        Rest = []
+    ),
+    split_chunks(Rest, Size, Chunks).
+
+chunk_goal(Given, Counting, Chunk, chunk_resolvents(Given, Counting, Chunk, Result), Result).
+
+% Runs in a worker thread, which has no engine_stats of its own: with
+% Counting its counters are collected here and added back by the caller.
+chunk_resolvents(Given, Counting, Chunk, Resolvents-Counters) :-
+    (Counting == true -> stats_enable ; true),
+    findall(R, (member(I-C, Chunk), resolve_at(Given, I, C, R)), Resolvents),
+    (
+        Counting == true ->
+        nb_getval(engine_stats, Counters),
+        nb_delete(engine_stats) ;
+        Counters = none
+    ).
+
+merge_chunk_stats(false, Resolvents-_, Resolvents).
+merge_chunk_stats(true, Resolvents-Counters, Resolvents) :-
+    forall(
+        stats_field(Name, I),
+        (arg(I, Counters, Value), stats_add(Name, Value))
+    ).
+
+merge_resolvents(Lists, Resolvents) :-
+    append(Lists, All),
+    map_list_to_pairs(canonical_clause, All, Keyed),
+    keysort(Keyed, Sorted),
+    unique_variants(Sorted, Resolvents).
+
+unique_variants([], []).
+unique_variants([Key-Clause|Rest], Resolvents) :-
+    (
+        Rest = [Key-Next|_],
+        Next =@= Clause ->
+        unique_variants(Rest, Resolvents) ;
+        Resolvents = [Clause|Resolvents1],
+        unique_variants(Rest, Resolvents1)
+    ).
+
+% sat_state(Strategy, Processed, Queue, Index, Partners, LastId, Kept):
+% Processed maps Id -> Clause, Index covers both processed and queued
+% clauses and Partners indexes the literals of the processed ones. Kept
+% counts the processed and queued clauses, which backward subsumption
+% can lower, while LastId only grows.
+
+keep_clauses(_, [], State, State, ok).
+keep_clauses(Target, [Clause|Rest], State0, State, Status) :-
+    keep_clause(Target, Clause, State0, State1, ClauseStatus),
+    (
+        ClauseStatus == empty ->
+        State = State1,
+        Status = empty ;
+        keep_clauses(Target, Rest, State1, State, Status)
+    ).
+
+keep_clause(_, [], State, State, empty) :-
+    !.
+keep_clause(_, Clause, State, State, ok) :-
+    State = sat_state(_, _, _, Index, _, _, _),
+    forward_subsumed(Clause, Index),
+    !,
+    stats_count(forward_subsumed).
+keep_clause(Target, Clause, sat_state(S, P0, Q0, I0, L0, Id0, K0), sat_state(S, P, Q, I, L, Id, K), ok) :-
+    backward_subsumed(Clause, I0, Subsumed),
+    length(Subsumed, SubsumedCount),
+    stats_add(backward_subsumed, SubsumedCount),
+    foldl(discard_clause, Subsumed, P0-Q0-I0-L0, P1-Q1-I1-L1),
+    Id is Id0 + 1,
+    K is K0 + 1 - SubsumedCount,
+    feature_index_add(Id, Clause, I1, I),
+    (
+        Target == processed ->
+        put_assoc(Id, P1, Clause, P),
+        partner_index_add(Id, Clause, L1, L),
+        Q = Q1 ;
+        queue_add(S, Id, Clause, Q1, Q),
+        P = P1,
+        L = L1
+    ).
+
+discard_clause(Id, P0-Q0-I0-L0, P-Q-I-L) :-
+    feature_index_remove(Id, I0, I),
+    (
+        del_assoc(Id, P0, Clause, P) ->
+        partner_index_remove(Id, Clause, L0, L),
+        Q = Q0 ;
+        P = P0,
+        L = L0,
+        queue_remove(Id, Q0, Q)
+    ).
+
+given_clause_loop(sat_state(S, P0, Q0, Index, L0, LastId, Kept), Generated0, Result, Generated) :-
+    (
+        queue_pop(Q0, Id, Given, Q1) ->
+        progress_tick(given),
+        progress_set(clauses, Kept),
+        budget_note(clauses, Kept),
+        budget_note(generated, Generated0),
+        budget_check(clauses, Kept),
+        stats_count(rounds),
+        given_resolvents(S, Given, P0, L0, Resolvents),
+        length(Resolvents, Count),
+        stats_add(resolvents, Count),
+        Generated1 is Generated0 + Count,
+        put_assoc(Id, P0, Given, P1),
+        partner_index_add(Id, Given, L0, L1),
+        keep_clauses(queue, Resolvents, sat_state(S, P1, Q1, Index, L1, LastId, Kept), State, Status),
+        (
+            Status == empty ->
+            Result = unsatisfiable,
+            Generated = Generated1 ;
+            given_clause_loop(State, Generated1, Result, Generated)
+        ) ;
+        Result = satisfiable,
+        Generated = Generated0
+    ).
+
 saturate(Clauses, Result) :-
-    ( 
-        member([], Clauses) ->
-        Result = unsatisfiable ;
-        new_resolvents(Clauses, New),
-        ( 
-            New = [] ->
-            Result = satisfiable ; 
-                member([], New) ->
-                Result = unsatisfiable ;
-                append(Clauses, New, Extended),
-                list_to_set(Extended, Next),
-                saturate(Next, Result)
+    saturate(unrestricted, [], Clauses, Result, _).
+
+saturate(Strategy, Axioms, Support, Result, Generated) :-
+    empty_assoc(Processed),
+    empty_clause_queue(Queue),
+    empty_feature_index(Index),
+    empty_assoc(Partners),
+    State0 = sat_state(Strategy, Processed, Queue, Index, Partners, 0, 0),
+    keep_clauses(processed, Axioms, State0, State1, AxiomStatus),
+    (
+        AxiomStatus == empty ->
+        Result = unsatisfiable,
+        Generated = 0 ;
+        keep_clauses(queue, Support, State1, State2, SupportStatus),
+        (
+            SupportStatus == empty ->
+            Result = unsatisfiable,
+            Generated = 0 ;
+            given_clause_loop(State2, 0, Result, Generated)
         )
     ).
 
-resolution(Clauses, Result) :-
+prepare_clauses(Clauses, Prepared) :-
     maplist(normalize, Clauses, Norm),
     exclude(is_tautology, Norm, NoTaut),
-    list_to_set(NoTaut, Init),
-    ( 
-        member([], Init) -> 
-        Result = unsatisfiable ; 
-        saturate(Init, Result) 
+    list_to_set(NoTaut, Prepared).
+
+negative_clause(Clause) :-
+    forall(member(Lit, Clause), Lit = neg(_)).
+
+support_split(set_of_support, Axioms, [], SosAxioms, Support) :-
+    !,
+    partition(negative_clause, Axioms, Support0, Rest),
+    (
+        Support0 == [] ->
+        SosAxioms = [],
+        Support = Axioms ;
+        SosAxioms = Rest,
+        Support = Support0
     ).
+support_split(set_of_support, Axioms, Support, Axioms, Support) :-
+    !.
+support_split(_, Axioms, Support, [], All) :-
+    append(Axioms, Support, All).
+
+resolution(Clauses, Result) :-
+    resolution(Clauses, [], unrestricted, Result, _).
+
+resolution(Axioms, Support, Strategy, Result, Generated) :-
+    prepare_clauses(Axioms, PreparedAxioms),
+    prepare_clauses(Support, PreparedSupport),
+    support_split(Strategy, PreparedAxioms, PreparedSupport, Processed, Queued),
+    saturate(Strategy, Processed, Queued, Result, Generated).
+
+% % % % % % % % % % % % %
+
+% Counters for with_stats/3 in sat/stats.pl.
+
+:- multifile stats_field/2.
+
+stats_field(rounds, 1).
+stats_field(resolvents, 2).
+stats_field(tautologies, 3).
+stats_field(forward_subsumed, 4).
+stats_field(backward_subsumed, 5).
+stats_field(unifications, 6).
+stats_field(variants, 7).
 
 % % % % % % % % % % % % % 
 read_kb_from_file(FileName, Clauses) :-
@@ -98,6 +594,150 @@ read_clauses_from_stream(Stream, [Clause|Rest]) :-
     Clause \= end_of_file,
     read_clauses_from_stream(Stream, Rest).
 
+question_comment(Comments) :-
+    member(_-Comment, Comments),
+    sub_string(Comment, _, _, _, "Question"),
+    !.
+
+read_kb_with_support(FileName, Axioms, Support) :-
+    open(FileName, read, Stream),
+    read_sections_from_stream(Stream, axioms, Axioms, Support),
+    close(Stream).
+
+read_sections_from_stream(Stream, Section0, Axioms, Support) :-
+    read_term(Stream, Clause, [comments(Comments)]),
+    (
+        Clause == end_of_file ->
+        Axioms = [],
+        Support = [] ;
+        (question_comment(Comments) -> Section = support ; Section = Section0),
+        (
+            Section == support ->
+            Support = [Clause|RestSupport],
+            Axioms = RestAxioms ;
+            Axioms = [Clause|RestAxioms],
+            Support = RestSupport
+        ),
+        read_sections_from_stream(Stream, Section, RestAxioms, RestSupport)
+    ).
+
+% Canonical text of a KB for result caching: literals ordered by their
+% variable-free skeleton, variables numbered per clause, clauses sorted.
+
+canonical_clause(Clause, Canonical) :-
+    copy_term(Clause, Copy),
+    map_list_to_pairs(literal_skeleton, Copy, Pairs),
+    keysort(Pairs, Sorted),
+    pairs_values(Sorted, Ordered),
+    numbervars(Ordered, 0, _),
+    sort(Ordered, Canonical).
+
+literal_skeleton(Lit, Skeleton) :-
+    copy_term(Lit, Skeleton),
+    term_variables(Skeleton, Vars),
+    maplist(=('$VAR'('_')), Vars).
+
+canonical_clauses(Clauses, Canonical) :-
+    maplist(canonical_clause, Clauses, Normalized),
+    sort(Normalized, Canonical).
+
+canonical_kb(FileName, String) :-
+    read_kb_with_support(FileName, Axioms, Support),
+    canonical_clauses(Axioms, CanonicalAxioms),
+    canonical_clauses(Support, CanonicalSupport),
+    format(string(String), '~k', [kb(CanonicalAxioms, CanonicalSupport)]).
+
 run_resolution_file(FileName, Result) :-
-    read_kb_from_file(FileName, Clauses),
-    resolution(Clauses, Result).
\ No newline at end of file
+    run_resolution_file(FileName, unrestricted, Result, _).
+
+run_resolution_file(FileName, Strategy, Result, Generated) :-
+    read_kb_with_support(FileName, Axioms, Support),
+    resolution(Axioms, Support, Strategy, Result, Generated).
+
+run_resolution_file(FileName, Strategy, Threads, Result, Generated) :-
+    with_resolution_threads(Threads, run_resolution_file(FileName, Strategy, Result, Generated)).
+
+run_resolution_file_stats(FileName, Strategy, Profile, Result, Generated, Stats) :-
+    run_resolution_file_stats(FileName, Strategy, Profile, false, Result, Generated, Stats).
+
+% With Preprocess = true the per-pass report is added to Stats as `preprocess`.
+run_resolution_file_stats(FileName, Strategy, Profile, Preprocess, Result, Generated, Stats) :-
+    resolution_file_budget(FileName, Strategy, Profile, Preprocess, [], Result, Generated, Stats).
+
+% As run_resolution_file/4 within Budget, e.g. [time(10), clauses(5000)];
+% Result may also be unknown(Reason, Progress).
+run_resolution_file_budget(FileName, Strategy, Budget, Result, Generated) :-
+    resolution_file_budget(FileName, Strategy, false, false, Budget, Result, Generated, _).
+
+% On unknown, Generated is the number of resolvents made before the budget
+% ran out and Progress holds it with the clause count reached.
+resolution_file_budget(FileName, Strategy, Profile, Preprocess, Budget, Result, Generated, Stats) :-
+    read_kb_with_support(FileName, Axioms, Support),
+    budget_options(Budget, Limits),
+    with_stats(
+        Profile,
+        with_budget(Limits, resolution_report(Preprocess, Axioms, Support, Strategy, Result0, Generated0, Report), Outcome),
+        Stats0
+    ),
+    (
+        Outcome == done ->
+        Result = Result0,
+        Generated = Generated0,
+        (Preprocess == true -> put_dict(preprocess, Stats0, Report, Stats) ; Stats = Stats0) ;
+        Outcome = unknown(Reason, Progress),
+        (memberchk(generated-Generated, Progress) -> true ; Generated = 0),
+        dict_pairs(ProgressDict, _, Progress),
+        Result = unknown(Reason, ProgressDict),
+        Stats = Stats0
+    ).
+
+resolution_report(false, Axioms, Support, Strategy, Result, Generated, _) :-
+    resolution(Axioms, Support, Strategy, Result, Generated).
+resolution_report(true, Axioms, Support, Strategy, Result, Generated, Report) :-
+    resolution_preprocessed(Axioms, Support, Strategy, Result, Generated, Report).
+
+% Entry point for engines.py; see dp_answer_file/7 in dp_sat.pl.
+resolution_answer_file(File, Strategy, Preprocess, Profile, Threads, Budget, Answer) :-
+    atom_string(FileName, File),
+    atom_string(StrategyName, Strategy),
+    with_resolution_threads(
+        Threads,
+        resolution_file_budget(FileName, StrategyName, Profile, Preprocess, Budget, Result, Generated, Stats)
+    ),
+    resolution_result_pairs(Result, Pairs),
+    dict_pairs(Answer, _, [generated-Generated, stats-Stats|Pairs]).
+
+resolution_result_pairs(unknown(Reason, Progress), [result-unknown, reason-Reason, progress-Progress]) :-
+    !.
+resolution_result_pairs(Result, [result-Result]).
+
+run_resolution_file_preprocessed(FileName, Strategy, Result, Generated, Report) :-
+    read_kb_with_support(FileName, Axioms, Support),
+    resolution_preprocessed(Axioms, Support, Strategy, Result, Generated, Report).
+
+% A ground KB is simplified as one clause set and its negative clauses become
+% the set of support. First-order KBs keep their split: duplicate and
+% tautology removal runs on each half and the halves it returns are resolved,
+% so the report counts what the run actually started from.
+resolution_preprocessed(Axioms, Support, Strategy, Result, Generated, Report) :-
+    append(Axioms, Support, Clauses),
+    (
+        ground(Clauses) ->
+        preprocess(Clauses, Simplified, _, Passes),
+        preprocess_report(Passes, Report),
+        resolution(Simplified, [], Strategy, Result, Generated) ;
+        preprocess_duplicates(Axioms, SimplifiedAxioms, AxiomPasses),
+        preprocess_duplicates(Support, SimplifiedSupport, SupportPasses),
+        maplist(merge_pass, AxiomPasses, SupportPasses, Passes),
+        preprocess_report(Passes, Report),
+        resolution(SimplifiedAxioms, SimplifiedSupport, Strategy, Result, Generated)
+    ).
+
+merge_pass(
+    pass(Pass, Removed1, RemovedLits1, AddedLits1),
+    pass(Pass, Removed2, RemovedLits2, AddedLits2),
+    pass(Pass, Removed, RemovedLits, AddedLits)
+) :-
+    Removed is Removed1 + Removed2,
+    RemovedLits is RemovedLits1 + RemovedLits2,
+    AddedLits is AddedLits1 + AddedLits2.
@@ -0,0 +1,81 @@
+"""Persistent solver result cache shared by the GUIs.
+
+Results are stored in a small SQLite database, keyed by a SHA-256 of the
+solver name, the strategy and the canonical text of the KB returned by
+canonical_kb/2. Entries carry a last-used timestamp; once the table
+holds more than max_entries rows the least recently used ones are evicted.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(ROOT, ".result_cache.sqlite")
+DEFAULT_MAX_ENTRIES = 1000
+
+
+def cache_key(solver, strategy, canonical_kb):
+    digest = hashlib.sha256()
+    for part in (solver, strategy, canonical_kb):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        with self.connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " solver TEXT NOT NULL,"
+                " strategy TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    @contextmanager
+    def connect(self):
+        # One short-lived connection per call, so worker threads can share the cache
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, key):
+        with self.connect() as db:
+            row = db.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, solver, strategy, payload):
+        with self.connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, solver, strategy, payload, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, solver, strategy, json.dumps(payload), time.time())
+            )
+            db.execute(
+                "DELETE FROM results WHERE key IN ("
+                " SELECT key FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self.connect() as db:
+            db.execute("DELETE FROM results")
+
+    def __len__(self):
+        with self.connect() as db:
+            return db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
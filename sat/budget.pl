@@ -0,0 +1,144 @@
+% Resource budgets for solver runs. A budget is a list of
+%   time(Seconds)    wall-clock time, through call_with_time_limit/2
+%   inferences(N)    inferences of the calling thread, through
+%                    call_with_inference_limit/3
+%   stack(Bytes)     stack_limit for the duration of the run
+%   clauses(N)       clauses kept by resolution at once, checked by the engine
+% or a dict with those keys. with_budget/3 abandons the goal when one runs
+% out and gives unknown(Reason, Progress) instead of done, Reason being
+% the budget's name and Progress the Name-Value pairs the engine recorded
+% with budget_note/2 so far. Outside with_budget/3 the hooks are no-ops.
+
+budget_progress_name(decisions).
+budget_progress_name(propagations).
+budget_progress_name(assigned).
+budget_progress_name(assignment).
+budget_progress_name(clauses).
+budget_progress_name(generated).
+
+budget_options(Budget, Limits) :-
+    is_dict(Budget),
+    !,
+    dict_pairs(Budget, _, Pairs),
+    maplist(budget_term, Pairs, Limits).
+budget_options(Limits, Limits).
+
+budget_term(Name-Value, Limit) :-
+    Limit =.. [Name, Value].
+
+% Without limits only an engine's own budget_exceeded/1 (the trail
+% engine's state not fitting in the stack) ends the run unknown.
+with_budget([], Goal, Outcome) :-
+    !,
+    catch(
+        (once(Goal), Outcome = done),
+        budget_exceeded(Reason),
+        Outcome = unknown(Reason, [])
+    ).
+with_budget(Budget, Goal, Outcome) :-
+    setup_call_cleanup(
+        nb_setval(budget_limits, Budget),
+        catch(
+            (budget_call(Budget, Goal), Outcome = done),
+            Error,
+            budget_stopped(Error, Outcome)
+        ),
+        budget_stop
+    ).
+
+budget_call(Budget, Goal) :-
+    (memberchk(time(Seconds), Budget) -> Timed = call_with_time_limit(Seconds, Goal) ; Timed = Goal),
+    (memberchk(inferences(Max), Budget) -> Counted = budget_inferences(Max, Timed) ; Counted = Timed),
+    (
+        memberchk(stack(Bytes), Budget) ->
+        current_prolog_flag(stack_limit, Old),
+        setup_call_cleanup(
+            set_prolog_flag(stack_limit, Bytes),
+            once(Counted),
+            set_prolog_flag(stack_limit, Old)
+        ) ;
+        once(Counted)
+    ).
+
+budget_inferences(Max, Goal) :-
+    call_with_inference_limit(once(Goal), Max, Result),
+    (Result == inference_limit_exceeded -> throw(budget_exceeded(inferences)) ; true).
+
+budget_stopped(Error, unknown(Reason, Progress)) :-
+    budget_reason(Error, Reason),
+    !,
+    findall(
+        Name-Value,
+        (budget_progress_name(Name), budget_key(Name, Key), nb_current(Key, Value)),
+        Progress
+    ).
+budget_stopped(Error, _) :-
+    throw(Error).
+
+budget_reason(time_limit_exceeded, time).
+budget_reason(budget_exceeded(Reason), Reason).
+budget_reason(error(resource_error(Resource), _), stack) :-
+    budget_stack_error(Resource).
+
+budget_stop :-
+    nb_delete(budget_limits),
+    forall(
+        (budget_progress_name(Name), budget_key(Name, Key), nb_current(Key, _)),
+        nb_delete(Key)
+    ).
+
+budget_key(Name, Key) :-
+    atom_concat(budget_, Name, Key).
+
+% % % % % % % % % % % % %
+% Engine hooks.
+
+budget_active :-
+    nb_current(budget_limits, _).
+
+budget_note(Name, Value) :-
+    (
+        budget_active ->
+        budget_key(Name, Key),
+        nb_setval(Key, Value) ;
+        true
+    ).
+
+% Keeps the longest partial assignment seen, a list of Var/Value or of
+% signed integer literals.
+budget_note_assignment(Assignment) :-
+    (
+        budget_active ->
+        length(Assignment, Assigned),
+        (
+            nb_current(budget_assigned, Best),
+            Best >= Assigned ->
+            true ;
+            budget_note(assigned, Assigned),
+            budget_note(assignment, Assignment)
+        ) ;
+        true
+    ).
+
+% The resource errors of a stack running into stack_limit; others, such
+% as memory or table space, are not a budget running out.
+budget_stack_error(stack_overflow).
+budget_stack_error(global_stack).
+budget_stack_error(local_stack).
+budget_stack_error(trail_stack).
+
+budget_check(Name, Value) :-
+    (
+        nb_current(budget_limits, Budget),
+        Limit =.. [Name, Max],
+        memberchk(Limit, Budget),
+        Value > Max ->
+        throw(budget_exceeded(Name)) ;
+        true
+    ).
+
+budget_assignment_item(Var/Value, Var/Value) :-
+    !.
+budget_assignment_item(Lit, Var/Value) :-
+    Var is abs(Lit),
+    (Lit > 0 -> Value = true ; Value = false).
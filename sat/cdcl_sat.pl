@@ -0,0 +1,751 @@
+% Conflict-driven clause learning engine, selected with the `cdcl` strategy.
+% It runs on the integer encoding produced by encode_kb/3: variables are
+% 1..N, a literal is a signed integer and the solver state lives in
+% mutable compound terms updated with setarg/3.
+
+:- ensure_loaded(progress).
+:- ensure_loaded(stats).
+:- ensure_loaded(budget).
+
+:- multifile stats_field/2.
+
+stats_field(decisions, 1).
+stats_field(propagations, 2).
+stats_field(bullet_ops, 3).
+stats_field(conflicts, 4).
+stats_field(learned, 5).
+stats_field(heuristic_time, 6).
+stats_field(restarts, 7).
+
+new_array(Name, Size, Init, Array) :-
+    length(Values, Size),
+    maplist(=(Init), Values),
+    Array =.. [Name|Values].
+
+cdcl_field(nvars, 1).
+cdcl_field(values, 2).
+cdcl_field(levels, 3).
+cdcl_field(reasons, 4).
+cdcl_field(watches, 5).
+cdcl_field(clauses, 6).
+cdcl_field(nclauses, 7).
+cdcl_field(activity, 8).
+cdcl_field(act_inc, 9).
+cdcl_field(trail, 10).
+cdcl_field(level, 11).
+cdcl_field(decisions, 12).
+cdcl_field(propagations, 13).
+cdcl_field(conflicts, 14).
+cdcl_field(learned, 15).
+cdcl_field(assumptions, 16).
+cdcl_field(options, 17).
+cdcl_field(phases, 18).
+cdcl_field(heap, 19).
+cdcl_field(restart_base, 20).
+cdcl_field(restart_limit, 21).
+cdcl_field(restart_index, 22).
+cdcl_field(restarts, 23).
+
+% opts(Branching, Phase, Restarts) of each CDCL strategy. Branching is
+% `scan` (linear search for the most active atom) or `heap` (an activity
+% max-heap); Phase is `negative` or `saved` (the last value the atom had
+% before backjumping); Restarts is none, luby(Unit) or geometric(First, Factor),
+% counted in conflicts.
+cdcl_strategy(cdcl, opts(scan, negative, none)).
+cdcl_strategy(vsids, opts(heap, saved, none)).
+cdcl_strategy(vsids_luby, opts(heap, saved, luby(100))).
+cdcl_strategy(vsids_geometric, opts(heap, saved, geometric(100, 1.5))).
+
+cdcl_get(Field, State, Value) :-
+    cdcl_field(Field, Index),
+    arg(Index, State, Value).
+
+cdcl_set(Field, State, Value) :-
+    cdcl_field(Field, Index),
+    setarg(Index, State, Value).
+
+cdcl_count(Field, State) :-
+    cdcl_get(Field, State, Count0),
+    Count is Count0 + 1,
+    cdcl_set(Field, State, Count).
+
+cdcl_new_state(NVars, State) :-
+    cdcl_strategy(cdcl, Options),
+    cdcl_new_state(NVars, Options, State).
+
+cdcl_new_state(NVars, Options, State) :-
+    new_array(values, NVars, 0, Values),
+    new_array(levels, NVars, 0, Levels),
+    new_array(reasons, NVars, 0, Reasons),
+    NLits is 2 * NVars,
+    new_array(watches, NLits, [], Watches),
+    new_array(activity, NVars, 0.0, Activity),
+    new_array(phases, NVars, 0, Phases),
+    cdcl_new_heap(Options, NVars, Heap),
+    Options = opts(_, _, Schedule),
+    cdcl_restart_limit(Schedule, 1, Limit),
+    State = cdcl(NVars, Values, Levels, Reasons, Watches, clauses, 0,
+                 Activity, 1.0, [], 0, 0, 0, 0, 0, [],
+                 Options, Phases, Heap, 0, Limit, 1, 0).
+
+% With equal activities any order is a heap, so it starts as 1..NVars.
+cdcl_new_heap(opts(scan, _, _), _, none).
+cdcl_new_heap(opts(heap, _, _), NVars, heap(NVars, Slots, Positions)) :-
+    findall(Var, between(1, NVars, Var), Vars),
+    Slots =.. [slots|Vars],
+    Positions =.. [positions|Vars].
+
+cdcl_grow_vars(State, NVars) :-
+    cdcl_get(nvars, State, NVars0),
+    (
+        NVars =< NVars0 ->
+        true ;
+        Extra is NVars - NVars0,
+        forall(
+            member(Field-Init, [values-0, levels-0, reasons-0, activity-0.0, phases-0]),
+            cdcl_grow_array(State, Field, Extra, Init)
+        ),
+        ExtraLits is 2 * Extra,
+        cdcl_grow_array(State, watches, ExtraLits, []),
+        cdcl_set(nvars, State, NVars)
+    ).
+
+cdcl_grow_array(State, Field, Extra, Init) :-
+    cdcl_get(Field, State, Array0),
+    Array0 =.. [Name|Slots],
+    length(Free, Extra),
+    maplist(=(Init), Free),
+    append(Slots, Free, Grown),
+    Array =.. [Name|Grown],
+    cdcl_set(Field, State, Array).
+
+watch_index(Lit, Index) :-
+    (Lit > 0 -> Index is 2 * Lit - 1 ; Index is -2 * Lit).
+
+lit_value(State, Lit, Value) :-
+    cdcl_get(values, State, Values),
+    Var is abs(Lit),
+    arg(Var, Values, VarValue),
+    (Lit > 0 -> Value = VarValue ; Value is -VarValue).
+
+var_level(State, Var, Level) :-
+    cdcl_get(levels, State, Levels),
+    arg(Var, Levels, Level).
+
+cdcl_assign(State, Lit, Reason) :-
+    Var is abs(Lit),
+    (Lit > 0 -> Value = 1 ; Value = -1),
+    cdcl_get(values, State, Values),
+    setarg(Var, Values, Value),
+    cdcl_get(level, State, Level),
+    cdcl_get(levels, State, Levels),
+    setarg(Var, Levels, Level),
+    cdcl_get(reasons, State, Reasons),
+    setarg(Var, Reasons, Reason),
+    cdcl_get(trail, State, Trail),
+    cdcl_set(trail, State, [Lit|Trail]).
+
+cdcl_clause(State, Id, Clause) :-
+    cdcl_get(clauses, State, Store),
+    arg(Id, Store, Clause).
+
+cdcl_clause_literals(State, Id, Lits) :-
+    cdcl_clause(State, Id, Clause),
+    Clause =.. [_|Lits].
+
+cdcl_store_clause(State, Clause, Id) :-
+    cdcl_get(nclauses, State, Count),
+    Id is Count + 1,
+    cdcl_get(clauses, State, Store0),
+    functor(Store0, Name, Capacity),
+    (
+        Id =< Capacity ->
+        Store = Store0 ;
+        Store0 =.. [Name|Slots],
+        Extra is max(16, Capacity),
+        length(Free, Extra),
+        append(Slots, Free, Grown),
+        Store =.. [Name|Grown],
+        cdcl_set(clauses, State, Store)
+    ),
+    setarg(Id, Store, Clause),
+    cdcl_set(nclauses, State, Id).
+
+cdcl_add_watch(State, Lit, Id) :-
+    watch_index(Lit, Index),
+    cdcl_get(watches, State, Watches),
+    arg(Index, Watches, Watching),
+    setarg(Index, Watches, [Id|Watching]).
+
+cdcl_add_input([], _, ok).
+cdcl_add_input([Clause|Rest], State, Status) :-
+    sort(Clause, Lits),
+    (
+        member(Lit, Lits), Comp is -Lit, memberchk(Comp, Lits) ->
+        cdcl_add_input(Rest, State, Status) ;
+        cdcl_simplify_input(Lits, State, Remaining) ->
+        cdcl_add_input_clause(Remaining, State, ClauseStatus),
+        (
+            ClauseStatus == ok ->
+            cdcl_add_input(Rest, State, Status) ;
+            Status = ClauseStatus
+        ) ;
+        cdcl_add_input(Rest, State, Status)
+    ).
+
+% Fails when the clause is already satisfied at level 0; otherwise drops
+% the literals that level 0 has made false.
+cdcl_simplify_input([], _, []).
+cdcl_simplify_input([Lit|Lits], State, Remaining) :-
+    lit_value(State, Lit, Value),
+    Value =\= 1,
+    (
+        Value =:= -1 ->
+        Remaining = Rest ;
+        Remaining = [Lit|Rest]
+    ),
+    cdcl_simplify_input(Lits, State, Rest).
+
+cdcl_add_input_clause([], _, conflict).
+cdcl_add_input_clause([Lit], State, Status) :-
+    !,
+    lit_value(State, Lit, Value),
+    (
+        Value =:= 1 ->
+        Status = ok ;
+        Value =:= -1 ->
+        Status = conflict ;
+        cdcl_assign(State, Lit, 0),
+        cdcl_count(propagations, State),
+        Status = ok
+    ).
+cdcl_add_input_clause([First, Second|Rest], State, ok) :-
+    Clause =.. [c, First, Second|Rest],
+    cdcl_store_clause(State, Clause, Id),
+    cdcl_add_watch(State, First, Id),
+    cdcl_add_watch(State, Second, Id).
+
+% % % % % % % % % % % % %
+
+cdcl_propagate(_, [], ok).
+cdcl_propagate(State, [Lit|Queue], Status) :-
+    False is -Lit,
+    watch_index(False, Index),
+    cdcl_get(watches, State, Watches),
+    arg(Index, Watches, Watching),
+    cdcl_visit_watches(Watching, State, False, Kept, Queue, NextQueue, VisitStatus),
+    setarg(Index, Watches, Kept),
+    (
+        VisitStatus = conflict(_) ->
+        Status = VisitStatus ;
+        cdcl_propagate(State, NextQueue, Status)
+    ).
+
+cdcl_visit_watches([], _, _, [], Queue, Queue, ok).
+cdcl_visit_watches([Id|Ids], State, False, Kept, Queue0, Queue, Status) :-
+    cdcl_clause(State, Id, Clause),
+    cdcl_watch_second(Clause, False),
+    arg(1, Clause, First),
+    lit_value(State, First, FirstValue),
+    functor(Clause, _, Length),
+    (
+        FirstValue =:= 1 ->
+        Kept = [Id|Rest],
+        cdcl_visit_watches(Ids, State, False, Rest, Queue0, Queue, Status) ;
+        cdcl_find_watch(3, Length, Clause, State, Position) ->
+        arg(Position, Clause, NewWatch),
+        setarg(Position, Clause, False),
+        setarg(2, Clause, NewWatch),
+        cdcl_add_watch(State, NewWatch, Id),
+        cdcl_visit_watches(Ids, State, False, Kept, Queue0, Queue, Status) ;
+        FirstValue =:= 0 ->
+        cdcl_assign(State, First, Id),
+        cdcl_count(propagations, State),
+        Kept = [Id|Rest],
+        cdcl_visit_watches(Ids, State, False, Rest, [First|Queue0], Queue, Status) ;
+        Kept = [Id|Ids],
+        Queue = Queue0,
+        Status = conflict(Id)
+    ).
+
+cdcl_watch_second(Clause, False) :-
+    (
+        arg(1, Clause, False) ->
+        arg(2, Clause, Other),
+        setarg(1, Clause, Other),
+        setarg(2, Clause, False) ;
+        true
+    ).
+
+cdcl_find_watch(Position, Length, Clause, State, Found) :-
+    Position =< Length,
+    arg(Position, Clause, Lit),
+    lit_value(State, Lit, Value),
+    (
+        Value =\= -1 ->
+        Found = Position ;
+        Next is Position + 1,
+        cdcl_find_watch(Next, Length, Clause, State, Found)
+    ).
+
+% % % % % % % % % % % % %
+
+cdcl_analyze(State, ConflictId, [Asserting|Others], BackLevel) :-
+    cdcl_get(level, State, Level),
+    cdcl_get(trail, State, Trail),
+    cdcl_clause_literals(State, ConflictId, Lits),
+    empty_assoc(Seen0),
+    cdcl_analyze_lits(Lits, 0, State, Level, Seen0-0-[], Seen1-Count1-Lower1),
+    cdcl_analyze_trail(Trail, State, Level, Seen1, Count1, Lower1, UIP, Lower),
+    Asserting is -UIP,
+    cdcl_order_by_level(Lower, State, Others, BackLevel).
+
+cdcl_analyze_lits([], _, _, _, Acc, Acc).
+cdcl_analyze_lits([Lit|Lits], SkipVar, State, Level, Seen0-Count0-Lower0, Acc) :-
+    Var is abs(Lit),
+    var_level(State, Var, VarLevel),
+    (
+        (Var =:= SkipVar ; VarLevel =:= 0 ; get_assoc(Var, Seen0, _)) ->
+        Next = Seen0-Count0-Lower0 ;
+        put_assoc(Var, Seen0, true, Seen1),
+        cdcl_bump_activity(State, Var),
+        (
+            VarLevel =:= Level ->
+            Count1 is Count0 + 1,
+            Next = Seen1-Count1-Lower0 ;
+            Next = Seen1-Count0-[Lit|Lower0]
+        )
+    ),
+    cdcl_analyze_lits(Lits, SkipVar, State, Level, Next, Acc).
+
+cdcl_analyze_trail([Lit|Trail], State, Level, Seen, Count, Lower0, UIP, Lower) :-
+    Var is abs(Lit),
+    (
+        get_assoc(Var, Seen, _) ->
+        Count1 is Count - 1,
+        (
+            Count1 =:= 0 ->
+            UIP = Lit,
+            Lower = Lower0 ;
+            cdcl_get(reasons, State, Reasons),
+            arg(Var, Reasons, Reason),
+            cdcl_clause_literals(State, Reason, Lits),
+            cdcl_analyze_lits(Lits, Var, State, Level, Seen-Count1-Lower0, Seen2-Count2-Lower2),
+            cdcl_analyze_trail(Trail, State, Level, Seen2, Count2, Lower2, UIP, Lower)
+        ) ;
+        cdcl_analyze_trail(Trail, State, Level, Seen, Count, Lower0, UIP, Lower)
+    ).
+
+cdcl_literal_level(State, Lit, Level) :-
+    Var is abs(Lit),
+    var_level(State, Var, Level).
+
+cdcl_order_by_level([], _, [], 0).
+cdcl_order_by_level([Lit|Lits], State, Ordered, BackLevel) :-
+    maplist(cdcl_literal_level(State), [Lit|Lits], Levels),
+    pairs_keys_values(Pairs, Levels, [Lit|Lits]),
+    keysort(Pairs, Ascending),
+    reverse(Ascending, Descending),
+    Descending = [BackLevel-_|_],
+    pairs_values(Descending, Ordered).
+
+cdcl_bump_activity(State, Var) :-
+    cdcl_get(activity, State, Activity),
+    cdcl_get(act_inc, State, Inc),
+    arg(Var, Activity, Score0),
+    Score is Score0 + Inc,
+    setarg(Var, Activity, Score),
+    cdcl_heap_bumped(State, Var),
+    (Score > 1.0e100 -> cdcl_rescale_activity(State) ; true).
+
+cdcl_rescale_activity(State) :-
+    cdcl_get(nvars, State, NVars),
+    cdcl_get(activity, State, Activity),
+    cdcl_rescale_scores(1, NVars, Activity),
+    cdcl_get(act_inc, State, Inc0),
+    Inc is Inc0 * 1.0e-100,
+    cdcl_set(act_inc, State, Inc).
+
+% A loop rather than forall/2, so the setarg/3 calls survive and are only
+% undone together with the heap when the search backtracks.
+cdcl_rescale_scores(Var, NVars, _) :-
+    Var > NVars,
+    !.
+cdcl_rescale_scores(Var, NVars, Activity) :-
+    arg(Var, Activity, Score0),
+    Score is Score0 * 1.0e-100,
+    setarg(Var, Activity, Score),
+    Next is Var + 1,
+    cdcl_rescale_scores(Next, NVars, Activity).
+
+cdcl_decay_activity(State) :-
+    cdcl_get(act_inc, State, Inc0),
+    Inc is Inc0 / 0.95,
+    cdcl_set(act_inc, State, Inc).
+
+cdcl_backjump(State, BackLevel) :-
+    cdcl_get(trail, State, Trail),
+    cdcl_unwind(Trail, State, BackLevel, Rest),
+    cdcl_set(trail, State, Rest),
+    cdcl_set(level, State, BackLevel).
+
+cdcl_unwind([], _, _, []).
+cdcl_unwind([Lit|Trail], State, BackLevel, Rest) :-
+    Var is abs(Lit),
+    var_level(State, Var, Level),
+    (
+        Level > BackLevel ->
+        cdcl_get(values, State, Values),
+        arg(Var, Values, Value),
+        cdcl_get(phases, State, Phases),
+        setarg(Var, Phases, Value),
+        setarg(Var, Values, 0),
+        cdcl_get(reasons, State, Reasons),
+        setarg(Var, Reasons, 0),
+        cdcl_heap_insert(State, Var),
+        cdcl_unwind(Trail, State, BackLevel, Rest) ;
+        Rest = [Lit|Trail]
+    ).
+
+cdcl_learn(State, [Lit], Lit) :-
+    !,
+    cdcl_assign(State, Lit, 0),
+    cdcl_count(propagations, State).
+cdcl_learn(State, [Lit, Second|Rest], Lit) :-
+    Clause =.. [c, Lit, Second|Rest],
+    cdcl_store_clause(State, Clause, Id),
+    cdcl_add_watch(State, Lit, Id),
+    cdcl_add_watch(State, Second, Id),
+    cdcl_count(learned, State),
+    cdcl_assign(State, Lit, Id),
+    cdcl_count(propagations, State).
+
+% % % % % % % % % % % % %
+
+cdcl_pick_branch(State, Lit) :-
+    cdcl_get(options, State, opts(Branching, Phase, _)),
+    cdcl_branch_var(Branching, State, Var),
+    cdcl_phase(Phase, State, Var, Lit).
+
+cdcl_branch_var(scan, State, Var) :-
+    cdcl_get(nvars, State, NVars),
+    cdcl_get(values, State, Values),
+    cdcl_get(activity, State, Activity),
+    cdcl_best_unassigned(1, NVars, Values, Activity, 0, -1.0, Var),
+    Var > 0.
+cdcl_branch_var(heap, State, Var) :-
+    cdcl_heap_pop(State, Top),
+    cdcl_get(values, State, Values),
+    (arg(Top, Values, 0) -> Var = Top ; cdcl_branch_var(heap, State, Var)).
+
+cdcl_phase(negative, _, Var, Lit) :-
+    Lit is -Var.
+cdcl_phase(saved, State, Var, Lit) :-
+    cdcl_get(phases, State, Phases),
+    arg(Var, Phases, Saved),
+    (Saved =:= 1 -> Lit = Var ; Lit is -Var).
+
+cdcl_best_unassigned(Var, NVars, _, _, Best, _, Best) :-
+    Var > NVars,
+    !.
+cdcl_best_unassigned(Var, NVars, Values, Activity, Best0, Score0, Best) :-
+    Next is Var + 1,
+    (
+        arg(Var, Values, 0),
+        arg(Var, Activity, Score),
+        Score > Score0 ->
+        cdcl_best_unassigned(Next, NVars, Values, Activity, Var, Score, Best) ;
+        cdcl_best_unassigned(Next, NVars, Values, Activity, Best0, Score0, Best)
+    ).
+
+% % % % % % % % % % % % %
+% Activity heap: heap(Size, Slots, Positions), a binary max-heap of atoms
+% ordered by activity. Positions maps an atom to its slot, 0 when it is
+% not in the heap. Assigned atoms are only dropped when they reach the
+% top, and backjumping puts unassigned atoms back.
+
+cdcl_heap_insert(State, Var) :-
+    cdcl_get(heap, State, Heap),
+    (
+        Heap = heap(Size0, Slots, Positions),
+        arg(Var, Positions, 0) ->
+        Size is Size0 + 1,
+        setarg(1, Heap, Size),
+        setarg(Size, Slots, Var),
+        setarg(Var, Positions, Size),
+        cdcl_heap_up(State, Heap, Size) ;
+        true
+    ).
+
+cdcl_heap_bumped(State, Var) :-
+    cdcl_get(heap, State, Heap),
+    (
+        Heap = heap(_, _, Positions),
+        arg(Var, Positions, Slot),
+        Slot > 0 ->
+        cdcl_heap_up(State, Heap, Slot) ;
+        true
+    ).
+
+cdcl_heap_pop(State, Var) :-
+    cdcl_get(heap, State, Heap),
+    Heap = heap(Size0, Slots, Positions),
+    Size0 > 0,
+    arg(1, Slots, Var),
+    arg(Size0, Slots, Last),
+    Size is Size0 - 1,
+    setarg(1, Heap, Size),
+    setarg(Var, Positions, 0),
+    (
+        Size > 0 ->
+        setarg(1, Slots, Last),
+        setarg(Last, Positions, 1),
+        cdcl_heap_down(State, Heap, 1) ;
+        true
+    ).
+
+cdcl_heap_up(State, Heap, Slot) :-
+    (
+        Slot > 1,
+        Parent is Slot // 2,
+        cdcl_heap_less(State, Heap, Parent, Slot) ->
+        cdcl_heap_swap(Heap, Parent, Slot),
+        cdcl_heap_up(State, Heap, Parent) ;
+        true
+    ).
+
+cdcl_heap_down(State, Heap, Slot) :-
+    Heap = heap(Size, _, _),
+    Left is 2 * Slot,
+    Right is Left + 1,
+    (
+        Left =< Size ->
+        (
+            Right =< Size,
+            cdcl_heap_less(State, Heap, Left, Right) ->
+            Child = Right ;
+            Child = Left
+        ),
+        (
+            cdcl_heap_less(State, Heap, Slot, Child) ->
+            cdcl_heap_swap(Heap, Slot, Child),
+            cdcl_heap_down(State, Heap, Child) ;
+            true
+        ) ;
+        true
+    ).
+
+cdcl_heap_less(State, heap(_, Slots, _), Slot1, Slot2) :-
+    cdcl_get(activity, State, Activity),
+    arg(Slot1, Slots, Var1),
+    arg(Slot2, Slots, Var2),
+    arg(Var1, Activity, Score1),
+    arg(Var2, Activity, Score2),
+    Score1 < Score2.
+
+cdcl_heap_swap(heap(_, Slots, Positions), Slot1, Slot2) :-
+    arg(Slot1, Slots, Var1),
+    arg(Slot2, Slots, Var2),
+    setarg(Slot1, Slots, Var2),
+    setarg(Slot2, Slots, Var1),
+    setarg(Var2, Positions, Slot1),
+    setarg(Var1, Positions, Slot2).
+
+% % % % % % % % % % % % %
+% Restarts: once the conflicts since the last restart reach the current
+% limit, the search backjumps to level 0 and keeps its learned clauses,
+% activities and saved phases.
+
+cdcl_restart_due(State) :-
+    cdcl_get(restart_limit, State, Limit),
+    integer(Limit),
+    cdcl_get(level, State, Level),
+    Level > 0,
+    cdcl_get(conflicts, State, Conflicts),
+    cdcl_get(restart_base, State, Base),
+    Conflicts - Base >= Limit.
+
+cdcl_restart(State) :-
+    cdcl_backjump(State, 0),
+    cdcl_count(restarts, State),
+    cdcl_get(conflicts, State, Conflicts),
+    cdcl_set(restart_base, State, Conflicts),
+    cdcl_count(restart_index, State),
+    cdcl_get(restart_index, State, Index),
+    cdcl_get(options, State, opts(_, _, Schedule)),
+    cdcl_restart_limit(Schedule, Index, Limit),
+    cdcl_set(restart_limit, State, Limit).
+
+cdcl_restart_limit(none, _, none).
+cdcl_restart_limit(luby(Unit), Index, Limit) :-
+    cdcl_luby(Index, Factor),
+    Limit is Unit * Factor.
+cdcl_restart_limit(geometric(First, Factor), Index, Limit) :-
+    Limit is round(First * Factor ** (Index - 1)).
+
+% 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ...
+cdcl_luby(Index, Value) :-
+    cdcl_luby_size(Index, 1, Size),
+    (
+        Index =:= (1 << Size) - 1 ->
+        Value is 1 << (Size - 1) ;
+        Next is Index - (1 << (Size - 1)) + 1,
+        cdcl_luby(Next, Value)
+    ).
+
+cdcl_luby_size(Index, Size0, Size) :-
+    (
+        (1 << Size0) - 1 >= Index ->
+        Size = Size0 ;
+        Size1 is Size0 + 1,
+        cdcl_luby_size(Index, Size1, Size)
+    ).
+
+% % % % % % % % % % % % %
+
+cdcl_search(State, Queue, Outcome) :-
+    cdcl_propagate(State, Queue, Status),
+    (
+        Status = conflict(ConflictId) ->
+        cdcl_count(conflicts, State),
+        cdcl_note_progress(State),
+        cdcl_get(level, State, Level),
+        (
+            Level =:= 0 ->
+            Outcome = unsat ;
+            cdcl_analyze(State, ConflictId, Learnt, BackLevel),
+            cdcl_backjump(State, BackLevel),
+            cdcl_learn(State, Learnt, Asserting),
+            cdcl_decay_activity(State),
+            cdcl_search(State, [Asserting], Outcome)
+        ) ;
+        cdcl_restart_due(State) ->
+        cdcl_restart(State),
+        cdcl_search(State, [], Outcome) ;
+        cdcl_get(assumptions, State, Assumptions),
+        cdcl_pending_assumption(Assumptions, State, Pending) ->
+        (
+            Pending = failed(Core) ->
+            Outcome = failed(Core) ;
+            Pending = decide(Lit),
+            cdcl_decide(State, Lit, Outcome)
+        ) ;
+        stats_time(heuristic_time, cdcl_pick_branch(State, Lit)) ->
+        cdcl_decide(State, Lit, Outcome) ;
+        Outcome = sat
+    ).
+
+% Budget progress, recorded at conflicts where the trail is longest.
+cdcl_note_progress(State) :-
+    (
+        budget_active ->
+        cdcl_get(decisions, State, Decisions),
+        cdcl_get(propagations, State, Propagations),
+        budget_note(decisions, Decisions),
+        budget_note(propagations, Propagations),
+        cdcl_get(trail, State, Trail),
+        budget_note_assignment(Trail) ;
+        true
+    ).
+
+cdcl_decide(State, Lit, Outcome) :-
+    cdcl_count(decisions, State),
+    progress_tick(decisions),
+    cdcl_get(level, State, Level0),
+    Level1 is Level0 + 1,
+    cdcl_set(level, State, Level1),
+    cdcl_assign(State, Lit, 0),
+    cdcl_search(State, [Lit], Outcome).
+
+% Assumptions are decided, in order, before any heuristic decision. An
+% assumption that is already false ends the search with the subset of
+% assumptions that forced it.
+cdcl_pending_assumption([Lit|Lits], State, Pending) :-
+    lit_value(State, Lit, Value),
+    (
+        Value =:= 1 ->
+        cdcl_pending_assumption(Lits, State, Pending) ;
+        Value =:= 0 ->
+        Pending = decide(Lit) ;
+        cdcl_final_core(State, Lit, Core),
+        Pending = failed(Core)
+    ).
+
+cdcl_final_core(State, Assumption, Core) :-
+    Var is abs(Assumption),
+    var_level(State, Var, Level),
+    (
+        Level =:= 0 ->
+        Core = [Assumption] ;
+        cdcl_get(trail, State, Trail),
+        empty_assoc(Seen0),
+        put_assoc(Var, Seen0, true, Seen),
+        cdcl_final_trail(Trail, State, Seen, [Assumption], Core)
+    ).
+
+cdcl_final_trail([], _, _, Core, Core).
+cdcl_final_trail([Lit|Trail], State, Seen0, Core0, Core) :-
+    Var is abs(Lit),
+    (
+        get_assoc(Var, Seen0, _) ->
+        cdcl_get(reasons, State, Reasons),
+        arg(Var, Reasons, Reason),
+        (
+            Reason =:= 0 ->
+            Seen = Seen0,
+            Core1 = [Lit|Core0] ;
+            cdcl_clause_literals(State, Reason, Lits),
+            foldl(cdcl_mark_seen(State), Lits, Seen0, Seen),
+            Core1 = Core0
+        ),
+        cdcl_final_trail(Trail, State, Seen, Core1, Core) ;
+        cdcl_final_trail(Trail, State, Seen0, Core0, Core)
+    ).
+
+cdcl_mark_seen(State, Lit, Seen0, Seen) :-
+    Var is abs(Lit),
+    var_level(State, Var, Level),
+    (
+        Level =:= 0 ->
+        Seen = Seen0 ;
+        put_assoc(Var, Seen0, true, Seen)
+    ).
+
+cdcl_model(Var, NVars, _, []) :-
+    Var > NVars,
+    !.
+cdcl_model(Var, NVars, Values, [Var/Value|Model]) :-
+    arg(Var, Values, VarValue),
+    (VarValue =:= 1 -> Value = true ; Value = false),
+    Next is Var + 1,
+    cdcl_model(Next, NVars, Values, Model).
+
+cdcl_result(unsat, _, no).
+cdcl_result(sat, State, yes(Model)) :-
+    cdcl_get(nvars, State, NVars),
+    cdcl_get(values, State, Values),
+    cdcl_model(1, NVars, Values, Model).
+
+cdcl_solve(Clauses, NVars, Result, Decisions, Propagations) :-
+    cdcl_strategy(cdcl, Options),
+    cdcl_solve(Clauses, NVars, Options, Result, Decisions, Propagations).
+
+cdcl_solve(Clauses, NVars, Options, Result, Decisions, Propagations) :-
+    cdcl_new_state(NVars, Options, State),
+    cdcl_add_input(Clauses, State, Status),
+    (
+        Status == conflict ->
+        Outcome = unsat ;
+        cdcl_get(trail, State, Queue),
+        cdcl_search(State, Queue, Outcome)
+    ),
+    cdcl_result(Outcome, State, Result),
+    cdcl_get(decisions, State, Decisions),
+    cdcl_get(propagations, State, Propagations),
+    cdcl_record_stats(State).
+
+cdcl_record_stats(State) :-
+    forall(
+        member(Field, [decisions, propagations, conflicts, learned, restarts]),
+        (cdcl_get(Field, State, Count), stats_add(Field, Count))
+    ).
@@ -0,0 +1,123 @@
+% DIMACS CNF input and output. The reader works line by line on the
+% stream and produces the integer encoding used by davis_putnam_encoded/6
+% directly, so large benchmark files never go through read_term/3.
+% Variable N is named xN when a symbolic clause list is needed. A token
+% that is not an integer raises syntax_error(dimacs(Line, Token)).
+
+read_dimacs_file(FileName, Clauses, NVars) :-
+    setup_call_cleanup(
+        open(FileName, read, Stream),
+        read_dimacs_stream(Stream, Clauses, NVars),
+        close(Stream)
+    ).
+
+read_dimacs_stream(Stream, Clauses, NVars) :-
+    read_line_to_string(Stream, Line),
+    dimacs_lines(Line, 1, Stream, [], 0, Clauses, NVars).
+
+dimacs_lines(end_of_file, _, _, Partial, NVars, Clauses, NVars) :-
+    !,
+    (
+        Partial == [] ->
+        Clauses = [] ;
+        sort(Partial, Clause),
+        Clauses = [Clause]
+    ).
+dimacs_lines(Line, LineNo, Stream, Partial, Vars0, Clauses, NVars) :-
+    split_string(Line, " \t", " \t\r", Tokens0),
+    exclude(==(""), Tokens0, Tokens),
+    (
+        Tokens = ["%"|_] ->
+        dimacs_lines(end_of_file, LineNo, Stream, Partial, Vars0, Clauses, NVars) ;
+        dimacs_line(Tokens, LineNo, Partial, Partial1, Vars0, Vars1, Clauses, Clauses1),
+        read_line_to_string(Stream, Next),
+        NextNo is LineNo + 1,
+        dimacs_lines(Next, NextNo, Stream, Partial1, Vars1, Clauses1, NVars)
+    ).
+
+dimacs_line([], _, Partial, Partial, Vars, Vars, Clauses, Clauses) :-
+    !.
+dimacs_line([First|_], _, Partial, Partial, Vars, Vars, Clauses, Clauses) :-
+    sub_string(First, 0, 1, _, "c"),
+    !.
+dimacs_line(["p"|Header], LineNo, Partial, Partial, Vars0, Vars, Clauses, Clauses) :-
+    !,
+    (
+        Header = ["cnf", VarsStr, ClausesStr] ->
+        dimacs_integer(VarsStr, LineNo, Declared),
+        dimacs_integer(ClausesStr, LineNo, _),
+        Vars is max(Vars0, Declared) ;
+        atomic_list_concat(["p"|Header], ' ', Token),
+        syntax_error(dimacs(LineNo, Token))
+    ).
+dimacs_line(Tokens, LineNo, Partial0, Partial, Vars0, Vars, Clauses0, Clauses) :-
+    dimacs_literals(Tokens, LineNo, Partial0, Partial, Vars0, Vars, Clauses0, Clauses).
+
+dimacs_integer(Token, LineNo, Int) :-
+    (
+        catch(number_string(Int, Token), error(syntax_error(_), _), fail),
+        integer(Int) ->
+        true ;
+        syntax_error(dimacs(LineNo, Token))
+    ).
+
+dimacs_literals([], _, Partial, Partial, Vars, Vars, Clauses, Clauses).
+dimacs_literals([Token|Tokens], LineNo, Partial0, Partial, Vars0, Vars, Clauses0, Clauses) :-
+    dimacs_integer(Token, LineNo, Lit),
+    (
+        Lit =:= 0 ->
+        sort(Partial0, Clause),
+        Clauses0 = [Clause|Clauses1],
+        Partial1 = [],
+        Vars1 = Vars0 ;
+        Clauses1 = Clauses0,
+        Partial1 = [Lit|Partial0],
+        Vars1 is max(Vars0, abs(Lit))
+    ),
+    dimacs_literals(Tokens, LineNo, Partial1, Partial, Vars1, Vars, Clauses1, Clauses).
+
+dimacs_atom(Var, Atom) :-
+    format(atom(Atom), 'x~d', [Var]).
+
+dimacs_atoms(NVars, Atoms) :-
+    numlist(1, NVars, Vars),
+    maplist(dimacs_atom, Vars, Atoms).
+
+read_dimacs_kb(FileName, Clauses) :-
+    read_dimacs_file(FileName, Encoded, NVars),
+    dimacs_atoms(NVars, Atoms),
+    Table =.. [atoms|Atoms],
+    maplist(maplist(dimacs_literal(Table)), Encoded, Clauses).
+
+dimacs_literal(Table, Int, Lit) :-
+    Var is abs(Int),
+    arg(Var, Table, Atom),
+    (Int < 0 -> Lit = neg(Atom) ; Lit = Atom).
+
+% % % % % % % % % % % % %
+
+write_dimacs_file(FileName, Clauses) :-
+    encode_kb(Clauses, Encoded, Atoms),
+    length(Atoms, NVars),
+    setup_call_cleanup(
+        open(FileName, write, Stream),
+        write_dimacs_stream(Stream, Encoded, NVars, Atoms),
+        close(Stream)
+    ).
+
+write_dimacs_stream(Stream, Encoded, NVars, Atoms) :-
+    length(Encoded, NClauses),
+    forall(
+        nth1(Var, Atoms, Atom),
+        format(Stream, 'c ~d ~q~n', [Var, Atom])
+    ),
+    format(Stream, 'p cnf ~d ~d~n', [NVars, NClauses]),
+    forall(member(Clause, Encoded), write_dimacs_clause(Stream, Clause)).
+
+write_dimacs_clause(Stream, Clause) :-
+    forall(member(Lit, Clause), format(Stream, '~d ', [Lit])),
+    format(Stream, '0~n', []).
+
+export_kb_to_dimacs(KbFile, CnfFile) :-
+    read_kb_from_file(KbFile, Clauses),
+    write_dimacs_file(CnfFile, Clauses).
@@ -0,0 +1,193 @@
+% Cube and conquer for the list-based DP strategies. The search tree is
+% split to depth Depth with the strategy's own branching heuristic, each
+% split being the bullet_op pair dp_branch/6 would make, with propagation
+% on every node. The open leaves (cubes) are then solved by dp_search/5
+% on a pool of Threads worker threads through concurrent/3. A cube that
+% finds a model throws it, which makes concurrent/3 stop the other cubes.
+%
+% Steps and propagations count the split nodes exactly as dp_branch/6
+% would, plus the totals of every cube that finished, so an UNSAT answer
+% reports the same totals as the sequential search. On SAT the cubes
+% stopped early add nothing.
+%
+% Under with_budget/3 the time limit of the calling thread stops the whole
+% pool. The other limits are copied into every cube, which runs under its
+% own with_budget/3, so an inference limit counts each cube on its own. A
+% cube that runs out hands its progress back and the run ends unknown.
+
+:- ensure_loaded(cdcl_sat).
+
+% Per Prolog thread, like the progress and stats hooks; Threads = 1
+% leaves dp_solve/5 in charge.
+set_dp_cubes(Depth, Threads) :-
+    must_be(nonneg, Depth),
+    must_be(positive_integer, Threads),
+    nb_setval(dp_cubes, Depth-Threads).
+
+set_dp_threads(Threads) :-
+    dp_cube_depth(Threads, Depth),
+    set_dp_cubes(Depth, Threads).
+
+dp_cubes(Depth, Threads) :-
+    (nb_current(dp_cubes, Depth-Threads) -> true ; Depth = 0, Threads = 1).
+
+% Runs Goal with set_dp_threads(Threads) and puts the thread's previous
+% setting back afterwards, so one call's thread count does not carry over.
+with_dp_threads(Threads, Goal) :-
+    (nb_current(dp_cubes, Saved) -> true ; Saved = none),
+    setup_call_cleanup(set_dp_threads(Threads), Goal, dpc_restore_cubes(Saved)).
+
+dpc_restore_cubes(none) :-
+    !,
+    nb_delete(dp_cubes).
+dpc_restore_cubes(Saved) :-
+    nb_setval(dp_cubes, Saved).
+
+% About four cubes per thread, so refuted cubes do not leave threads idle.
+dp_cube_depth(Threads, Depth) :-
+    Depth is msb(4 * Threads).
+
+dpc_solve(Strategy, Clauses, Depth, Threads, Result, Steps, Propagations) :-
+    new_array(counts, 2, 0, Counts),
+    build_occurrence_index(Clauses, Index),
+    dpc_split(Strategy, Depth, Index, [], Counts, [], Leaves),
+    (
+        Leaves = [sat(Model)|_] ->
+        Result = yes(Model),
+        CubeSteps = 0,
+        CubeProps = 0 ;
+        reverse(Leaves, Cubes),
+        dpc_conquer(Strategy, Threads, Cubes, Result, CubeSteps, CubeProps)
+    ),
+    arg(1, Counts, SplitSteps),
+    arg(2, Counts, SplitProps),
+    Steps is SplitSteps + CubeSteps,
+    Propagations is SplitProps + CubeProps.
+
+dpc_add(Counts, Index, N) :-
+    arg(Index, Counts, Count0),
+    Count is Count0 + N,
+    nb_setarg(Index, Counts, Count).
+
+% Leaves are sat(Path) for a satisfied branch or cube(Path, Index) for an
+% open one; refuted branches are dropped. Path holds the assignments made
+% on the way down. Splitting stops at the first sat(Path) leaf, which is
+% then at the head of Leaves.
+dpc_split(Strategy, Depth, Index, Path0, Counts, Leaves0, Leaves) :-
+    propagate(Index, Simplified, Forced, Propagated),
+    dpc_add(Counts, 2, Propagated),
+    append(Path0, Forced, Path),
+    budget_note_assignment(Path),
+    (
+        index_satisfied(Simplified) ->
+        dpc_add(Counts, 1, 1),
+        Leaves = [sat(Path)|Leaves0] ;
+        index_has_empty_clause(Simplified) ->
+        dpc_add(Counts, 1, 1),
+        Leaves = Leaves0 ;
+        Depth =:= 0 ->
+        Leaves = [cube(Path, Simplified)|Leaves0] ;
+        dpc_add(Counts, 1, 1),
+        stats_time(heuristic_time, select_branch_atom(Strategy, Simplified, Atom)),
+        progress_tick(decisions),
+        stats_count(decisions),
+        Depth1 is Depth - 1,
+        stats_count(bullet_ops),
+        bullet_op_indexed(Atom, Simplified, Index1),
+        append(Path, [Atom/true], Path1),
+        dpc_split(Strategy, Depth1, Index1, Path1, Counts, Leaves0, Leaves1),
+        (
+            Leaves1 = [sat(_)|_] ->
+            Leaves = Leaves1 ;
+            neg(Atom, NegAtom),
+            stats_count(bullet_ops),
+            bullet_op_indexed(NegAtom, Simplified, Index2),
+            append(Path, [Atom/false], Path2),
+            dpc_split(Strategy, Depth1, Index2, Path2, Counts, Leaves1, Leaves)
+        )
+    ).
+
+dpc_conquer(Strategy, Threads, Cubes, Result, Steps, Propagations) :-
+    (nb_current(engine_stats, _) -> Counting = true ; Counting = false),
+    (nb_current(progress_id, Progress) -> true ; Progress = none),
+    dpc_cube_budget(Limits),
+    message_queue_create(Queue),
+    maplist(dpc_cube_goal(Strategy, Queue, Counting, Progress, Limits), Cubes, Goals),
+    call_cleanup(
+        (
+            catch(concurrent(Threads, Goals, []), Stop, dpc_stopped(Stop, Model, Exhausted)),
+            dpc_collect(Queue, Counting, 0, Steps, 0, Propagations)
+        ),
+        message_queue_destroy(Queue)
+    ),
+    (
+        nonvar(Exhausted) ->
+        throw(budget_exceeded(Exhausted)) ;
+        nonvar(Model) ->
+        Result = yes(Model) ;
+        Result = no
+    ).
+
+dpc_cube_goal(Strategy, Queue, Counting, Progress, Limits, Cube, dpc_cube(Strategy, Queue, Counting, Progress, Limits, Cube)).
+
+% Every limit of the caller's budget but time, which is left to the caller.
+dpc_cube_budget(Limits) :-
+    (nb_current(budget_limits, Budget) -> true ; Budget = []),
+    exclude(dpc_caller_limit, Budget, Limits).
+
+dpc_caller_limit(time(_)).
+
+dpc_stopped(dpc_model(Model), Model, _) :-
+    !.
+dpc_stopped(dpc_budget(Reason, Progress), _, Reason) :-
+    !,
+    forall(member(Name-Value, Progress), dpc_note_progress(Name, Value)).
+dpc_stopped(Error, _, _) :-
+    throw(Error).
+
+dpc_note_progress(assigned, _) :-
+    !.
+dpc_note_progress(assignment, Assignment) :-
+    !,
+    budget_note_assignment(Assignment).
+dpc_note_progress(Name, Value) :-
+    budget_note(Name, Value).
+
+% Runs in a pool thread, which has no stats counters, progress id or budget
+% of its own: they are set up here and the counters go back with the cube
+% totals. Path is passed down so the cube's partial assignment is complete.
+dpc_cube(Strategy, Queue, Counting, Progress, Limits, cube(Path, Index)) :-
+    (Counting == true -> stats_enable ; true),
+    (Progress == none -> true ; nb_setval(progress_id, Progress)),
+    with_budget(Limits, dp_search(Strategy, Index, Path, Result, Steps, Propagations), Outcome),
+    (Counting == true -> nb_getval(engine_stats, Counters) ; Counters = none),
+    (
+        Outcome = unknown(Reason, CubeProgress) ->
+        thread_send_message(Queue, done(0, 0, Counters)),
+        throw(dpc_budget(Reason, CubeProgress)) ;
+        true
+    ),
+    thread_send_message(Queue, done(Steps, Propagations, Counters)),
+    (
+        Result = yes(Model) ->
+        append(Path, Model, FullModel),
+        throw(dpc_model(FullModel)) ;
+        true
+    ).
+
+dpc_collect(Queue, Counting, Steps0, Steps, Props0, Props) :-
+    (
+        thread_get_message(Queue, done(CubeSteps, CubeProps, Counters), [timeout(0)]) ->
+        (Counting == true -> dpc_add_stats(Counters) ; true),
+        Steps1 is Steps0 + CubeSteps,
+        Props1 is Props0 + CubeProps,
+        dpc_collect(Queue, Counting, Steps1, Steps, Props1, Props) ;
+        Steps = Steps0,
+        Props = Props0
+    ).
+
+dpc_add_stats(Counters) :-
+    forall(
+        stats_field(Name, I),
+        (arg(I, Counters, Value), stats_add(Name, Value))
+    ).
@@ -1,28 +1,42 @@
+:- ensure_loaded(cdcl_sat).
+:- ensure_loaded(progress).
+:- ensure_loaded(stats).
+:- ensure_loaded(dimacs).
+:- ensure_loaded(dp_trail).
+:- ensure_loaded(dp_cube).
+:- ensure_loaded(preprocess).
+:- ensure_loaded(budget).
+
 neg(neg(L), L) :- !.
+neg(L, N) :- integer(L), !, N is -L.
 neg(L, neg(L)).
 
 get_atom(neg(A), A) :- !.
+get_atom(L, A) :- integer(L), !, A is abs(L).
 get_atom(A, A).
 
-bullet_op([], _, []).
-bullet_op([Clause|Rest], Lit, Result) :-
+negative_literal(neg(_)) :- !.
+negative_literal(L) :- integer(L), L < 0.
+
+bullet_op(Clauses, Lit, Result) :-
     neg(Lit, NegLit),
-    (   
-        member(Lit, Clause) ->
-        bullet_op(Rest, Lit, Result) ;
-        member(NegLit, Clause) ->
-            select(NegLit, Clause, Reduced),
-            bullet_op(Rest, Lit, RestResult),
-            Result = [Reduced|RestResult] ;
-            bullet_op(Rest, Lit, RestResult),
-            Result = [Clause|RestResult]
-    ).
+    bullet_op(Clauses, Lit, NegLit, Result).
 
-collect_all_atoms([], []).
-collect_all_atoms([Clause|Rest], Atoms) :-
-    maplist(get_atom, Clause, ClauseAtoms),
-    collect_all_atoms(Rest, RestAtoms),
-    append(ClauseAtoms, RestAtoms, AllAtoms),
+bullet_op([], _, _, []).
+bullet_op([Clause|Rest], Lit, NegLit, Result) :-
+    (
+        memberchk(Lit, Clause) ->
+        Result = RestResult ;
+        memberchk(NegLit, Clause) ->
+        selectchk(NegLit, Clause, Reduced),
+        Result = [Reduced|RestResult] ;
+        Result = [Clause|RestResult]
+    ),
+    bullet_op(Rest, Lit, NegLit, RestResult).
+
+collect_all_atoms(Clauses, Atoms) :-
+    append(Clauses, Lits),
+    maplist(get_atom, Lits, AllAtoms),
     list_to_set(AllAtoms, Atoms).
 
 count_positive_negative([], _, 0, 0).
@@ -32,7 +46,8 @@ count_positive_negative([Clause|Rest], Atom, Pos, Neg) :-
         member(Atom, Clause) ->
             Pos is RestPos + 1,
             Neg = RestNeg ;
-            member(neg(Atom), Clause) ->
+            neg(Atom, NegAtom),
+            member(NegAtom, Clause) ->
                 Pos = RestPos,
                 Neg is RestNeg + 1 ;
                 Pos = RestPos,
@@ -73,36 +88,467 @@ atom_in_shortest_clause(Atom, Clauses) :-
 select_atom_shortest_clause(Clauses, Atom) :-
     atom_in_shortest_clause(Atom, Clauses).
 
-dp_solve(_, [], yes([]), 1).
-dp_solve(_, Clauses, no, 1) :-
-    member([], Clauses),
-    !.
-dp_solve(Strategy, Clauses, Result, TotalSteps) :-
-    call(Strategy, Clauses, Atom),
+% % % % % % % % % % % % %
+% Occurrence index: index(Occ, Balance, Lengths, Pure, Lits)
+%   Occ      Atom -> Pos-Neg literal occurrence counts
+%   Balance  Score-Atom ordered by abs(Pos - Neg)
+%   Lengths  Length-Clause multiset, shortest clause first
+%   Pure     Atom -> Lit for atoms occurring with one polarity only
+%   Lits     Lit -> multiset of the clauses containing it
+% The index holds the whole clause set: the search passes it alone, and
+% the bullet operator only visits the clauses listed under Lit and NegLit.
+
+empty_occurrence_index(index(Occ, Balance, Lengths, Pure, Lits)) :-
+    empty_assoc(Occ),
+    empty_assoc(Balance),
+    empty_assoc(Lengths),
+    empty_assoc(Pure),
+    empty_assoc(Lits).
+
+build_occurrence_index(Clauses, Index) :-
+    empty_occurrence_index(Empty),
+    foldl(index_add_clause, Clauses, Empty, Index).
+
+bag_add(Key, Bag0, Bag) :-
+    (get_assoc(Key, Bag0, Count0) -> Count is Count0 + 1 ; Count = 1),
+    put_assoc(Key, Bag0, Count, Bag).
+
+bag_remove(Key, Bag0, Bag) :-
+    get_assoc(Key, Bag0, Count0),
+    (
+        Count0 > 1 ->
+        Count is Count0 - 1,
+        put_assoc(Key, Bag0, Count, Bag) ;
+        del_assoc(Key, Bag0, _, Bag)
+    ).
+
+occurrence_update(Delta, Lit, index(Occ0, Bal0, Len, Pure0, Lits), index(Occ, Bal, Len, Pure, Lits)) :-
+    get_atom(Lit, Atom),
+    (
+        get_assoc(Atom, Occ0, Pos0-Neg0) ->
+        Score0 is abs(Pos0 - Neg0),
+        del_assoc(Score0-Atom, Bal0, _, Bal1) ;
+        Pos0 = 0,
+        Neg0 = 0,
+        Bal1 = Bal0
+    ),
     (
+        negative_literal(Lit) ->
+        Pos = Pos0,
+        Neg is Neg0 + Delta ;
+        Pos is Pos0 + Delta,
+        Neg = Neg0
+    ),
+    (del_assoc(Atom, Pure0, _, Pure1) -> true ; Pure1 = Pure0),
+    (
+        Pos + Neg =:= 0 ->
+        (del_assoc(Atom, Occ0, _, Occ) -> true ; Occ = Occ0),
+        Bal = Bal1,
+        Pure = Pure1 ;
+        put_assoc(Atom, Occ0, Pos-Neg, Occ),
+        Score is abs(Pos - Neg),
+        put_assoc(Score-Atom, Bal1, true, Bal),
         (
-            bullet_op(Clauses, Atom, C1),
-            dp_solve(Strategy, C1, SubResult, Steps1),
-            SubResult = yes(Model)
-        ) ->
+            Neg =:= 0 ->
+            put_assoc(Atom, Pure1, Atom, Pure) ;
+            Pos =:= 0 ->
+            neg(Atom, NegAtom),
+            put_assoc(Atom, Pure1, NegAtom, Pure) ;
+            Pure = Pure1
+        )
+    ).
+
+clause_posting_add(Clause, Lit, Lits0, Lits) :-
+    (get_assoc(Lit, Lits0, Bag0) -> true ; empty_assoc(Bag0)),
+    bag_add(Clause, Bag0, Bag),
+    put_assoc(Lit, Lits0, Bag, Lits).
+
+clause_posting_remove(Clause, Lit, Lits0, Lits) :-
+    get_assoc(Lit, Lits0, Bag0),
+    bag_remove(Clause, Bag0, Bag),
+    (
+        empty_assoc(Bag) ->
+        del_assoc(Lit, Lits0, _, Lits) ;
+        put_assoc(Lit, Lits0, Bag, Lits)
+    ).
+
+index_add_clause(Clause, Index0, index(Occ, Bal, Len, Pure, Lits)) :-
+    foldl(occurrence_update(1), Clause, Index0, index(Occ, Bal, Len0, Pure, Lits0)),
+    length(Clause, Length),
+    bag_add(Length-Clause, Len0, Len),
+    foldl(clause_posting_add(Clause), Clause, Lits0, Lits).
+
+index_remove_clause(Clause, Index0, index(Occ, Bal, Len, Pure, Lits)) :-
+    foldl(occurrence_update(-1), Clause, Index0, index(Occ, Bal, Len0, Pure, Lits0)),
+    length(Clause, Length),
+    bag_remove(Length-Clause, Len0, Len),
+    foldl(clause_posting_remove(Clause), Clause, Lits0, Lits).
+
+index_shorten_clause(Clause, NegLit, Reduced, Index0, index(Occ, Bal, Len, Pure, Lits)) :-
+    occurrence_update(-1, NegLit, Index0, index(Occ, Bal, Len0, Pure, Lits0)),
+    length(Clause, Length),
+    Shorter is Length - 1,
+    bag_remove(Length-Clause, Len0, Len1),
+    bag_add(Shorter-Reduced, Len1, Len),
+    foldl(clause_posting_remove(Clause), Clause, Lits0, Lits1),
+    foldl(clause_posting_add(Reduced), Reduced, Lits1, Lits).
+
+index_has_empty_clause(index(_, _, Lengths, _, _)) :-
+    min_assoc(Lengths, 0-_, _).
+
+index_unit_literal(index(_, _, Lengths, _, _), Lit) :-
+    min_assoc(Lengths, 1-[Lit], _).
+
+index_pure_literal(index(_, _, _, Pure, _), Lit) :-
+    min_assoc(Pure, _, Lit).
+
+index_satisfied(index(_, _, Lengths, _, _)) :-
+    empty_assoc(Lengths).
+
+% The clause set as a list, for strategies without an indexed version.
+index_clauses(index(_, _, Lengths, _, _), Clauses) :-
+    assoc_to_list(Lengths, Counted),
+    findall(Clause, (member((_-Clause)-Count, Counted), between(1, Count, _)), Clauses).
+
+index_clauses_with(Lit, index(_, _, _, _, Lits), Clauses) :-
+    (
+        get_assoc(Lit, Lits, Bag) ->
+        assoc_to_list(Bag, Counted),
+        findall(Clause, (member(Clause-Count, Counted), between(1, Count, _)), Clauses) ;
+        Clauses = []
+    ).
+
+% Only the clauses containing Lit or NegLit are touched: the first are
+% satisfied and dropped, then the second lose NegLit.
+bullet_op_indexed(Lit, Index0, Index) :-
+    neg(Lit, NegLit),
+    index_clauses_with(Lit, Index0, Satisfied),
+    foldl(index_remove_clause, Satisfied, Index0, Index1),
+    index_clauses_with(NegLit, Index1, Shortened),
+    foldl(index_drop_literal(NegLit), Shortened, Index1, Index).
+
+index_drop_literal(NegLit, Clause, Index0, Index) :-
+    selectchk(NegLit, Clause, Reduced),
+    index_shorten_clause(Clause, NegLit, Reduced, Index0, Index).
+
+indexed_most_balanced(index(_, Balance, _, _, _), Atom) :-
+    min_assoc(Balance, _-Atom, _).
+
+indexed_shortest_clause(index(_, _, Lengths, _, _), Atom) :-
+    min_assoc(Lengths, _-[Lit|_], _),
+    get_atom(Lit, Atom).
+
+indexed_strategy(select_atom_most_balanced, indexed_most_balanced).
+indexed_strategy(select_atom_shortest_clause, indexed_shortest_clause).
+
+select_branch_atom(Strategy, Index, Atom) :-
+    (
+        indexed_strategy(Strategy, Indexed) ->
+        call(Indexed, Index, Atom) ;
+        index_clauses(Index, Clauses),
+        call(Strategy, Clauses, Atom)
+    ).
+
+% % % % % % % % % % % % %
+
+literal_assignment(Lit, Atom/false) :-
+    negative_literal(Lit),
+    !,
+    get_atom(Lit, Atom).
+literal_assignment(Atom, Atom/true).
+
+propagate(Index, Index, [], 0) :-
+    index_has_empty_clause(Index),
+    !.
+propagate(Index0, Index, [Assignment|Forced], Count) :-
+    (
+        index_unit_literal(Index0, Lit) ->
+        true ;
+        index_pure_literal(Index0, Lit)
+    ),
+    !,
+    literal_assignment(Lit, Assignment),
+    stats_count(propagations),
+    stats_count(bullet_ops),
+    bullet_op_indexed(Lit, Index0, Index1),
+    propagate(Index1, Index, Forced, RestCount),
+    Count is RestCount + 1.
+propagate(Index, Index, [], 0).
+
+add_forced(no, _, no).
+add_forced(yes(Model), Forced, yes(FullModel)) :-
+    append(Forced, Model, FullModel).
+
+dp_solve(Strategy, Clauses, Result, Steps) :-
+    dp_solve(Strategy, Clauses, Result, Steps, _).
+
+dp_solve(Strategy, Clauses, Result, Steps, Propagations) :-
+    build_occurrence_index(Clauses, Index),
+    dp_search(Strategy, Index, Result, Steps, Propagations).
+
+dp_search(Strategy, Index, Result, Steps, Propagations) :-
+    dp_search(Strategy, Index, [], Result, Steps, Propagations).
+
+% Path is the assignment made above this node, kept for the budget's
+% longest partial assignment. Forced literals are only added to it while a
+% budget is active.
+dp_search(Strategy, Index, Path0, Result, Steps, Propagations) :-
+    propagate(Index, Simplified, Forced, Propagated),
+    (
+        budget_active ->
+        append(Forced, Path0, Path),
+        budget_note_assignment(Path) ;
+        Path = Path0
+    ),
+    dp_branch(Strategy, Simplified, Path, SubResult, Steps, SubPropagations),
+    add_forced(SubResult, Forced, Result),
+    Propagations is Propagated + SubPropagations.
+
+dp_branch(_, Index, _, yes([]), 1, 0) :-
+    index_satisfied(Index),
+    !.
+dp_branch(_, Index, _, no, 1, 0) :-
+    index_has_empty_clause(Index),
+    !.
+dp_branch(Strategy, Index, Path, Result, TotalSteps, TotalProps) :-
+    stats_time(heuristic_time, select_branch_atom(Strategy, Index, Atom)),
+    progress_tick(decisions),
+    stats_count(decisions),
+    stats_count(bullet_ops),
+    bullet_op_indexed(Atom, Index, Index1),
+    dp_search(Strategy, Index1, [Atom/true|Path], SubResult1, Steps1, Props1),
+    (
+        SubResult1 = yes(Model) ->
         Result = yes([Atom/true|Model]),
-        TotalSteps is Steps1 + 1
+        TotalSteps is Steps1 + 1,
+        TotalProps = Props1
     ;
+        neg(Atom, NegAtom),
+        stats_count(bullet_ops),
+        bullet_op_indexed(NegAtom, Index, Index2),
+        dp_search(Strategy, Index2, [Atom/false|Path], SubResult2, Steps2, Props2),
         (
-            neg(Atom, NegAtom),
-            bullet_op(Clauses, NegAtom, C2),
-            dp_solve(Strategy, C2, SubResult, Steps2),
-            SubResult = yes(Model)
-        ) ->
-        Result = yes([Atom/false|Model]),
-        TotalSteps is Steps2 + 1
-    ;
-        Result = no,
-        TotalSteps is 1
+            SubResult2 = yes(Model) ->
+            Result = yes([Atom/false|Model]) ;
+            Result = no
+        ),
+        TotalSteps is Steps1 + Steps2 + 1,
+        TotalProps is Props1 + Props2
     ).
 
 davis_putnam(Clauses, Strategy, Result, Steps) :-
-    dp_solve(Strategy, Clauses, Result, Steps).
+    davis_putnam(Clauses, Strategy, Result, Steps, _).
+
+davis_putnam(Clauses, Strategy, Result, Steps, Propagations) :-
+    encode_kb(Clauses, Encoded, Atoms),
+    length(Atoms, NVars),
+    davis_putnam_encoded(Encoded, NVars, Strategy, EncodedResult, Steps, Propagations),
+    decode_result(EncodedResult, Atoms, Result).
+
+% Strategies offered by the front ends, in display order.
+dp_strategy(Strategy) :-
+    indexed_strategy(Strategy, _).
+dp_strategy(Strategy) :-
+    cdcl_strategy(Strategy, _).
+dp_strategy(trail).
+
+davis_putnam_encoded(Clauses, NVars, Strategy, Result, Steps, Propagations) :-
+    cdcl_strategy(Strategy, Options),
+    !,
+    cdcl_solve(Clauses, NVars, Options, Result, Steps, Propagations).
+davis_putnam_encoded(Clauses, NVars, trail, Result, Steps, Propagations) :-
+    !,
+    dpt_solve(Clauses, NVars, Result, Steps, Propagations).
+% Large KBs run on the trail engine with the strategy's own heuristic; a
+% strategy the trail engine cannot follow is refused rather than replaced.
+davis_putnam_encoded(Clauses, NVars, Strategy, Result, Steps, Propagations) :-
+    large_instance(Clauses),
+    !,
+    (
+        dpt_heuristic(Strategy, Heuristic) ->
+        stats_note(large_instance, trail),
+        dpt_solve(Heuristic, Clauses, NVars, Result, Steps, Propagations) ;
+        throw(error(domain_error(large_instance_strategy, Strategy), _))
+    ).
+davis_putnam_encoded(Clauses, _, Strategy, Result, Steps, Propagations) :-
+    dp_cubes(Depth, Threads),
+    Threads > 1,
+    !,
+    dpc_solve(Strategy, Clauses, Depth, Threads, Result, Steps, Propagations).
+davis_putnam_encoded(Clauses, _, Strategy, Result, Steps, Propagations) :-
+    dp_solve(Strategy, Clauses, Result, Steps, Propagations).
+
+% % % % % % % % % % % % %
+% Integer encoding: atoms are interned to 1..N in order of first
+% occurrence, neg(A) becomes -N and every clause is a sorted int list.
+
+intern_clauses(Clauses, IntClauses, Atoms) :-
+    empty_assoc(Empty),
+    foldl(intern_clause, Clauses, IntClauses, Empty-0, Table),
+    table_atoms(Table, Atoms).
+
+table_atoms(Table-_, Atoms) :-
+    assoc_to_list(Table, Pairs),
+    transpose_pairs(Pairs, ByIndex),
+    pairs_values(ByIndex, Atoms).
+
+intern_clause(Clause, IntClause, Table0, Table) :-
+    foldl(intern_literal, Clause, IntClause, Table0, Table).
+
+intern_literal(Lit, Int, Table0-Next0, Table-Next) :-
+    get_atom(Lit, Atom),
+    (
+        get_assoc(Atom, Table0, Var) ->
+        Table = Table0,
+        Next = Next0 ;
+        Next is Next0 + 1,
+        Var = Next,
+        put_assoc(Atom, Table0, Var, Table)
+    ),
+    (negative_literal(Lit) -> Int is -Var ; Int = Var).
+
+encode_kb(Clauses, Encoded, Atoms) :-
+    intern_clauses(Clauses, IntClauses, Atoms),
+    maplist(sort, IntClauses, Encoded).
+
+decode_result(no, _, no).
+decode_result(yes(Model), Atoms, yes(Decoded)) :-
+    Table =.. [atoms|Atoms],
+    maplist(decode_assignment(Table), Model, Decoded).
+
+decode_assignment(Table, Var/Value, Atom/Value) :-
+    arg(Var, Table, Atom).
+
+% % % % % % % % % % % % %
+% Incremental sessions: one CDCL state and atom table kept between calls,
+% so learned clauses and activity scores carry over from query to query.
+% Each session runs in its own Prolog engine, whose stacks hold the state:
+% a call posts a request to the engine, which updates the state in place
+% and yields the reply, so only the request and the reply are copied.
+% Between calls the state is at decision level 0; Status becomes conflict
+% once the clauses added so far are unsatisfiable on their own.
+
+:- dynamic sat_session/2.
+
+sat_session_new(Session) :-
+    flag(sat_session_count, N, N + 1),
+    format(atom(Session), 'sat_session_~d', [N]),
+    engine_create(_, sat_session_engine, Engine),
+    assertz(sat_session(Session, Engine)).
+
+sat_session_engine :-
+    cdcl_new_state(0, State),
+    empty_assoc(Table),
+    sat_session_serve(State, Table-0, ok).
+
+% An error leaves the state as it was before the request and is rethrown
+% by sat_session_call/3.
+sat_session_serve(State, Table0, Status0) :-
+    engine_fetch(Request),
+    catch(
+        (
+            sat_session_request(Request, State, Table0, Status0, Table, Status, Reply) ->
+            true ;
+            Table = Table0,
+            Status = Status0,
+            Reply = failed
+        ),
+        Error,
+        (Table = Table0, Status = Status0, Reply = error(Error))
+    ),
+    engine_yield(Reply),
+    sat_session_serve(State, Table, Status).
+
+sat_session_call(Session, Request, Reply) :-
+    atom_string(Key, Session),
+    sat_session(Key, Engine),
+    engine_post(Engine, Request, Reply0),
+    (
+        Reply0 = error(Error) ->
+        throw(Error) ;
+        Reply0 \== failed,
+        Reply = Reply0
+    ).
+
+sat_session_delete(Session) :-
+    atom_string(Key, Session),
+    (
+        retract(sat_session(Key, Engine)) ->
+        engine_destroy(Engine) ;
+        true
+    ).
+
+sat_session_add(Session, Clauses) :-
+    sat_session_call(Session, add(Clauses), done).
+
+sat_session_solve(Session, Assumptions, Result, Model, Core) :-
+    sat_session_call(Session, solve(Assumptions), solved(Result, Model, Core)).
+
+sat_session_request(add(Clauses), State, Table0, Status0, Table, Status, done) :-
+    foldl(intern_clause, Clauses, IntClauses, Table0, Table),
+    Table = _-NVars,
+    cdcl_grow_vars(State, NVars),
+    (
+        Status0 == conflict ->
+        Status = conflict ;
+        cdcl_add_input(IntClauses, State, InputStatus),
+        session_propagate(InputStatus, State, Status)
+    ).
+sat_session_request(solve(Assumptions), State, Table0, Status0, Table, Status, solved(Result, Model, Core)) :-
+    foldl(intern_literal, Assumptions, IntAssumptions, Table0, Table),
+    Table = _-NVars,
+    cdcl_grow_vars(State, NVars),
+    (
+        Status0 == conflict ->
+        Outcome = unsat ;
+        cdcl_set(assumptions, State, IntAssumptions),
+        cdcl_search(State, [], Outcome)
+    ),
+    session_outcome(Outcome, State, Table, Result, Model, Core),
+    (Outcome == unsat -> Status = conflict ; Status = ok),
+    cdcl_backjump(State, 0),
+    cdcl_set(assumptions, State, []).
+
+session_propagate(conflict, _, conflict).
+session_propagate(ok, State, Status) :-
+    cdcl_get(trail, State, Trail),
+    cdcl_propagate(State, Trail, Propagated),
+    (Propagated = conflict(_) -> Status = conflict ; Status = ok).
+
+session_outcome(sat, State, Table, sat, Model, []) :-
+    cdcl_result(sat, State, IntResult),
+    table_atoms(Table, Atoms),
+    decode_result(IntResult, Atoms, yes(Decoded)),
+    maplist(assignment_pair, Decoded, Pairs),
+    dict_pairs(Model, _, Pairs).
+session_outcome(unsat, _, _, unsat, Model, []) :-
+    dict_pairs(Model, _, []).
+session_outcome(failed(IntCore), _, Table, unsat, Model, Core) :-
+    dict_pairs(Model, _, []),
+    table_atoms(Table, Atoms),
+    AtomTable =.. [atoms|Atoms],
+    maplist(session_literal(AtomTable), IntCore, Core).
+
+assignment_pair(Atom/Value, Atom-Value).
+
+session_literal(AtomTable, Int, Lit) :-
+    Var is abs(Int),
+    arg(Var, AtomTable, Atom),
+    (Int < 0 -> format(string(Lit), 'neg(~w)', [Atom]) ; format(string(Lit), '~w', [Atom])).
+
+% Entry points for session.py. Literals arrive bound as Name-Positive,
+% Name a string and Positive true or false, so nothing is parsed.
+sat_session_add_pairs(Session, PairClauses) :-
+    maplist(maplist(session_pair_literal), PairClauses, Clauses),
+    sat_session_add(Session, Clauses).
+
+sat_session_solve_pairs(Session, Pairs, Result, Model, Core) :-
+    maplist(session_pair_literal, Pairs, Assumptions),
+    sat_session_solve(Session, Assumptions, Result, Model, Core).
+
+session_pair_literal(Name-Positive, Lit) :-
+    atom_string(Atom, Name),
+    (Positive == true -> Lit = Atom ; Lit = neg(Atom)).
 
 
 % % % % % % % % % % % % % 
@@ -123,10 +569,171 @@ format_model([Atom/Value|Rest], Str) :-
     ).
 
 run_dp_file_formatted(FileName, Strategy, ResultType, ModelStr, Steps) :-
+    run_dp_file_formatted(FileName, Strategy, ResultType, ModelStr, Steps, _).
+
+run_dp_file_formatted(FileName, Strategy, ResultType, ModelStr, Steps, Propagations) :-
+    read_encoded_kb(FileName, Encoded, NVars, Names),
+    run_dp_encoded_formatted(Encoded, NVars, Names, Strategy, ResultType, ModelStr, Steps, Propagations).
+
+dimacs_file(FileName) :-
+    file_name_extension(_, cnf, FileName).
+
+run_dp_file_stats(FileName, Strategy, Profile, ResultType, ModelStr, Steps, Propagations, Stats) :-
+    run_dp_file_stats(FileName, Strategy, Profile, false, ResultType, ModelStr, Steps, Propagations, Stats).
+
+% With Preprocess = true the per-pass report is added to Stats as `preprocess`.
+run_dp_file_stats(FileName, Strategy, Profile, Preprocess, ResultType, ModelStr, Steps, Propagations, Stats) :-
+    read_encoded_kb(FileName, Encoded, NVars, Names),
+    with_stats(
+        Profile,
+        run_dp_encoded(Preprocess, Encoded, NVars, Names, Strategy, ResultType, ModelStr, Steps, Propagations, Report),
+        Stats0
+    ),
+    add_preprocess_report(Preprocess, Report, Stats0, Stats).
+
+run_dp_encoded(false, Encoded, NVars, Names, Strategy, ResultType, ModelStr, Steps, Propagations, _) :-
+    run_dp_encoded_formatted(Encoded, NVars, Names, Strategy, ResultType, ModelStr, Steps, Propagations).
+run_dp_encoded(true, Encoded, NVars, Names, Strategy, ResultType, ModelStr, Steps, Propagations, Report) :-
+    run_dp_encoded_preprocessed(Encoded, NVars, Names, Strategy, ResultType, ModelStr, Steps, Propagations, Report).
+
+add_preprocess_report(false, _, Stats, Stats).
+add_preprocess_report(true, Report, Stats0, Stats) :-
+    put_dict(preprocess, Stats0, Report, Stats).
+
+run_dp_file_preprocessed(FileName, Strategy, ResultType, ModelStr, Steps, Propagations, Report) :-
+    read_encoded_kb(FileName, Encoded, NVars, Names),
+    run_dp_encoded_preprocessed(Encoded, NVars, Names, Strategy, ResultType, ModelStr, Steps, Propagations, Report).
+
+read_encoded_kb(FileName, Encoded, NVars, Names) :-
+    dimacs_file(FileName),
+    !,
+    read_dimacs_file(FileName, Encoded, NVars),
+    dimacs_atoms(NVars, Atoms),
+    maplist(atom_name, Atoms, Names).
+read_encoded_kb(FileName, Encoded, NVars, Names) :-
     read_kb_from_file(FileName, Clauses),
-    davis_putnam(Clauses, Strategy, Result, Steps),
+    encode_kb(Clauses, Encoded, Atoms),
+    length(Atoms, NVars),
+    maplist(atom_name, Atoms, Names).
+
+atom_name(Atom, Name) :-
+    format(string(Name), '~w', [Atom]).
+
+run_dp_encoded_formatted(Encoded, NVars, Names, Strategy, ResultType, ModelStr, Steps, Propagations) :-
+    davis_putnam_encoded(Encoded, NVars, Strategy, EncodedResult, Steps, Propagations),
+    decode_result(EncodedResult, Names, Result),
     format_result(Result, ResultType, ModelStr).
 
+run_dp_encoded_preprocessed(Encoded, NVars, Names, Strategy, ResultType, ModelStr, Steps, Propagations, Report) :-
+    davis_putnam_preprocessed(Encoded, NVars, Strategy, EncodedResult, Steps, Propagations, Report),
+    decode_result(EncodedResult, Names, Result),
+    format_result(Result, ResultType, ModelStr).
+
+davis_putnam_preprocessed(Encoded, NVars, Strategy, Result, Steps, Propagations, Report) :-
+    preprocess(Encoded, Simplified, Eliminated, Passes),
+    preprocess_report(Passes, Report),
+    davis_putnam_encoded(Simplified, NVars, Strategy, SimplifiedResult, Steps, Propagations),
+    findall(Var, between(1, NVars, Var), Vars),
+    extend_result(SimplifiedResult, Vars, Eliminated, Result).
+
+extend_result(no, _, _, no).
+extend_result(yes(Model0), Vars, Eliminated, yes(Model)) :-
+    preprocess_extend_model(Eliminated, Vars, Model0, Model).
+
+% % % % % % % % % % % % %
+% Entry points for engines.py. Every argument is bound by janus, so file
+% names and strategies may arrive as strings. The answer is a dict whose
+% model is a list of Name-Value pairs: nothing is formatted as text for
+% Python to parse back.
+
+dp_answer_file(File, Strategy, Preprocess, Profile, Threads, Budget, Answer) :-
+    atom_string(FileName, File),
+    read_encoded_kb(FileName, Encoded, NVars, Names),
+    dp_answer_encoded(Encoded, NVars, Names, Strategy, Preprocess, Profile, Threads, Budget, Answer).
+
+% Budget is a dict as in budget.pl. An unknown answer has a reason and a
+% progress dict, and its model is the longest partial assignment seen.
+dp_answer_encoded(Encoded, NVars, Names, Strategy, Preprocess, Profile, Threads, Budget, Answer) :-
+    atom_string(StrategyName, Strategy),
+    with_dp_threads(
+        Threads,
+        dp_encoded_budget(Encoded, NVars, Names, StrategyName, Preprocess, Profile, Budget, Result, Steps, Propagations, Stats)
+    ),
+    result_pairs(Result, Status, Satisfiable, Model, Extra),
+    dict_pairs(Answer, _, [
+        status-Status, satisfiable-Satisfiable, model-Model,
+        steps-Steps, propagations-Propagations, stats-Stats|Extra
+    ]).
+
+% Result is yes(Model), no or unknown(Reason, Progress). Steps and
+% propagations of an unknown result are the counts reached when the
+% budget ran out.
+dp_encoded_budget(Encoded, NVars, Names, Strategy, Preprocess, Profile, Budget, Result, Steps, Propagations, Stats) :-
+    budget_options(Budget, Limits),
+    with_stats(
+        Profile,
+        with_budget(
+            Limits,
+            dp_encoded_result(Preprocess, Encoded, NVars, Strategy, EncodedResult, Steps0, Props0, Report),
+            Outcome
+        ),
+        Stats0
+    ),
+    (
+        Outcome == done ->
+        add_preprocess_report(Preprocess, Report, Stats0, Stats),
+        decode_result(EncodedResult, Names, Result),
+        Steps = Steps0,
+        Propagations = Props0 ;
+        Outcome = unknown(Reason, Progress0),
+        progress_count(decisions, Progress0, Stats0, Steps),
+        progress_count(propagations, Progress0, Stats0, Propagations),
+        decode_progress(Progress0, Names, Progress),
+        dict_pairs(ProgressDict, _, Progress),
+        Result = unknown(Reason, ProgressDict),
+        Stats = Stats0
+    ).
+
+dp_encoded_result(false, Encoded, NVars, Strategy, Result, Steps, Propagations, _) :-
+    davis_putnam_encoded(Encoded, NVars, Strategy, Result, Steps, Propagations).
+dp_encoded_result(true, Encoded, NVars, Strategy, Result, Steps, Propagations, Report) :-
+    davis_putnam_preprocessed(Encoded, NVars, Strategy, Result, Steps, Propagations, Report).
+
+% CDCL keeps its counts in its own state and notes them as progress; the
+% list and trail searches count through stats.pl.
+progress_count(Name, Progress, Stats, Count) :-
+    (memberchk(Name-Count, Progress) -> true ; get_dict(Name, Stats, Count)).
+
+decode_progress(Progress0, Atoms, Progress) :-
+    Table =.. [atoms|Atoms],
+    maplist(decode_progress_pair(Table), Progress0, Progress).
+
+decode_progress_pair(Table, assignment-Items, assignment-Assignment) :-
+    !,
+    maplist(budget_assignment_item, Items, Vars),
+    sort(Vars, Sorted),
+    maplist(decode_assignment(Table), Sorted, Assignment).
+decode_progress_pair(_, Pair, Pair).
+
+result_pairs(no, unsat, false, [], []).
+result_pairs(yes(Model), sat, true, Pairs, []) :-
+    maplist(assignment_pair, Model, Pairs).
+result_pairs(unknown(Reason, Progress0), unknown, false, Pairs, [reason-Reason, progress-Progress]) :-
+    (del_dict(assignment, Progress0, Assignment, Progress) -> true ; Assignment = [], Progress = Progress0),
+    maplist(assignment_pair, Assignment, Pairs).
+
+% Canonical text of a KB for result caching: sorted literals, sorted clauses.
+
+canonical_kb(FileName, String) :-
+    read_kb_from_file(FileName, Clauses),
+    maplist(sort, Clauses, Sorted),
+    sort(Sorted, Canonical),
+    format(string(String), '~k', [Canonical]).
+
+read_kb_from_file(FileName, Clauses) :-
+    dimacs_file(FileName),
+    !,
+    read_dimacs_kb(FileName, Clauses).
 read_kb_from_file(FileName, Clauses) :-
     open(FileName, read, Stream),
     read_clauses_from_stream(Stream, Clauses),
@@ -143,4 +750,10 @@ read_clauses_from_stream(Stream, [Clause|Rest]) :-
 
 run_dp_file(FileName, Strategy, Result, Steps) :-
     read_kb_from_file(FileName, Clauses),
-    davis_putnam(Clauses, Strategy, Result, Steps).
\ No newline at end of file
+    davis_putnam(Clauses, Strategy, Result, Steps).
+
+% As run_dp_file/4 within Budget, e.g. [time(10), inferences(10000000)];
+% Result may also be unknown(Reason, Progress).
+run_dp_file_budget(FileName, Strategy, Budget, Result, Steps) :-
+    read_encoded_kb(FileName, Encoded, NVars, Names),
+    dp_encoded_budget(Encoded, NVars, Names, Strategy, false, false, Budget, Result, Steps, _, _).
\ No newline at end of file
@@ -0,0 +1,473 @@
+% Trail-based DPLL, selected with the `trail` strategy and used for every
+% list-based strategy once the KB reaches the large-instance threshold.
+% Clauses are never copied: each clause has a count of true literals and
+% a count of literals not yet false, and assigning a literal only visits
+% the clauses it occurs in. The search is a loop over an explicit trail
+% with chronological backtracking: a conflict undoes the trail back to the
+% newest decision whose other branch is still open.
+%
+% Memory is fixed before the search starts. dpt_new_state/3 allocates
+% every array the search writes: values, trail, decision marks and
+% cursors (NVars entries each), the two counters per clause and the
+% occurrence lists. The loop only overwrites integers in them with
+% nb_setarg/3 and leaves no choice points, so apart from the final model
+% it needs no more stack than the state itself. A KB whose state does
+% not fit in the stack limit stops while the state is built, before any
+% search, with budget reason stack.
+%
+% The branching heuristic follows the strategy: `trail` takes variables
+% by number of occurrences, and the most balanced and shortest clause
+% strategies make the choice of their indexed versions from the clause
+% counters (ties go to the lowest variable or clause number).
+
+:- ensure_loaded(cdcl_sat).
+
+:- create_prolog_flag(dp_large_instance_threshold, 20000, [type(integer), keep(true)]).
+
+set_large_instance_threshold(Clauses) :-
+    set_prolog_flag(dp_large_instance_threshold, Clauses).
+
+large_instance(Clauses) :-
+    current_prolog_flag(dp_large_instance_threshold, Threshold),
+    length(Clauses, Count),
+    Count >= Threshold.
+
+dpt_heuristic(trail, occurrences).
+dpt_heuristic(select_atom_most_balanced, balance).
+dpt_heuristic(select_atom_shortest_clause, shortest).
+
+dpt_field(values, 1).
+dpt_field(occurs, 2).
+dpt_field(store, 3).
+dpt_field(true_count, 4).
+dpt_field(free_count, 5).
+dpt_field(trail, 6).
+dpt_field(marks, 7).
+dpt_field(cursors, 8).
+dpt_field(order, 9).
+dpt_field(regs, 10).
+
+% regs(Size, Head, Level): entries on the trail, entries already
+% propagated, current decision level.
+dpt_get(Field, State, Value) :-
+    dpt_field(Field, Index),
+    arg(Index, State, Value).
+
+dpt_new_state(Clauses, NVars, State) :-
+    length(Clauses, NClauses),
+    new_array(values, NVars, 0, Values),
+    NLits is 2 * NVars,
+    dpt_occurrence_lists(Clauses, NLits, Occurs),
+    new_array(true_count, NClauses, 0, True),
+    maplist(dpt_clause_term, Clauses, Compounds),
+    Store =.. [store|Compounds],
+    maplist(length, Clauses, Lengths),
+    Free =.. [free_count|Lengths],
+    new_array(trail, NVars, 0, Trail),
+    new_array(marks, NVars, 0, Marks),
+    new_array(cursors, NVars, 0, Cursors),
+    dpt_branch_order(Occurs, NVars, Order),
+    State = dpt(Values, Occurs, Store, True, Free, Trail, Marks, Cursors, Order, regs(0, 0, 0)).
+
+dpt_clause_term(Clause, Term) :-
+    Term =.. [c|Clause].
+
+% Slot watch_index(Lit) lists the ids of the clauses containing Lit.
+dpt_occurrence_lists(Clauses, NLits, Occurs) :-
+    findall(
+        Index-Id,
+        (nth1(Id, Clauses, Clause), member(Lit, Clause), watch_index(Lit, Index)),
+        Pairs
+    ),
+    keysort(Pairs, Sorted),
+    group_pairs_by_key(Sorted, Grouped),
+    dpt_occurrence_slots(1, NLits, Grouped, Lists),
+    Occurs =.. [occurs|Lists].
+
+dpt_occurrence_slots(Index, NLits, _, []) :-
+    Index > NLits,
+    !.
+dpt_occurrence_slots(Index, NLits, Grouped0, [Ids|Lists]) :-
+    (Grouped0 = [Index-Ids|Grouped] -> true ; Ids = [], Grouped = Grouped0),
+    Next is Index + 1,
+    dpt_occurrence_slots(Next, NLits, Grouped, Lists).
+
+% Variables by number of occurrences, most frequent first.
+dpt_branch_order(Occurs, NVars, Order) :-
+    findall(
+        Key-Var,
+        (
+            between(1, NVars, Var),
+            Pos is 2 * Var - 1,
+            Neg is 2 * Var,
+            arg(Pos, Occurs, PosIds),
+            arg(Neg, Occurs, NegIds),
+            length(PosIds, P),
+            length(NegIds, N),
+            Key is -(P + N)
+        ),
+        Pairs
+    ),
+    keysort(Pairs, Sorted),
+    pairs_values(Sorted, Vars),
+    Order =.. [order|Vars].
+
+% % % % % % % % % % % % %
+
+dpt_lit_value(Values, Lit, Value) :-
+    Var is abs(Lit),
+    arg(Var, Values, VarValue),
+    (Lit > 0 -> Value = VarValue ; Value is -VarValue).
+
+dpt_push(State, Lit) :-
+    dpt_get(values, State, Values),
+    Var is abs(Lit),
+    (Lit > 0 -> nb_setarg(Var, Values, 1) ; nb_setarg(Var, Values, -1)),
+    dpt_get(regs, State, Regs),
+    arg(1, Regs, Size0),
+    Size is Size0 + 1,
+    nb_setarg(1, Regs, Size),
+    dpt_get(trail, State, Trail),
+    nb_setarg(Size, Trail, Lit).
+
+% Status is conflict once a clause has no literal left that is not false.
+% Every occurrence of a literal is updated even then, so that undoing it
+% is exact.
+dpt_propagate(State, Counts, Status) :-
+    dpt_get(regs, State, Regs),
+    arg(1, Regs, Size),
+    arg(2, Regs, Head),
+    (
+        Head >= Size ->
+        Status = ok ;
+        Next is Head + 1,
+        nb_setarg(2, Regs, Next),
+        dpt_get(trail, State, Trail),
+        arg(Next, Trail, Lit),
+        dpt_apply(State, Lit, Counts, Status1),
+        (
+            Status1 == conflict ->
+            Status = conflict ;
+            dpt_propagate(State, Counts, Status)
+        )
+    ).
+
+dpt_apply(State, Lit, Counts, Status) :-
+    dpt_get(occurs, State, Occurs),
+    watch_index(Lit, TrueIndex),
+    arg(TrueIndex, Occurs, TrueIds),
+    dpt_get(true_count, State, True),
+    dpt_satisfy(TrueIds, True),
+    False is -Lit,
+    watch_index(False, FalseIndex),
+    arg(FalseIndex, Occurs, FalseIds),
+    dpt_falsify(FalseIds, State, Counts, ok, Status).
+
+dpt_satisfy([], _).
+dpt_satisfy([Id|Ids], True) :-
+    arg(Id, True, Count0),
+    Count is Count0 + 1,
+    nb_setarg(Id, True, Count),
+    dpt_satisfy(Ids, True).
+
+dpt_falsify([], _, _, Status, Status).
+dpt_falsify([Id|Ids], State, Counts, Status0, Status) :-
+    dpt_get(free_count, State, Free),
+    arg(Id, Free, Count0),
+    Count is Count0 - 1,
+    nb_setarg(Id, Free, Count),
+    dpt_get(true_count, State, True),
+    arg(Id, True, Satisfied),
+    (
+        Satisfied > 0 ->
+        Status1 = Status0 ;
+        Count =:= 0 ->
+        Status1 = conflict ;
+        Count =:= 1 ->
+        dpt_unit(State, Id, Counts),
+        Status1 = Status0 ;
+        Status1 = Status0
+    ),
+    dpt_falsify(Ids, State, Counts, Status1, Status).
+
+% The one literal not yet false may already be on the trail waiting to be
+% propagated; the clause is then settled when it is.
+dpt_unit(State, Id, Counts) :-
+    dpt_get(store, State, Store),
+    arg(Id, Store, Clause),
+    dpt_get(values, State, Values),
+    (
+        dpt_unassigned(Clause, 1, Values, Lit) ->
+        dpt_push(State, Lit),
+        dpt_bump(Counts, 2) ;
+        true
+    ).
+
+dpt_unassigned(Clause, Position, Values, Lit) :-
+    arg(Position, Clause, Candidate),
+    (
+        dpt_lit_value(Values, Candidate, 0) ->
+        Lit = Candidate ;
+        Next is Position + 1,
+        dpt_unassigned(Clause, Next, Values, Lit)
+    ).
+
+dpt_retract(State, Lit) :-
+    dpt_get(occurs, State, Occurs),
+    watch_index(Lit, TrueIndex),
+    arg(TrueIndex, Occurs, TrueIds),
+    dpt_get(true_count, State, True),
+    dpt_add_each(TrueIds, True, -1),
+    False is -Lit,
+    watch_index(False, FalseIndex),
+    arg(FalseIndex, Occurs, FalseIds),
+    dpt_get(free_count, State, Free),
+    dpt_add_each(FalseIds, Free, 1).
+
+dpt_add_each([], _, _).
+dpt_add_each([Id|Ids], Array, Delta) :-
+    arg(Id, Array, Count0),
+    Count is Count0 + Delta,
+    nb_setarg(Id, Array, Count),
+    dpt_add_each(Ids, Array, Delta).
+
+% Pops the trail down to Keep entries; only the propagated ones have
+% counters to restore.
+dpt_undo_to(State, Keep) :-
+    dpt_get(regs, State, Regs),
+    arg(1, Regs, Size),
+    arg(2, Regs, Head),
+    dpt_undo(Size, Keep, Head, State),
+    nb_setarg(1, Regs, Keep),
+    Head1 is min(Head, Keep),
+    nb_setarg(2, Regs, Head1).
+
+dpt_undo(Pos, Keep, Head, State) :-
+    (
+        Pos =< Keep ->
+        true ;
+        dpt_get(trail, State, Trail),
+        arg(Pos, Trail, Lit),
+        (Pos =< Head -> dpt_retract(State, Lit) ; true),
+        dpt_get(values, State, Values),
+        Var is abs(Lit),
+        nb_setarg(Var, Values, 0),
+        Next is Pos - 1,
+        dpt_undo(Next, Keep, Head, State)
+    ).
+
+% % % % % % % % % % % % %
+
+dpt_bump(Counts, Index) :-
+    arg(Index, Counts, Count0),
+    Count is Count0 + 1,
+    nb_setarg(Index, Counts, Count).
+
+% Marks hold the trail position of each level's decision, negated once
+% its second branch is taken.
+dpt_decide(State, Var, Cursor, Counts) :-
+    dpt_get(regs, State, Regs),
+    arg(1, Regs, Size),
+    arg(3, Regs, Level0),
+    Level is Level0 + 1,
+    nb_setarg(3, Regs, Level),
+    Pos is Size + 1,
+    dpt_get(marks, State, Marks),
+    nb_setarg(Level, Marks, Pos),
+    dpt_get(cursors, State, Cursors),
+    nb_setarg(Level, Cursors, Cursor),
+    dpt_push(State, Var),
+    dpt_bump(Counts, 1),
+    progress_tick(decisions),
+    stats_count(decisions),
+    dpt_note_progress(Counts).
+
+% Fails when every decision has had both branches.
+dpt_backtrack(State) :-
+    dpt_get(regs, State, Regs),
+    arg(3, Regs, Level),
+    Level > 0,
+    dpt_get(marks, State, Marks),
+    arg(Level, Marks, Mark),
+    (
+        Mark > 0 ->
+        dpt_get(trail, State, Trail),
+        arg(Mark, Trail, Lit),
+        Keep is Mark - 1,
+        dpt_undo_to(State, Keep),
+        Flipped is -Mark,
+        nb_setarg(Level, Marks, Flipped),
+        Other is -Lit,
+        dpt_push(State, Other) ;
+        Keep is -Mark - 1,
+        dpt_undo_to(State, Keep),
+        Up is Level - 1,
+        nb_setarg(3, Regs, Up),
+        dpt_backtrack(State)
+    ).
+
+% Fails when no variable is left to branch on. Cursor is the position in
+% the occurrence order, where the next level resumes its scan.
+dpt_pick(occurrences, State, Var, Cursor) :-
+    dpt_get(regs, State, Regs),
+    arg(3, Regs, Level),
+    dpt_get(cursors, State, Cursors),
+    (Level =:= 0 -> From = 1 ; arg(Level, Cursors, From)),
+    dpt_get(order, State, Order),
+    functor(Order, _, NVars),
+    dpt_get(values, State, Values),
+    dpt_next_var(From, NVars, Order, Values, Cursor, Var).
+dpt_pick(balance, State, Var, 0) :-
+    dpt_get(values, State, Values),
+    functor(Values, _, NVars),
+    dpt_most_balanced(1, NVars, State, none, best(_, Var)).
+dpt_pick(shortest, State, Var, 0) :-
+    dpt_get(store, State, Store),
+    functor(Store, _, NClauses),
+    dpt_shortest(1, NClauses, State, none, best(_, Id)),
+    arg(Id, Store, Clause),
+    dpt_get(values, State, Values),
+    dpt_unassigned(Clause, 1, Values, Lit),
+    Var is abs(Lit).
+
+dpt_next_var(Pos, NVars, Order, Values, Cursor, Var) :-
+    Pos =< NVars,
+    arg(Pos, Order, Candidate),
+    (
+        arg(Candidate, Values, 0) ->
+        Cursor = Pos,
+        Var = Candidate ;
+        Next is Pos + 1,
+        dpt_next_var(Next, NVars, Order, Values, Cursor, Var)
+    ).
+
+% Pos and Neg count the open clauses of each polarity, as the occurrence
+% index of the list search would.
+dpt_most_balanced(Var, NVars, _, Best, Best) :-
+    Var > NVars,
+    !,
+    Best \== none.
+dpt_most_balanced(Var, NVars, State, Best0, Best) :-
+    dpt_get(values, State, Values),
+    (
+        arg(Var, Values, 0) ->
+        dpt_get(occurs, State, Occurs),
+        dpt_get(true_count, State, True),
+        PosIndex is 2 * Var - 1,
+        NegIndex is 2 * Var,
+        arg(PosIndex, Occurs, PosIds),
+        arg(NegIndex, Occurs, NegIds),
+        dpt_open_count(PosIds, True, 0, Pos),
+        dpt_open_count(NegIds, True, 0, Neg),
+        Score is abs(Pos - Neg),
+        (
+            Pos + Neg > 0,
+            (Best0 == none ; Best0 = best(BestScore, _), Score < BestScore) ->
+            Best1 = best(Score, Var) ;
+            Best1 = Best0
+        ) ;
+        Best1 = Best0
+    ),
+    Next is Var + 1,
+    dpt_most_balanced(Next, NVars, State, Best1, Best).
+
+dpt_open_count([], _, Count, Count).
+dpt_open_count([Id|Ids], True, Count0, Count) :-
+    (arg(Id, True, 0) -> Count1 is Count0 + 1 ; Count1 = Count0),
+    dpt_open_count(Ids, True, Count1, Count).
+
+% After propagation the free count of an open clause is its number of
+% unassigned literals.
+dpt_shortest(Id, NClauses, _, Best, Best) :-
+    Id > NClauses,
+    !,
+    Best \== none.
+dpt_shortest(Id, NClauses, State, Best0, Best) :-
+    dpt_get(true_count, State, True),
+    (
+        arg(Id, True, 0),
+        dpt_get(free_count, State, Free),
+        arg(Id, Free, Length),
+        (Best0 == none ; Best0 = best(BestLength, _), Length < BestLength) ->
+        Best1 = best(Length, Id) ;
+        Best1 = Best0
+    ),
+    Next is Id + 1,
+    dpt_shortest(Next, NClauses, State, Best1, Best).
+
+dpt_loop(State, Heuristic, Counts, Result) :-
+    dpt_propagate(State, Counts, Status),
+    (
+        Status == conflict ->
+        (
+            dpt_backtrack(State) ->
+            dpt_loop(State, Heuristic, Counts, Result) ;
+            Result = no
+        ) ;
+        dpt_pick(Heuristic, State, Var, Cursor) ->
+        dpt_decide(State, Var, Cursor, Counts),
+        dpt_loop(State, Heuristic, Counts, Result) ;
+        dpt_get(values, State, Values),
+        functor(Values, _, NVars),
+        cdcl_model(1, NVars, Values, Model),
+        Result = yes(Model)
+    ).
+
+% The assignment itself is undone when a budget stops the search, so only
+% the counts are kept as progress.
+dpt_note_progress(Counts) :-
+    arg(1, Counts, Decisions),
+    arg(2, Counts, Propagations),
+    budget_note(decisions, Decisions),
+    budget_note(propagations, Propagations).
+
+% Unit clauses of the input are assigned at level 0; fails when two of
+% them disagree.
+dpt_input_units(Id, NClauses, _, _) :-
+    Id > NClauses,
+    !.
+dpt_input_units(Id, NClauses, State, Counts) :-
+    dpt_get(free_count, State, Free),
+    (
+        arg(Id, Free, 1) ->
+        dpt_get(store, State, Store),
+        arg(Id, Store, Clause),
+        arg(1, Clause, Lit),
+        dpt_get(values, State, Values),
+        dpt_lit_value(Values, Lit, Value),
+        (Value =:= 0 -> dpt_push(State, Lit), dpt_bump(Counts, 2) ; Value =:= 1) ;
+        true
+    ),
+    Next is Id + 1,
+    dpt_input_units(Next, NClauses, State, Counts).
+
+dpt_solve(Clauses, NVars, Result, Decisions, Propagations) :-
+    dpt_solve(occurrences, Clauses, NVars, Result, Decisions, Propagations).
+
+dpt_solve(Heuristic, Clauses0, NVars, Result, Decisions, Propagations) :-
+    maplist(sort, Clauses0, Clauses),
+    new_array(counts, 2, 0, Counts),
+    (
+        memberchk([], Clauses) ->
+        Result = no ;
+        catch(dpt_new_state(Clauses, NVars, State), Error, dpt_allocation_error(Error)),
+        dpt_run(State, Heuristic, Counts, Result)
+    ),
+    arg(1, Counts, Decisions),
+    arg(2, Counts, Propagations).
+
+dpt_allocation_error(error(resource_error(Resource), _)) :-
+    budget_stack_error(Resource),
+    !,
+    throw(budget_exceeded(stack)).
+dpt_allocation_error(Error) :-
+    throw(Error).
+
+dpt_run(State, Heuristic, Counts, Result) :-
+    dpt_get(store, State, Store),
+    functor(Store, _, NClauses),
+    (
+        dpt_input_units(1, NClauses, State, Counts) ->
+        dpt_loop(State, Heuristic, Counts, Result) ;
+        Result = no
+    ).
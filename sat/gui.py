@@ -1,13 +1,58 @@
 #!/usr/bin/env python3
+import argparse
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import sys
 import os
-from janus_swi import query_once, consult
+import queue
+import threading
+import uuid
+from janus_swi import query_once
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engines import DPEngine, Limits, SatAnswer, model_text
+from result_cache import ResultCache, cache_key
+from parallel import run_strategies
+from solver_client import SolverClient, strategy_request_id
+
+
+# Progress counters maintained by progress.pl while a worker runs
+PROGRESS_COUNTERS = ["decisions"]
+POLL_INTERVAL_MS = 100
+
+# Result cache entries for this solver
+SOLVER_NAME = 'dp'
+CACHED_FIELDS = ['satisfiable', 'model', 'steps', 'propagations', 'stats']
+
+
+def is_cancellation(error):
+    return 'cancelled' in str(error)
+
+
+def is_answer(outcome):
+    return 'error' not in outcome and outcome['result_type'] != 'UNKNOWN'
+
+
+def remote_outcome(record):
+    """Convert a solver_server.py record to the outcome dicts parallel.py produces"""
+    outcome = {'strategy': record['strategy']}
+    if record['status'] not in ('sat', 'unsat', 'unknown'):
+        outcome['error'] = record.get('error', record['status'])
+        return outcome
+    outcome.update({
+        'result_type': record['status'].upper(),
+        'reason': record.get('reason'),
+        'engine': record.get('engine'),
+        'model': record.get('model', {}),
+        'steps': record['steps'],
+        'propagations': record['propagations'],
+        'time': record['time'],
+    })
+    return outcome
 
 
 class DavisPutnamGUI:
-    def __init__(self, root):
+    def __init__(self, root, server=None):
         self.root = root
         self.root.title("Davis-Putnam SAT Solver")
         width = 900
@@ -24,8 +69,23 @@ class DavisPutnamGUI:
         self.prolog_loaded = False
         self.strategies = []
         
+        self.worker = None
+        self.worker_id = None
+        self.request_id = None
+        self.remote_requests = []
+        self.final_status = "Ready"
+        self.messages = queue.Queue()
+        self.cache = ResultCache()
+        self.engine = DPEngine()
+        self.cancel_event = threading.Event()
+        # With a server URL the GUI is a thin client of solver_server.py
+        self.client = SolverClient(server) if server else None
+        
         self.create_widgets()
-        self.load_prolog_file()
+        if self.client is not None:
+            self.connect_server()
+        else:
+            self.load_prolog_file()
         self.load_strategies()
     
     
@@ -80,8 +140,8 @@ class DavisPutnamGUI:
         self.problems = {}
         if os.path.exists(kb_dir):
             for fname in os.listdir(kb_dir):
-                if fname.endswith(".pl"):
-                    problem_name = fname[:-3].replace('_', ' ').title()
+                if fname.endswith((".pl", ".cnf")):
+                    problem_name = os.path.splitext(fname)[0].replace('_', ' ').title()
                     filepath = os.path.join(kb_dir, fname)
                     self.problems[problem_name] = filepath
         
@@ -108,6 +168,51 @@ class DavisPutnamGUI:
         )
         self.strategy_combo.grid(row=1, column=1, padx=10, pady=5)
         
+        self.profile_var = tk.BooleanVar(value=False)
+        profile_check = ttk.Checkbutton(
+            problem_frame, 
+            text="Run under the Prolog profiler", 
+            variable=self.profile_var
+        )
+        profile_check.grid(row=2, column=1, sticky=tk.W, padx=10, pady=5)
+        
+        self.preprocess_var = tk.BooleanVar(value=False)
+        preprocess_check = ttk.Checkbutton(
+            problem_frame, 
+            text="Preprocess the CNF before solving", 
+            variable=self.preprocess_var
+        )
+        preprocess_check.grid(row=3, column=1, sticky=tk.W, padx=10, pady=5)
+        
+        # Cube-and-conquer threads for the list-based strategies; 1 keeps the search sequential
+        ttk.Label(problem_frame, text="Threads:").grid(row=4, column=0, sticky=tk.W, pady=5)
+        self.threads_var = tk.IntVar(value=1)
+        threads_spin = ttk.Spinbox(
+            problem_frame, 
+            from_=1, 
+            to=os.cpu_count() or 1, 
+            textvariable=self.threads_var, 
+            width=5
+        )
+        threads_spin.grid(row=4, column=1, sticky=tk.W, padx=10, pady=5)
+        
+        # Run budgets; 0 means no limit. A run that exhausts one reports UNKNOWN
+        ttk.Label(problem_frame, text="Time limit (s):").grid(row=5, column=0, sticky=tk.W, pady=5)
+        self.timeout_var = tk.IntVar(value=0)
+        timeout_spin = ttk.Spinbox(
+            problem_frame, 
+            from_=0, 
+            to=3600, 
+            textvariable=self.timeout_var, 
+            width=8
+        )
+        timeout_spin.grid(row=5, column=1, sticky=tk.W, padx=10, pady=5)
+        
+        ttk.Label(problem_frame, text="Inference limit:").grid(row=6, column=0, sticky=tk.W, pady=5)
+        self.inferences_var = tk.IntVar(value=0)
+        inferences_entry = ttk.Entry(problem_frame, textvariable=self.inferences_var, width=14)
+        inferences_entry.grid(row=6, column=1, sticky=tk.W, padx=10, pady=5)
+        
         run_btn = ttk.Button(
             problem_frame, 
             text="Run DP Solver", 
@@ -124,6 +229,22 @@ class DavisPutnamGUI:
         )
         compare_btn.grid(row=0, column=3, padx=10, rowspan=2)
         
+        portfolio_btn = ttk.Button(
+            problem_frame, 
+            text="Portfolio", 
+            command=self.run_portfolio,
+            style='Compare.TButton'
+        )
+        portfolio_btn.grid(row=0, column=4, padx=10, rowspan=2)
+        
+        self.cancel_btn = ttk.Button(
+            problem_frame, 
+            text="Cancel", 
+            command=self.cancel_run,
+            state='disabled'
+        )
+        self.cancel_btn.grid(row=0, column=5, padx=10, rowspan=2)
+        
         # Configure button styles
         style = ttk.Style()
         style.configure(
@@ -161,16 +282,16 @@ class DavisPutnamGUI:
     
     
     def load_prolog_file(self):
-        prolog_file = "dp_sat.pl"
+        prolog_file = os.path.basename(self.engine.prolog_file)
         
-        if not os.path.exists(prolog_file):
-            self.log_result(f"Warning: {prolog_file} not found in current directory.\n")
-            self.log_result(f"Please make sure {prolog_file} is in the same directory as this script.\n")
+        if not os.path.exists(self.engine.prolog_file):
+            self.log_result(f"Warning: {self.engine.prolog_file} not found.\n")
+            self.log_result(f"Please make sure {prolog_file} is next to this script.\n")
             self.status_var.set("Prolog file not found")
             return
         
         try:
-            consult(prolog_file)
+            self.engine.load()
             
             self.prolog_loaded = True
             
@@ -184,18 +305,28 @@ class DavisPutnamGUI:
             messagebox.showerror("Error", f"Failed to load Prolog file:\n{str(e)}")
     
     
+    def connect_server(self):
+        try:
+            self.client.status()
+            self.prolog_loaded = True
+            self.log_result(f"Connected to solver server at {self.client.url}\n")
+            self.log_result("="*60 + "\n\n")
+            self.status_var.set("Connected to solver server")
+        except Exception as e:
+            self.log_result(f"Error connecting to solver server: {str(e)}\n")
+            self.status_var.set("Solver server unavailable")
+    
+    
     def load_strategies(self):
         if not self.prolog_loaded:
             return
         
         try:
-            result = query_once("current_predicate(select_atom_most_balanced/2)")
-            if result:
-                self.strategies.append("select_atom_most_balanced")
-            
-            result = query_once("current_predicate(select_atom_shortest_clause/2)")
-            if result:
-                self.strategies.append("select_atom_shortest_clause")
+            if self.client is not None:
+                self.strategies.extend(self.client.strategies(SOLVER_NAME))
+            else:
+                # Every strategy registered with dp_strategy/1 in dp_sat.pl
+                self.strategies.extend(self.engine.strategies())
             
             if self.strategies:
                 self.strategy_combo['values'] = self.strategies
@@ -211,6 +342,7 @@ class DavisPutnamGUI:
             title="Select Knowledge Base File",
             filetypes=[
                 ("Prolog files", "*.pl"),
+                ("DIMACS CNF files", "*.cnf"),
             ]
         )
         if filename:
@@ -237,39 +369,19 @@ class DavisPutnamGUI:
             messagebox.showwarning("Warning", "Please select a strategy!")
             return
         
-        try:
-            self.log_result(f"\n{'='*60}\n")
-            self.log_result(f"Loading KB from file: {file_path}\n")
-            self.log_result(f"Strategy: {strategy}\n")
-            self.log_result(f"{'='*60}\n\n")
-            
-            # Use the new formatted predicate
-            query_str = f"run_dp_file_formatted('{file_path}', {strategy}, ResultType, ModelStr, Steps)"
-            result = query_once(query_str)
-            
-            if result and 'Steps' in result:
-                steps = result['Steps']
-                result_type = result.get('ResultType', 'unknown')
-                model_str = result.get('ModelStr', '')
-                
-                if result_type == 'UNSAT':
-                    self.log_result(f"Result: UNSATISFIABLE\n")
-                    self.status_var.set(f"UNSAT - Steps: {steps}")
-                else:
-                    self.log_result(f"Result: SATISFIABLE\n")
-                    if model_str:
-                        self.log_result(f"Model: [{model_str}]\n")
-                    self.status_var.set(f"SAT - Steps: {steps}")
-                
-                self.log_result(f"Steps: {steps}\n\n")
-            else:
-                self.log_result("Query failed or returned no results.\n\n")
-                self.status_var.set("Query failed")
+        if self.is_running():
+            messagebox.showwarning("Warning", "A solver run is already in progress!")
+            return
         
-        except Exception as e:
-            self.log_result(f"Error: {str(e)}\n\n")
-            self.status_var.set("Error occurred")
-            messagebox.showerror("Error", f"Error running DP solver:\n{str(e)}")
+        self.log_result(f"\n{'='*60}\n")
+        self.log_result(f"Loading KB from file: {file_path}\n")
+        self.log_result(f"Strategy: {strategy}\n")
+        self.log_result(f"{'='*60}\n\n")
+        
+        self.run_in_background(
+            self.solve_file, file_path, strategy, self.profile_var.get(), self.preprocess_var.get(),
+            1, self.current_limits()
+        )
     
     
     def run_dp_solver(self):
@@ -289,39 +401,141 @@ class DavisPutnamGUI:
             messagebox.showwarning("Warning", "Please select a strategy!")
             return
         
+        if self.is_running():
+            messagebox.showwarning("Warning", "A solver run is already in progress!")
+            return
+        
         self.log_result(f"\n{'='*60}\n")
         self.log_result(f"Running: {problem_display}\n")
         self.log_result(f"Strategy: {strategy}\n")
         self.log_result(f"{'='*60}\n\n")
         
-        try:
-            # Use the new formatted predicate
-            query_str = f"run_dp_file_formatted('{problem_path}', {strategy}, ResultType, ModelStr, Steps)"
-            result = query_once(query_str)
-            
-            if result and 'Steps' in result:
-                steps = result['Steps']
-                result_type = result.get('ResultType', 'unknown')
-                model_str = result.get('ModelStr', '')
-                
-                if result_type == 'UNSAT':
-                    self.log_result(f"Result: UNSATISFIABLE\n")
-                    self.status_var.set(f"UNSAT - Steps: {steps}")
-                else:
-                    self.log_result(f"Result: SATISFIABLE\n")
-                    if model_str:
-                        self.log_result(f"Model: [{model_str}]\n")
-                    self.status_var.set(f"SAT - Steps: {steps}")
-                
-                self.log_result(f"Steps: {steps}\n\n")
-            else:
-                self.log_result("Query failed or returned no results.\n\n")
-                self.status_var.set("Query failed")
+        self.run_in_background(
+            self.solve_file, problem_path, strategy,
+            self.profile_var.get(), self.preprocess_var.get(), self.threads_var.get(), self.current_limits()
+        )
+    
+    
+    def current_limits(self):
+        return Limits(timeout=self.timeout_var.get() or None, inferences=self.inferences_var.get() or None)
+    
+    
+    def solve_file(self, file_path, strategy, profile=False, preprocess=False, threads=1, limits=None):
+        """Worker task: solve one KB file and log the result"""
+        if self.client is not None:
+            self.solve_remote(file_path, strategy, preprocess, threads, limits or Limits())
+            return
         
-        except Exception as e:
-            self.log_result(f"Error: {str(e)}\n\n")
-            self.status_var.set("Error occurred")
-            messagebox.showerror("Error", f"Error running DP solver:\n{str(e)}")
+        # Preprocessed and cube-and-conquer runs are cached apart from plain ones
+        cache_strategy = f"{strategy}+preprocess" if preprocess else strategy
+        if threads > 1:
+            cache_strategy += "+cubes"
+        key, cached = self.lookup_cache(file_path, cache_strategy)
+        from_cache = cached is not None and not profile
+        
+        if from_cache:
+            answer = SatAnswer(**cached)
+        else:
+            answer = self.engine.solve_file(
+                file_path, strategy, preprocess=preprocess, profile=profile, limits=limits, threads=threads
+            )
+            # An unknown answer only says how far this budget got
+            if answer.reason is None:
+                self.store_result(key, cache_strategy, answer)
+        
+        cache_note = " (cached)" if from_cache else ""
+        self.log_answer(answer.result_type, answer.model, answer.reason)
+        self.log_engine(answer.engine)
+        self.set_status(f"{answer.result_type} - Steps: {answer.steps}{cache_note}")
+        
+        self.log_result(f"Steps: {answer.steps}\n")
+        self.log_result(f"Propagations: {answer.propagations}\n")
+        self.log_result(f"Source: {'cache' if from_cache else 'solver'}\n\n")
+        self.log_stats(answer.stats)
+    
+    
+    def solve_remote(self, file_path, strategy, preprocess, threads, limits):
+        """Worker task body in thin-client mode: the server runs the solver"""
+        self.remote_requests = [self.request_id]
+        record = self.client.run_cancellable(
+            lambda: self.client.solve(
+                SOLVER_NAME, strategy, path=file_path, preprocess=preprocess, threads=threads,
+                request_id=self.request_id, timeout=limits.timeout, inferences=limits.inferences
+            ),
+            self.remote_requests,
+            self.cancel_event
+        )
+        outcome = remote_outcome(record)
+        
+        if 'error' in outcome:
+            self.log_result(f"Query failed: {outcome['error']}\n\n")
+            self.set_status(f"Query failed ({record['status']})")
+            return
+        
+        self.log_answer(outcome['result_type'], outcome['model'], outcome['reason'])
+        self.log_engine(outcome['engine'])
+        
+        self.log_result(f"Steps: {outcome['steps']}\n")
+        self.log_result(f"Propagations: {outcome['propagations']}\n")
+        self.log_result(f"Time: {outcome['time']:.4f}s\n")
+        self.log_result(f"Source: server\n")
+        if record.get('preprocess'):
+            self.log_result("\nPreprocessing:\n" + "\n".join(record['preprocess']) + "\n")
+        self.log_result("\n")
+        self.set_status(f"{outcome['result_type']} - Steps: {outcome['steps']}")
+    
+    
+    def log_answer(self, result_type, model, reason=None):
+        if result_type == 'UNSAT':
+            self.log_result(f"Result: UNSATISFIABLE\n")
+        elif result_type == 'UNKNOWN':
+            self.log_result(f"Result: UNKNOWN ({reason} limit reached)\n")
+            if model:
+                self.log_result(f"Partial assignment ({len(model)} atoms): [{model_text(model)}]\n")
+        else:
+            self.log_result(f"Result: SATISFIABLE\n")
+            if model:
+                self.log_result(f"Model: [{model_text(model)}]\n")
+    
+    
+    def log_engine(self, engine):
+        if engine is not None:
+            self.log_result(f"Engine: {engine} (large instance)\n")
+    
+    
+    def lookup_cache(self, file_path, strategy):
+        """Return the cache key for a KB file and strategy, and the cached result if any"""
+        key = cache_key(SOLVER_NAME, strategy, self.engine.canonical_kb(file_path))
+        cached = self.cache.get(key)
+        # Entries written before the engine facade use other field names
+        if cached is not None and set(cached) != set(CACHED_FIELDS):
+            cached = None
+        return key, cached
+    
+    
+    def store_result(self, key, strategy, answer):
+        payload = {name: getattr(answer, name) for name in CACHED_FIELDS}
+        # A profile report belongs to the run that produced it
+        payload['stats'] = {k: v for k, v in answer.stats.items() if k != 'profile'}
+        self.cache.put(key, SOLVER_NAME, strategy, payload)
+    
+    
+    def log_stats(self, stats):
+        stats = dict(stats)
+        report = stats.pop('profile', None)
+        passes = stats.pop('preprocess', None)
+        
+        self.log_result("Statistics:\n")
+        for name, value in stats.items():
+            if isinstance(value, float):
+                value = f"{value:.4f}"
+            self.log_result(f"  {name}: {value}\n")
+        
+        if passes:
+            self.log_result(f"\nPreprocessing:\n{passes}\n")
+        if report:
+            self.log_result(f"\nProfile:\n{report}\n")
+        self.log_result("\n")
     
     
     def compare_strategies(self):
@@ -340,78 +554,256 @@ class DavisPutnamGUI:
             messagebox.showwarning("Warning", "Need at least 2 strategies to compare!")
             return
         
+        if self.is_running():
+            messagebox.showwarning("Warning", "A solver run is already in progress!")
+            return
+        
         self.log_result(f"\n{'='*60}\n")
         self.log_result(f"COMPARING STRATEGIES\n")
         self.log_result(f"Problem: {problem_display}\n")
         self.log_result(f"{'='*60}\n")
         
-        results = []
-        
-        for strategy in self.strategies:
-            self.log_result(f"\nStrategy: {strategy}\n")
-            self.log_result(f"{'-'*40}\n")
-            
-            try:
-                # Use the new formatted predicate
-                query_str = f"run_dp_file_formatted('{problem_path}', {strategy}, ResultType, ModelStr, Steps)"
-                result = query_once(query_str)
-                
-                if result and 'Steps' in result:
-                    steps = result['Steps']
-                    result_type = result.get('ResultType', 'unknown')
-                    model_str = result.get('ModelStr', '')
-                    
-                    if result_type == 'UNSAT':
-                        self.log_result(f"Result: UNSATISFIABLE\n")
-                    else:
-                        self.log_result(f"Result: SATISFIABLE\n")
-                        if model_str:
-                            self.log_result(f"Model: [{model_str}]\n")
-                    
-                    self.log_result(f"Steps: {steps}\n")
-                    results.append((strategy, steps))
-                else:
-                    self.log_result("Query failed\n")
-                    results.append((strategy, None))
-                    
-            except Exception as e:
-                self.log_result(f"Query failed\n")
-                results.append((strategy, None))
+        self.run_in_background(self.compare_task, problem_path, list(self.strategies), self.current_limits())
+    
+    
+    def compare_task(self, problem_path, strategies, limits):
+        """Worker task: run every strategy in parallel and summarize"""
+        outcomes = self.run_all(problem_path, strategies, limits)
         
         self.log_result(f"\n{'='*60}\n")
         self.log_result(f"COMPARISON SUMMARY\n")
         self.log_result(f"{'='*60}\n")
         
-        for strategy, steps in results:
-            if steps is not None:
-                self.log_result(f"{strategy}: {steps} steps\n")
-            else:
+        by_strategy = {outcome['strategy']: outcome for outcome in outcomes}
+        results = []
+        for strategy in strategies:
+            outcome = by_strategy[strategy]
+            if 'error' in outcome:
                 self.log_result(f"{strategy}: Failed\n")
-        
-        valid_results = [(s, st) for s, st in results if st is not None]
-        if len(valid_results) >= 2:
-            best = min(valid_results, key=lambda x: x[1])
-            worst = max(valid_results, key=lambda x: x[1])
+            elif outcome['result_type'] == 'UNKNOWN':
+                self.log_result(
+                    f"{strategy}: {outcome['reason']} limit reached after {outcome['steps']} steps\n"
+                )
+            else:
+                engine_note = f" [{outcome['engine']} engine]" if outcome['engine'] else ""
+                self.log_result(
+                    f"{strategy}: {outcome['steps']} steps, "
+                    f"{outcome['propagations']} propagations, {outcome['time']:.4f}s{engine_note}\n"
+                )
+                results.append((strategy, outcome['steps'], outcome['time']))
+        
+        if len(results) >= 2:
+            best = min(results, key=lambda x: x[1])
+            worst = max(results, key=lambda x: x[1])
+            fastest = min(results, key=lambda x: x[2])
             
             self.log_result(f"\nBest: {best[0]} ({best[1]} steps)\n")
             if best[1] != worst[1]:
                 diff = worst[1] - best[1]
                 self.log_result(f"Difference: {diff} steps\n")
+            self.log_result(f"Fastest: {fastest[0]} ({fastest[2]:.4f}s)\n")
+        
+        self.log_result("\n")
+        self.set_status("Comparison completed")
+    
+    
+    def run_portfolio(self):
+        if not self.prolog_loaded:
+            messagebox.showerror("Error", "Prolog file not loaded!")
+            return
+        
+        problem_display = self.problem_var.get()
+        problem_path = self.problems.get(problem_display)
+        
+        if not problem_path:
+            messagebox.showwarning("Warning", "Please select a problem!")
+            return
+        
+        if len(self.strategies) < 2:
+            messagebox.showwarning("Warning", "Need at least 2 strategies for a portfolio run!")
+            return
+        
+        if self.is_running():
+            messagebox.showwarning("Warning", "A solver run is already in progress!")
+            return
+        
+        self.log_result(f"\n{'='*60}\n")
+        self.log_result(f"PORTFOLIO RUN (first finisher wins)\n")
+        self.log_result(f"Problem: {problem_display}\n")
+        self.log_result(f"{'='*60}\n")
+        
+        self.run_in_background(self.portfolio_task, problem_path, list(self.strategies), self.current_limits())
+    
+    
+    def portfolio_task(self, problem_path, strategies, limits):
+        """Worker task: race all strategies and keep the first answer"""
+        outcomes = self.run_all(problem_path, strategies, limits, first_only=True)
+        
+        winner = next((o for o in outcomes if is_answer(o)), None)
+        if winner is None:
+            self.log_result("\nNo strategy produced an answer.\n\n")
+            self.set_status("Portfolio failed")
+            return
         
+        stopped = [s for s in strategies if s not in {o['strategy'] for o in outcomes}]
+        self.log_result(f"\nWinner: {winner['strategy']} ({winner['time']:.4f}s)\n")
+        if stopped:
+            self.log_result(f"Stopped: {', '.join(stopped)}\n")
         self.log_result("\n")
-        self.status_var.set("Comparison completed")
+        self.set_status(f"{winner['result_type']} - {winner['strategy']} finished first")
+    
+    
+    def run_all(self, problem_path, strategies, limits, first_only=False):
+        """Run strategies in parallel, in local worker processes or on the server"""
+        if self.client is not None:
+            self.remote_requests = [strategy_request_id(self.request_id, strategy) for strategy in strategies]
+            records = self.client.run_cancellable(
+                lambda: self.client.solve_strategies(
+                    SOLVER_NAME, problem_path, strategies, first_only=first_only,
+                    on_result=lambda record: self.log_outcome(remote_outcome(record)),
+                    request_id=self.request_id, timeout=limits.timeout, inferences=limits.inferences
+                ),
+                self.remote_requests,
+                self.cancel_event
+            )
+            return [remote_outcome(record) for record in records]
+        
+        encoded = self.engine.read_encoded(problem_path)
+        return run_strategies(
+            encoded,
+            strategies,
+            first_only=first_only,
+            cancel_event=self.cancel_event,
+            on_result=self.log_outcome,
+            limits=limits
+        )
+    
+    
+    def log_outcome(self, outcome):
+        self.log_result(f"\nStrategy: {outcome['strategy']}\n")
+        self.log_result(f"{'-'*40}\n")
+        
+        if 'error' in outcome:
+            self.log_result(f"Query failed: {outcome['error']}\n")
+            return
+        
+        self.log_answer(outcome['result_type'], outcome['model'], outcome['reason'])
+        self.log_engine(outcome['engine'])
+        
+        self.log_result(f"Steps: {outcome['steps']}\n")
+        self.log_result(f"Propagations: {outcome['propagations']}\n")
+        self.log_result(f"Time: {outcome['time']:.4f}s\n")
+    
+    
+    def is_running(self):
+        return self.worker is not None
+    
+    
+    def run_in_background(self, task, *args):
+        """Run task(*args) on a worker thread so the window stays responsive"""
+        self.worker_id = None
+        # Requests sent to the server in thin-client mode carry this id
+        self.request_id = uuid.uuid4().hex
+        self.remote_requests = []
+        self.final_status = "Ready"
+        self.cancel_event.clear()
+        self.worker = threading.Thread(target=self.worker_main, args=(task, args), daemon=True)
+        self.cancel_btn.state(['!disabled'])
+        self.status_var.set("Running...")
+        self.worker.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+    
+    
+    def worker_main(self, task, args):
+        # janus gives every Python thread its own Prolog engine; the thread
+        # id is what progress_value/3 and progress_cancel/1 refer to.
+        try:
+            if self.client is None:
+                result = query_once("progress_enable(Names, Id)", {"Names": PROGRESS_COUNTERS})
+                self.worker_id = result['Id']
+            task(*args)
+        except Exception as e:
+            if is_cancellation(e):
+                self.log_result("Cancelled.\n\n")
+                self.set_status("Cancelled")
+            else:
+                self.log_result(f"Error: {str(e)}\n\n")
+                self.set_status("Error occurred")
+                self.messages.put(('error', str(e)))
+        finally:
+            self.messages.put(('done', None))
+    
+    
+    def poll_worker(self):
+        finished = False
+        while True:
+            try:
+                kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'log':
+                self.log_result(payload)
+            elif kind == 'status':
+                self.final_status = payload
+            elif kind == 'error':
+                messagebox.showerror("Error", f"Error running DP solver:\n{payload}")
+            elif kind == 'done':
+                finished = True
+        
+        if finished:
+            self.worker = None
+            self.worker_id = None
+            self.cancel_btn.state(['disabled'])
+            self.status_var.set(self.final_status)
+            return
+        
+        if self.worker_id is not None:
+            try:
+                result = query_once("progress_value(Id, decisions, Value)", {"Id": self.worker_id})
+                self.status_var.set(f"Running... decisions: {result['Value']}")
+            except Exception:
+                pass
+        self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+    
+    
+    def cancel_run(self):
+        # Parallel and server runs wait in Python, so they watch the event too
+        self.cancel_event.set()
+        if self.client is not None:
+            self.client.cancel_all(self.remote_requests)
+            self.status_var.set("Cancelling...")
+            return
+        if self.worker_id is None:
+            return
+        query_once("progress_cancel(Id)", {"Id": self.worker_id})
+        self.status_var.set("Cancelling...")
+    
+    
+    def set_status(self, message):
+        """Set the status bar, deferring to the main loop from a worker thread"""
+        if threading.current_thread() is not threading.main_thread():
+            self.messages.put(('status', message))
+        else:
+            self.status_var.set(message)
     
     
     def log_result(self, message):
         """Append message to result text area"""
+        if threading.current_thread() is not threading.main_thread():
+            self.messages.put(('log', message))
+            return
         self.result_text.insert(tk.END, message)
         self.result_text.see(tk.END)
         self.root.update_idletasks()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Davis-Putnam SAT solver GUI.")
+    parser.add_argument('--server', default=None, help="solver_server.py URL to use instead of a local engine")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = DavisPutnamGUI(root)
+    app = DavisPutnamGUI(root, server=args.server)
     root.mainloop()
 
 
@@ -0,0 +1,88 @@
+"""Run several DP strategies at once, one worker process per strategy.
+
+Every worker consults its own copy of dp_sat.pl. The knowledge base is
+parsed and encoded once by the caller (DPEngine.read_encoded) and the
+integer clauses are shipped to the workers, so no worker touches the KB file.
+"""
+import multiprocessing
+import queue
+import time
+
+from engines import DPEngine
+
+
+WAIT_INTERVAL = 0.1
+ENGINE = DPEngine()
+
+
+class SolverCancelled(Exception):
+    def __init__(self):
+        super().__init__("cancelled")
+
+
+def init_worker():
+    ENGINE.load()
+
+
+def solve_encoded(strategy, encoded, limits=None):
+    """Worker entry point: solve the encoded KB with one strategy"""
+    start = time.perf_counter()
+    try:
+        answer = ENGINE.solve_encoded(encoded, strategy, limits=limits)
+    except Exception as e:
+        # janus exceptions do not always survive pickling
+        return {'strategy': strategy, 'error': str(e)}
+    elapsed = time.perf_counter() - start
+
+    return {
+        'strategy': strategy,
+        'result_type': answer.result_type,
+        'reason': answer.reason,
+        'engine': answer.engine,
+        'model': answer.model,
+        'steps': answer.steps,
+        'propagations': answer.propagations,
+        'time': elapsed,
+    }
+
+
+def run_strategies(encoded, strategies, first_only=False, cancel_event=None, on_result=None, limits=None):
+    """Solve the encoded KB with every strategy in parallel.
+
+    Outcomes are returned (and passed to on_result) in finishing order.
+    With first_only, the pool is stopped as soon as one strategy answers;
+    a strategy that runs out of its limits does not count as an answer.
+    """
+    outcomes = queue.Queue()
+    context = multiprocessing.get_context("spawn")
+    pool = context.Pool(len(strategies), initializer=init_worker)
+
+    try:
+        for strategy in strategies:
+            pool.apply_async(
+                solve_encoded,
+                (strategy, encoded, limits),
+                callback=outcomes.put,
+                error_callback=lambda e, s=strategy: outcomes.put({'strategy': s, 'error': str(e)})
+            )
+
+        collected = []
+        while len(collected) < len(strategies):
+            if cancel_event is not None and cancel_event.is_set():
+                raise SolverCancelled()
+            try:
+                outcome = outcomes.get(timeout=WAIT_INTERVAL)
+            except queue.Empty:
+                continue
+
+            collected.append(outcome)
+            if on_result:
+                on_result(outcome)
+            if first_only and 'error' not in outcome and outcome['result_type'] != 'UNKNOWN':
+                break
+
+        return collected
+
+    finally:
+        pool.terminate()
+        pool.join()
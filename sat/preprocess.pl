@@ -0,0 +1,350 @@
+% CNF preprocessing shared by the DP and resolution front ends. Clauses
+% are lists of literals, either signed integers (encode_kb/3) or atoms
+% and neg(Atom). preprocess/4 runs the passes in order and reports, for
+% each one, how many clauses it removed and how many literals it removed
+% and added (elimination can add more literals than it removes).
+%
+% Probing and variable elimination only preserve satisfiability, so the
+% removed clauses are kept on a stack of eliminated(Atom, Clauses) terms,
+% newest first, and preprocess_extend_model/4 uses it to turn a model of
+% the simplified KB into a model of the original one. Passes other than
+% duplicate removal need ground clauses and are skipped otherwise.
+
+preprocess_passes([duplicates, subsumption, self_subsumption, probing, elimination]).
+
+% Variable elimination skips atoms with more resolvent pairs than this.
+preprocess_max_pairs(64).
+
+preprocess(Clauses, Simplified, Eliminated, Report) :-
+    (ground(Clauses) -> preprocess_passes(Passes) ; Passes = [duplicates]),
+    pre_run_passes(Passes, Clauses, [], Simplified, Eliminated, Report).
+
+% Duplicate and tautology removal only, the pass that also holds for
+% clauses with variables.
+preprocess_duplicates(Clauses, Simplified, Report) :-
+    pre_run_passes([duplicates], Clauses, [], Simplified, _, Report).
+
+pre_run_passes([], Clauses, Eliminated, Clauses, Eliminated, []).
+pre_run_passes([Pass|Passes], Clauses0, Eliminated0, Clauses, Eliminated, [pass(Pass, Removed, RemovedLits, AddedLits)|Report]) :-
+    pre_pass(Pass, Clauses0, Eliminated0, Clauses1, Eliminated1),
+    pre_size(Clauses0, Count0, Lits0),
+    pre_size(Clauses1, Count1, Lits1),
+    Removed is Count0 - Count1,
+    RemovedLits is max(0, Lits0 - Lits1),
+    AddedLits is max(0, Lits1 - Lits0),
+    pre_run_passes(Passes, Clauses1, Eliminated1, Clauses, Eliminated, Report).
+
+pre_size(Clauses, Count, Lits) :-
+    length(Clauses, Count),
+    foldl(pre_add_length, Clauses, 0, Lits).
+
+pre_add_length(Clause, Total0, Total) :-
+    length(Clause, Length),
+    Total is Total0 + Length.
+
+preprocess_report(Report, String) :-
+    maplist(pre_report_line, Report, Lines),
+    atomic_list_concat(Lines, '\n', Atom),
+    atom_string(Atom, String).
+
+pre_report_line(pass(Pass, Removed, RemovedLits, AddedLits), Line) :-
+    format(
+        atom(Line),
+        '~w: ~d clauses, ~d literals removed, ~d literals added',
+        [Pass, Removed, RemovedLits, AddedLits]
+    ).
+
+% % % % % % % % % % % % %
+
+pre_complement(Lit, Comp) :-
+    integer(Lit),
+    !,
+    Comp is -Lit.
+pre_complement(neg(Atom), Atom) :- !.
+pre_complement(Atom, neg(Atom)).
+
+pre_atom(Lit, Atom) :-
+    integer(Lit),
+    !,
+    Atom is abs(Lit).
+pre_atom(neg(Atom), Atom) :- !.
+pre_atom(Atom, Atom).
+
+pre_tautology(Clause) :-
+    member(Lit, Clause),
+    pre_complement(Lit, Comp),
+    member(Other, Clause),
+    Other == Comp,
+    !.
+
+% Assoc from each literal to the clauses containing it.
+pre_occurrences(Clauses, Occurs) :-
+    findall(Lit-Clause, (member(Clause, Clauses), member(Lit, Clause)), Pairs),
+    keysort(Pairs, Sorted),
+    group_pairs_by_key(Sorted, Grouped),
+    list_to_assoc(Grouped, Occurs).
+
+pre_occurring(Lit, Occurs, Clauses) :-
+    (get_assoc(Lit, Occurs, Clauses) -> true ; Clauses = []).
+
+% % % % % % % % % % % % %
+
+pre_pass(duplicates, Clauses0, Eliminated, Clauses, Eliminated) :-
+    maplist(sort, Clauses0, Sorted),
+    exclude(pre_tautology, Sorted, Kept),
+    sort(Kept, Clauses).
+
+% Shorter clauses first; a kept clause is indexed by its first literal,
+% which every clause it subsumes must contain.
+pre_pass(subsumption, Clauses0, Eliminated, Clauses, Eliminated) :-
+    (
+        memberchk([], Clauses0) ->
+        Clauses = [[]] ;
+        map_list_to_pairs(length, Clauses0, Pairs),
+        keysort(Pairs, Sorted),
+        pairs_values(Sorted, ByLength),
+        empty_assoc(Empty),
+        foldl(pre_keep_unsubsumed, ByLength, Empty-[], _-Kept),
+        sort(Kept, Clauses)
+    ).
+
+% Removes one literal per clause per sweep: Lit goes when some clause
+% Comp \/ D has D a subset of the rest. Sweeps repeat until nothing changes.
+pre_pass(self_subsumption, Clauses0, Eliminated, Clauses, Eliminated) :-
+    pre_occurrences(Clauses0, Occurs),
+    maplist(pre_strengthen(Occurs), Clauses0, Clauses1),
+    (
+        Clauses1 == Clauses0 ->
+        Clauses = Clauses0 ;
+        sort(Clauses1, Clauses2),
+        pre_pass(self_subsumption, Clauses2, Eliminated, Clauses, Eliminated)
+    ).
+
+% A literal whose assignment propagates to a conflict is failed, so its
+% complement holds. Only literals whose complement occurs in a binary
+% clause can propagate anything, so only those are probed.
+pre_pass(probing, Clauses0, Eliminated0, Clauses, Eliminated) :-
+    pre_occurrences(Clauses0, Occurs),
+    findall(Lit, member([Lit], Clauses0), Units),
+    empty_assoc(Empty),
+    (
+        pre_propagate(Units, Occurs, Empty, Base0) ->
+        findall(Lit, (member([A, B], Clauses0), member(L, [A, B]), pre_complement(L, Lit)), Candidates0),
+        sort(Candidates0, Candidates),
+        foldl(pre_probe(Occurs), Candidates, Base0, Base) ;
+        Base = unsat
+    ),
+    (
+        Base == unsat ->
+        Clauses = [[]],
+        Eliminated = Eliminated0 ;
+        pre_assign_simplify(Clauses0, Base, Clauses),
+        assoc_to_list(Base, Assigned),
+        foldl(pre_push_unit, Assigned, Eliminated0, Eliminated)
+    ).
+
+% Davis-Putnam elimination: an atom is replaced by all non-tautological
+% resolvents on it when that does not increase the number of clauses.
+pre_pass(elimination, Clauses0, Eliminated0, Clauses, Eliminated) :-
+    empty_assoc(Empty),
+    foldl(pre_store_clause, Clauses0, Empty-Empty-1, Store0-Occurs0-Next0),
+    assoc_to_list(Occurs0, Occurrences),
+    map_list_to_pairs(pre_occurrence_count, Occurrences, Counted),
+    keysort(Counted, Sorted),
+    findall(Atom, member(_-(Atom-_), Sorted), Atoms),
+    foldl(pre_eliminate, Atoms, elim(Store0, Occurs0, Next0, Eliminated0), elim(Store, _, _, Eliminated)),
+    assoc_to_values(Store, Clauses1),
+    sort(Clauses1, Clauses).
+
+% % % % % % % % % % % % %
+
+pre_keep_unsubsumed(Clause, Index0-Kept0, Index-Kept) :-
+    (
+        pre_subsumed(Clause, Index0) ->
+        Index = Index0,
+        Kept = Kept0 ;
+        Clause = [First|_],
+        pre_occurring(First, Index0, Indexed),
+        put_assoc(First, Index0, [Clause|Indexed], Index),
+        Kept = [Clause|Kept0]
+    ).
+
+pre_subsumed(Clause, Index) :-
+    member(Lit, Clause),
+    get_assoc(Lit, Index, Candidates),
+    member(Candidate, Candidates),
+    ord_subset(Candidate, Clause),
+    !.
+
+pre_strengthen(Occurs, Clause, Strengthened) :-
+    (
+        select(Lit, Clause, Rest),
+        pre_complement(Lit, Comp),
+        get_assoc(Comp, Occurs, Others),
+        member(Other, Others),
+        ord_selectchk(Comp, Other, OtherRest),
+        ord_subset(OtherRest, Rest) ->
+        Strengthened = Rest ;
+        Strengthened = Clause
+    ).
+
+% % % % % % % % % % % % %
+
+% Assignments map each atom to its true literal; fails on conflict.
+pre_propagate([], _, Assign, Assign).
+pre_propagate([Lit|Queue], Occurs, Assign0, Assign) :-
+    pre_atom(Lit, Atom),
+    (
+        get_assoc(Atom, Assign0, True) ->
+        True == Lit,
+        pre_propagate(Queue, Occurs, Assign0, Assign) ;
+        put_assoc(Atom, Assign0, Lit, Assign1),
+        pre_complement(Lit, Comp),
+        pre_occurring(Comp, Occurs, Watched),
+        foldl(pre_implied(Assign1), Watched, Queue, Queue1),
+        pre_propagate(Queue1, Occurs, Assign1, Assign)
+    ).
+
+pre_implied(Assign, Clause, Queue0, Queue) :-
+    pre_clause_status(Clause, Assign, Status),
+    (
+        Status = unit(Lit) ->
+        Queue = [Lit|Queue0] ;
+        Status \== conflict,
+        Queue = Queue0
+    ).
+
+pre_clause_status(Clause, Assign, Status) :-
+    (
+        member(Lit, Clause),
+        pre_value(Lit, Assign, true) ->
+        Status = satisfied ;
+        include(pre_unassigned(Assign), Clause, Free),
+        (
+            Free = [] ->
+            Status = conflict ;
+            Free = [Lit] ->
+            Status = unit(Lit) ;
+            Status = open
+        )
+    ).
+
+pre_value(Lit, Assign, Value) :-
+    pre_atom(Lit, Atom),
+    get_assoc(Atom, Assign, True),
+    (True == Lit -> Value = true ; Value = false).
+
+pre_unassigned(Assign, Lit) :-
+    pre_atom(Lit, Atom),
+    \+ get_assoc(Atom, Assign, _).
+
+pre_probe(_, _, unsat, unsat) :- !.
+pre_probe(Occurs, Lit, Base0, Base) :-
+    pre_atom(Lit, Atom),
+    (
+        get_assoc(Atom, Base0, _) ->
+        Base = Base0 ;
+        pre_propagate([Lit], Occurs, Base0, _) ->
+        Base = Base0 ;
+        pre_complement(Lit, Comp),
+        pre_propagate([Comp], Occurs, Base0, Base) ->
+        true ;
+        Base = unsat
+    ).
+
+pre_assign_simplify(Clauses0, Assign, Clauses) :-
+    exclude(pre_satisfied(Assign), Clauses0, Open),
+    maplist(pre_drop_false(Assign), Open, Shortened),
+    sort(Shortened, Clauses).
+
+pre_satisfied(Assign, Clause) :-
+    member(Lit, Clause),
+    pre_value(Lit, Assign, true),
+    !.
+
+pre_drop_false(Assign, Clause, Shortened) :-
+    exclude(pre_assigned(Assign), Clause, Shortened).
+
+pre_assigned(Assign, Lit) :-
+    pre_value(Lit, Assign, _).
+
+pre_push_unit(Atom-Lit, Eliminated, [eliminated(Atom, [[Lit]])|Eliminated]).
+
+% % % % % % % % % % % % %
+
+pre_store_clause(Clause, Store0-Occurs0-Id, Store-Occurs-Next) :-
+    put_assoc(Id, Store0, Clause, Store),
+    foldl(pre_index_literal(Id), Clause, Occurs0, Occurs),
+    Next is Id + 1.
+
+pre_index_literal(Id, Lit, Occurs0, Occurs) :-
+    pre_atom(Lit, Atom),
+    pre_occurring(Atom, Occurs0, Ids),
+    put_assoc(Atom, Occurs0, [Id|Ids], Occurs).
+
+pre_occurrence_count(_-Ids, Count) :-
+    length(Ids, Count).
+
+% Occurrence lists are never pruned; ids of removed clauses are skipped.
+pre_eliminate(Atom, elim(Store0, Occurs0, Next0, Eliminated0), elim(Store, Occurs, Next, Eliminated)) :-
+    pre_occurring(Atom, Occurs0, Ids0),
+    sort(Ids0, Ids),
+    findall(Id-Clause, (member(Id, Ids), get_assoc(Id, Store0, Clause)), Live),
+    pairs_values(Live, Clauses),
+    partition(memberchk(Atom), Clauses, Pos, Neg),
+    length(Pos, P),
+    length(Neg, N),
+    preprocess_max_pairs(MaxPairs),
+    (
+        P * N =< MaxPairs,
+        findall(R, (member(C1, Pos), member(C2, Neg), pre_resolvent(Atom, C1, C2, R)), Resolvents0),
+        sort(Resolvents0, Resolvents),
+        length(Resolvents, R),
+        R =< P + N ->
+        pairs_keys(Live, LiveIds),
+        foldl(pre_delete_clause, LiveIds, Store0, Store1),
+        foldl(pre_store_clause, Resolvents, Store1-Occurs0-Next0, Store-Occurs-Next),
+        Eliminated = [eliminated(Atom, Clauses)|Eliminated0] ;
+        Store = Store0,
+        Occurs = Occurs0,
+        Next = Next0,
+        Eliminated = Eliminated0
+    ).
+
+pre_resolvent(Atom, Pos, Neg, Resolvent) :-
+    ord_del_element(Pos, Atom, PosRest),
+    pre_complement(Atom, Comp),
+    ord_del_element(Neg, Comp, NegRest),
+    ord_union(PosRest, NegRest, Resolvent),
+    \+ pre_tautology(Resolvent).
+
+pre_delete_clause(Id, Store0, Store) :-
+    del_assoc(Id, Store0, _, Store).
+
+% % % % % % % % % % % % %
+
+% Model is a list of Atom/Value; atoms it leaves open default to false.
+preprocess_extend_model(Eliminated, Atoms, Model0, Model) :-
+    findall(Atom-false, member(Atom, Atoms), Defaults),
+    list_to_assoc(Defaults, Assign0),
+    foldl(pre_model_value, Model0, Assign0, Assign1),
+    foldl(pre_reconstruct, Eliminated, Assign1, Assign),
+    assoc_to_list(Assign, Pairs),
+    findall(Atom/Value, member(Atom-Value, Pairs), Model).
+
+pre_model_value(Atom/Value, Assign0, Assign) :-
+    put_assoc(Atom, Assign0, Value, Assign).
+
+pre_reconstruct(eliminated(Atom, Clauses), Assign0, Assign) :-
+    put_assoc(Atom, Assign0, false, Assign1),
+    (
+        member(Clause, Clauses),
+        \+ (member(Lit, Clause), pre_model_true(Lit, Assign1)) ->
+        put_assoc(Atom, Assign1, true, Assign) ;
+        Assign = Assign1
+    ).
+
+pre_model_true(Lit, Assign) :-
+    pre_atom(Lit, Atom),
+    get_assoc(Atom, Assign, Value),
+    (Lit == Atom -> Value == true ; Value == false).
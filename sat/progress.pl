@@ -0,0 +1,39 @@
+% Progress counters for solver runs started from a GUI worker thread.
+% The worker calls progress_enable/2 before running its goal; the engines
+% then bump named counters that another thread reads with progress_value/3.
+% Without progress_enable/2 the hooks are no-ops.
+
+progress_enable(Names, Id) :-
+    thread_self(Thread),
+    thread_property(Thread, id(Id)),
+    nb_setval(progress_id, Id),
+    forall(
+        member(Name, Names),
+        (progress_key(Id, Name, Key), flag(Key, _, 0))
+    ).
+
+progress_key(Id, Name, Key) :-
+    format(atom(Key), 'progress_~w_~w', [Name, Id]).
+
+progress_tick(Name) :-
+    (
+        nb_current(progress_id, Id) ->
+        progress_key(Id, Name, Key),
+        flag(Key, N, N + 1) ;
+        true
+    ).
+
+progress_set(Name, Value) :-
+    (
+        nb_current(progress_id, Id) ->
+        progress_key(Id, Name, Key),
+        flag(Key, _, Value) ;
+        true
+    ).
+
+progress_value(Id, Name, Value) :-
+    progress_key(Id, Name, Key),
+    flag(Key, Value, Value).
+
+progress_cancel(Id) :-
+    catch(thread_signal(Id, throw(cancelled)), _, true).
@@ -0,0 +1,57 @@
+"""Python handle for an incremental SAT session (sat_session_* in dp_sat.pl).
+
+The session lives in its own Prolog engine, so it survives between queries
+and can be used from any thread of the process that consulted dp_sat.pl,
+one call at a time.
+Literals are written in the KB syntax: `a` or `neg(a)`. They are split
+into name and sign here and passed as janus bindings, never as Prolog text.
+
+    session = SatSession()
+    session.add_clauses([["a", "b"], ["neg(a)", "c"]])
+    session.solve()                      # {'satisfiable': True, 'model': {...}, 'core': []}
+    session.solve(["neg(b)", "neg(c)"])  # unsat, core lists the assumptions to blame
+    session.close()
+"""
+from janus_swi import query_once
+
+from engines import parse_literal
+
+
+def literal_pairs(literals):
+    """Literals as (name, positive) tuples, which janus passes as Name-Positive"""
+    return [parse_literal(lit) for lit in literals]
+
+
+class SatSession:
+    def __init__(self):
+        self.name = query_once("sat_session_new(Session)")['Session']
+
+    def add_clauses(self, clauses):
+        result = query_once(
+            "sat_session_add_pairs(Session, Clauses)",
+            {"Session": self.name, "Clauses": [literal_pairs(clause) for clause in clauses]}
+        )
+        if not result['truth']:
+            raise RuntimeError(f"Could not add clauses to {self.name}")
+
+    def solve(self, assumptions=()):
+        result = query_once(
+            "sat_session_solve_pairs(Session, Assumptions, Result, Model, Core)",
+            {"Session": self.name, "Assumptions": literal_pairs(assumptions)}
+        )
+        if not result['truth']:
+            raise RuntimeError(f"Could not solve {self.name}")
+        return {
+            'satisfiable': result['Result'] == 'sat',
+            'model': dict(result['Model']),
+            'core': list(result['Core']),
+        }
+
+    def close(self):
+        query_once("sat_session_delete(Session)", {"Session": self.name})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,79 @@
+% Optional run statistics, shared by the SAT and resolution engines.
+% Counters live in one mutable term stored in a global variable and
+% updated with nb_setarg/3, so they survive backtracking. Outside
+% with_stats/3 every hook is a no-op. Each engine declares its counters
+% as stats_field(Name, Index) clauses, numbered from 1.
+% Notes are Name-Value facts about how the run went, such as an engine
+% substituted for the requested one; they are added after the counters.
+
+:- multifile stats_field/2.
+
+stats_enable :-
+    findall(0, stats_field(_, _), Zeros),
+    Counters =.. [counters|Zeros],
+    nb_setval(engine_stats, Counters),
+    nb_setval(engine_notes, []).
+
+stats_add(Name, N) :-
+    (
+        nb_current(engine_stats, Counters) ->
+        stats_field(Name, I),
+        arg(I, Counters, V0),
+        V is V0 + N,
+        nb_setarg(I, Counters, V) ;
+        true
+    ).
+
+stats_count(Name) :-
+    stats_add(Name, 1).
+
+% The first note under a name is kept.
+stats_note(Name, Value) :-
+    (
+        nb_current(engine_notes, Notes),
+        \+ memberchk(Name-_, Notes) ->
+        nb_setval(engine_notes, [Name-Value|Notes]) ;
+        true
+    ).
+
+stats_time(Name, Goal) :-
+    (
+        nb_current(engine_stats, _) ->
+        statistics(cputime, T0),
+        call(Goal),
+        statistics(cputime, T1),
+        Elapsed is T1 - T0,
+        stats_add(Name, Elapsed) ;
+        call(Goal)
+    ).
+
+with_stats(Profile, Goal, Stats) :-
+    setup_call_cleanup(
+        stats_enable,
+        stats_run(Profile, Goal, Stats),
+        (nb_delete(engine_stats), nb_delete(engine_notes))
+    ).
+
+stats_run(Profile, Goal, Stats) :-
+    statistics(cputime, T0),
+    statistics(inferences, I0),
+    stats_call(Profile, Goal, Extra),
+    statistics(cputime, T1),
+    statistics(inferences, I1),
+    nb_getval(engine_stats, Counters),
+    findall(
+        Name-Value,
+        (stats_field(Name, I), arg(I, Counters, Value)),
+        Pairs0
+    ),
+    Time is T1 - T0,
+    Inferences is I1 - I0,
+    nb_getval(engine_notes, Notes0),
+    reverse(Notes0, Notes),
+    append([Pairs0, Notes, [cputime-Time, inferences-Inferences|Extra]], Pairs),
+    dict_pairs(Stats, _, Pairs).
+
+stats_call(false, Goal, []) :-
+    once(Goal).
+stats_call(true, Goal, [profile-Report]) :-
+    with_output_to(string(Report), profile(once(Goal), [top(15)])).
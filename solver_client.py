@@ -0,0 +1,123 @@
+"""Client for solver_server.py, used by the GUIs in thin-client mode.
+
+    client = SolverClient("http://127.0.0.1:8765")
+    client.strategies('dp')
+    client.solve('dp', 'cdcl', path='sat/kbs/test_i.pl', timeout=10)
+"""
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+# Record statuses that carry an answer, as opposed to unknown, cancelled, timeout, memory or error
+ANSWER_STATUSES = ('sat', 'unsat', 'satisfiable', 'unsatisfiable')
+
+
+class SolverServiceError(Exception):
+    pass
+
+
+def strategy_request_id(request_id, strategy):
+    """The id solve_strategies gives the request for one strategy of a run"""
+    return f"{request_id}-{strategy}"
+
+
+class SolverClient:
+    def __init__(self, url=DEFAULT_URL):
+        self.url = url.rstrip("/")
+
+    def request(self, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode('utf-8')
+        request = Request(self.url + path, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urlopen(request) as response:
+                return json.loads(response.read())
+        except HTTPError as e:
+            raise SolverServiceError(json.loads(e.read()).get('error', str(e))) from None
+
+    def strategies(self, solver):
+        return self.request(f"/strategies?solver={solver}")
+
+    def status(self):
+        return self.request("/status")
+
+    def cancel(self, request_id):
+        """Stop a request sent with that request_id; False if the server no longer has it"""
+        return self.request("/cancel", {'id': request_id})['cancelled']
+
+    def cancel_all(self, request_ids):
+        """Cancel every request id, skipping the ones the server cannot be asked about"""
+        for request_id in request_ids:
+            try:
+                self.cancel(request_id)
+            except (SolverServiceError, OSError):
+                pass
+
+    def run_cancellable(self, call, request_ids, cancel_event, poll=0.1):
+        """Run a blocking solve call, cancelling request_ids on the server once cancel_event is set.
+
+        The cancel is repeated until the call returns, so a request that
+        reaches the server after the first one is still stopped. Raises
+        SolverServiceError when the run was cancelled.
+        """
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            future = executor.submit(call)
+            while not wait([future], timeout=poll).done:
+                if cancel_event.is_set():
+                    self.cancel_all(request_ids)
+            result = future.result()
+        finally:
+            executor.shutdown(wait=False)
+        if cancel_event.is_set():
+            raise SolverServiceError("Request cancelled")
+        return result
+
+    def solve(self, solver, strategy, path=None, kb=None, kb_format='pl', request_id=None, **limits):
+        """Solve a KB file (path) or KB text (kb); limits are timeout, memory_mb, inferences,
+        max_clauses, preprocess and threads"""
+        payload = {'solver': solver, 'strategy': strategy}
+        if request_id is not None:
+            payload['id'] = request_id
+        if path is not None:
+            payload['path'] = os.path.abspath(path)
+        else:
+            payload['kb'] = kb
+            payload['format'] = kb_format
+        payload.update({name: value for name, value in limits.items() if value is not None})
+        return self.request("/solve", payload)
+
+    def solve_strategies(self, solver, path, strategies, first_only=False, on_result=None, request_id=None, **limits):
+        """Send one request per strategy at once and return the records in completion order.
+
+        With first_only, the requests still running when the first answer
+        arrives are cancelled on the server. Each request's id is
+        strategy_request_id(request_id, strategy).
+        """
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+        records = []
+        executor = ThreadPoolExecutor(max_workers=len(strategies))
+        request_ids = {}
+        try:
+            for strategy in strategies:
+                strategy_id = strategy_request_id(request_id, strategy)
+                future = executor.submit(self.solve, solver, strategy, path=path, request_id=strategy_id, **limits)
+                request_ids[future] = strategy_id
+            for future in as_completed(request_ids):
+                record = future.result()
+                records.append(record)
+                if on_result is not None:
+                    on_result(record)
+                if first_only and record['status'] in ANSWER_STATUSES:
+                    break
+        finally:
+            unfinished = [strategy_id for future, strategy_id in request_ids.items() if not future.done()]
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.cancel_all(unfinished)
+        return records
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""Local solver service with a warm pool of Prolog engines.
+
+Each solver gets its own pool of worker processes that consult the solver
+file once at startup and then serve requests one at a time, so a request
+never pays for loading Prolog. Requests are JSON over localhost HTTP:
+
+    POST /solve        {"solver": "dp", "strategy": "cdcl", "path": "sat/kbs/test_i.pl"}
+                       {"solver": "dp", "strategy": "cdcl", "kb": "[a, b].\\n[neg(a)].", "format": "pl"}
+    POST /cancel       {"id": "..."}
+    GET  /strategies?solver=dp
+    GET  /status
+
+A solve request may also carry "timeout" (seconds), "memory_mb" (Prolog
+stack limit), "inferences", "max_clauses" (clauses kept by resolution),
+"preprocess" and "threads" (worker threads for resolvent generation or DP
+cubes, at most the number of CPUs). The answer is the record batch.py
+writes for one run, with status "unknown" when a limit ran out. Requests
+wait in the pool's queue until a worker is free; once more than --queue
+requests are pending for a solver, new ones are refused with 503.
+
+A request given an "id" can be stopped with /cancel: a queued request is
+dropped, and a running one is interrupted in Prolog. Either way it answers
+with status "cancelled". A worker that outlives its request's timeout by
+GRACE_PERIOD seconds is killed and replaced.
+
+    python solver_server.py --port 8765 --workers 2
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from janus_swi import query_once
+
+import batch
+
+
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_MEMORY_MB = 1024
+DEFAULT_QUEUE = 32
+GRACE_PERIOD = 10.0
+WAIT_INTERVAL = 0.1
+
+KB_FORMATS = {'pl': ".pl", 'cnf': ".cnf"}
+
+
+class RequestError(Exception):
+    pass
+
+
+def optional_limit(request, name):
+    value = request.get(name)
+    if value is None:
+        return None
+    value = int(value)
+    if value < 1:
+        raise RequestError(f"{name} must be positive")
+    return value
+
+
+def worker_solve(solver, request):
+    path = request.get('path')
+    tmp_path = None
+    if path is None:
+        suffix = KB_FORMATS[request.get('format', 'pl')]
+        fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w') as f:
+            f.write(request['kb'])
+        path = tmp_path
+    try:
+        record = batch.run_instance(
+            solver, path, request['strategy'], request['timeout'],
+            request.get('preprocess', False), request['memory_mb'], request['threads'],
+            request['inferences'], request['max_clauses']
+        )
+    finally:
+        if tmp_path is not None:
+            os.remove(tmp_path)
+    if tmp_path is not None:
+        record['file'] = None
+    return record
+
+
+def request_record(request, status, started, error=None):
+    """Record for a request that never got an answer from the solver"""
+    record = {
+        'file': request.get('path'), 'solver': request['solver'], 'strategy': request['strategy'],
+        'time': time.monotonic() - started, 'status': status,
+    }
+    if error is not None:
+        record['error'] = error
+    return record
+
+
+class RunningQuery:
+    """The query a worker process is running, as seen by its cancel listener"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.prolog_id = None
+        self.cancelled = False
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            if self.prolog_id is not None:
+                query_once("progress_cancel(Id)", {"Id": self.prolog_id})
+
+
+def worker_main(solver, conn):
+    """Worker process: load the solver once, then serve requests from conn.
+
+    Each request runs on a thread of its own (janus gives it its own Prolog
+    engine), so this thread stays free to receive a cancel and signal the
+    Prolog thread of the running query, as the GUIs' Cancel button does.
+    """
+    batch.load_solver(solver)
+    conn.send(('ready', batch.available_strategies(solver)))
+    running = RunningQuery()
+    while True:
+        message = conn.recv()
+        if message[0] == 'solve':
+            running = RunningQuery()
+            threading.Thread(target=worker_run, args=(solver, message[1], conn, running), daemon=True).start()
+        elif message[0] == 'cancel':
+            running.cancel()
+        else:
+            break
+
+
+def worker_run(solver, request, conn, running):
+    started = time.monotonic()
+    try:
+        result = query_once("thread_self(Thread), thread_property(Thread, id(Id))")
+        with running.lock:
+            running.prolog_id = result['Id']
+            cancelled = running.cancelled
+        if cancelled:
+            record = request_record(request, 'cancelled', started)
+        else:
+            record = worker_solve(solver, request)
+            if 'cancelled' in record.get('error', ""):
+                record['status'] = 'cancelled'
+                del record['error']
+    except Exception as e:
+        record = request_record(request, 'error', started, str(e))
+    finally:
+        with running.lock:
+            running.prolog_id = None
+    conn.send(('done', record))
+
+
+class WorkerProcess:
+    """One warm engine process and the pipe to it; starting it waits for Prolog to load"""
+
+    def __init__(self, solver, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(solver, child), daemon=True)
+        self.process.start()
+        child.close()
+        _, self.strategies = self.conn.recv()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(('stop',))
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.kill()
+
+
+class SolverPool:
+    """Worker processes for one solver plus a bound on queued requests.
+
+    A worker still busy GRACE_PERIOD seconds past its request's timeout is
+    stuck in code the budget cannot interrupt: it is killed and a fresh
+    worker is started in its place.
+    """
+
+    def __init__(self, solver, workers, max_queue):
+        self.context = multiprocessing.get_context("spawn")
+        self.solver = solver
+        self.workers = [WorkerProcess(solver, self.context) for _ in range(workers)]
+        self.idle = queue.Queue()
+        for worker in self.workers:
+            self.idle.put(worker)
+        self.slots = threading.BoundedSemaphore(max_queue)
+        self.pending = 0
+        self.cancels = {}
+        self.lock = threading.Lock()
+        self.strategies = self.workers[0].strategies
+
+    def solve(self, request):
+        if not self.slots.acquire(blocking=False):
+            return None
+        request_id = request.get('id')
+        cancel = threading.Event()
+        with self.lock:
+            self.pending += 1
+            if request_id is not None:
+                self.cancels[request_id] = cancel
+        try:
+            started = time.monotonic()
+            worker = self.idle.get()
+            if cancel.is_set():
+                self.idle.put(worker)
+                return request_record(request, 'cancelled', started)
+            return self.run(worker, request, cancel, started)
+        finally:
+            with self.lock:
+                self.pending -= 1
+                self.cancels.pop(request_id, None)
+            self.slots.release()
+
+    def run(self, worker, request, cancel, started):
+        worker.conn.send(('solve', request))
+        deadline = time.monotonic() + request['timeout'] + GRACE_PERIOD
+        cancel_sent = False
+        while not worker.conn.poll(WAIT_INTERVAL):
+            if cancel.is_set() and not cancel_sent:
+                worker.conn.send(('cancel',))
+                cancel_sent = True
+            if not worker.process.is_alive():
+                self.replace(worker)
+                return request_record(request, 'error', started, "worker process exited")
+            if time.monotonic() > deadline:
+                self.replace(worker)
+                return request_record(request, 'timeout', started, "worker did not stop in time and was restarted")
+        _, record = worker.conn.recv()
+        self.idle.put(worker)
+        return record
+
+    def cancel(self, request_id):
+        with self.lock:
+            cancel = self.cancels.get(request_id)
+        if cancel is None:
+            return False
+        cancel.set()
+        return True
+
+    def replace(self, worker):
+        worker.kill()
+        with self.lock:
+            self.workers.remove(worker)
+        threading.Thread(target=self.spawn, daemon=True).start()
+
+    def spawn(self):
+        worker = WorkerProcess(self.solver, self.context)
+        with self.lock:
+            self.workers.append(worker)
+        self.idle.put(worker)
+
+    def shutdown(self):
+        with self.lock:
+            workers = list(self.workers)
+        for worker in workers:
+            worker.stop()
+
+
+class SolverService:
+    def __init__(self, solvers, workers, max_queue, timeout, memory_mb):
+        self.pools = {solver: SolverPool(solver, workers, max_queue) for solver in solvers}
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+
+    def validate(self, request):
+        solver = request.get('solver', 'dp')
+        if solver not in self.pools:
+            raise RequestError(f"unknown solver: {solver}")
+        pool = self.pools[solver]
+        strategy = request.get('strategy')
+        if strategy not in pool.strategies:
+            raise RequestError(f"unknown strategy for {solver}: {strategy}")
+        if ('path' in request) == ('kb' in request):
+            raise RequestError("give exactly one of 'path' and 'kb'")
+        if 'path' in request and not os.path.isfile(request['path']):
+            raise RequestError(f"no such file: {request['path']}")
+        if request.get('format', 'pl') not in KB_FORMATS:
+            raise RequestError(f"unknown format: {request['format']}")
+        # Clients may lower the limits but not raise them
+        timeout = min(float(request.get('timeout', self.timeout)), self.timeout)
+        if timeout <= 0:
+            raise RequestError("timeout must be positive")
+        memory_mb = min(int(request.get('memory_mb', self.memory_mb)), self.memory_mb)
+        threads = max(1, min(int(request.get('threads', 1)), os.cpu_count() or 1))
+        if not isinstance(request.get('id', ""), str):
+            raise RequestError("'id' must be a string")
+        inferences = optional_limit(request, 'inferences')
+        max_clauses = optional_limit(request, 'max_clauses')
+        return pool, dict(
+            request, solver=solver, timeout=timeout, memory_mb=memory_mb, threads=threads,
+            inferences=inferences, max_clauses=max_clauses
+        )
+
+    def solve(self, request):
+        pool, request = self.validate(request)
+        return pool.solve(request)
+
+    def cancel(self, request_id):
+        return any(pool.cancel(request_id) for pool in self.pools.values())
+
+    def status(self):
+        return {
+            solver: {'strategies': pool.strategies, 'pending': pool.pending}
+            for solver, pool in self.pools.items()
+        }
+
+    def shutdown(self):
+        for pool in self.pools.values():
+            pool.shutdown()
+
+
+class SolverRequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def send_json(self, code, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/status":
+            self.send_json(200, self.service.status())
+        elif url.path == "/strategies":
+            solver = parse_qs(url.query).get('solver', ['dp'])[0]
+            pool = self.service.pools.get(solver)
+            if pool is None:
+                self.send_json(400, {'error': f"unknown solver: {solver}"})
+            else:
+                self.send_json(200, pool.strategies)
+        else:
+            self.send_json(404, {'error': "not found"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path not in ("/solve", "/cancel"):
+            self.send_json(404, {'error': "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            if path == "/cancel":
+                self.send_json(200, {'cancelled': self.service.cancel(request['id'])})
+                return
+            record = self.service.solve(request)
+        except (RequestError, KeyError, ValueError, TypeError) as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        if record is None:
+            self.send_json(503, {'error': "request queue is full"})
+        else:
+            self.send_json(200, record)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the SAT and resolution solvers over localhost HTTP.")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--solver', choices=sorted(batch.SOLVERS), action='append', dest='solvers')
+    parser.add_argument('-w', '--workers', type=int, default=2, help="warm engines per solver")
+    parser.add_argument('--queue', type=int, default=DEFAULT_QUEUE, help="pending requests allowed per solver")
+    parser.add_argument('-t', '--timeout', type=float, default=DEFAULT_TIMEOUT, help="maximum seconds per request")
+    parser.add_argument('-m', '--memory-mb', type=int, default=DEFAULT_MEMORY_MB, help="maximum Prolog stack per request")
+    args = parser.parse_args(argv)
+
+    service = SolverService(
+        args.solvers or sorted(batch.SOLVERS), args.workers, args.queue, args.timeout, args.memory_mb
+    )
+    SolverRequestHandler.service = service
+    server = ThreadingHTTPServer((args.host, args.port), SolverRequestHandler)
+    print(f"Serving {', '.join(service.pools)} on http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+% Shared by the test files: the example KBs, seeded random 3-SAT
+% instances, and a check that a model satisfies a clause list.
+
+:- dynamic tests_directory/1.
+
+:- prolog_load_context(directory, Dir), assertz(tests_directory(Dir)).
+
+example_kb(Path) :-
+    tests_directory(Dir),
+    atom_concat(Dir, '/../sat/kbs/*.pl', Pattern),
+    expand_file_name(Pattern, Paths),
+    member(Path, Paths).
+
+% Each clause has three distinct atoms x1..xN with random signs.
+random_3sat(Seed, NVars, NClauses, Clauses) :-
+    set_random(seed(Seed)),
+    length(Clauses, NClauses),
+    maplist(random_3sat_clause(NVars), Clauses).
+
+random_3sat_clause(NVars, Clause) :-
+    numlist(1, NVars, Vars),
+    random_permutation(Vars, [A, B, C|_]),
+    maplist(random_3sat_literal, [A, B, C], Clause).
+
+random_3sat_literal(Var, Lit) :-
+    atom_concat(x, Var, Atom),
+    (maybe -> Lit = Atom ; Lit = neg(Atom)).
+
+model_satisfies(Model, Clauses) :-
+    forall(member(Clause, Clauses), (member(Lit, Clause), model_true(Model, Lit))),
+    !.
+
+model_true(Model, neg(Atom)) :-
+    !,
+    memberchk(Atom/false, Model).
+model_true(Model, Atom) :-
+    memberchk(Atom/true, Model).
+
+verdict(yes(_), sat).
+verdict(no, unsat).
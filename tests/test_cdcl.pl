@@ -0,0 +1,67 @@
+% CDCL against the list-based DP strategies: same SAT/UNSAT verdict on
+% every example KB and on seeded random 3-SAT near the phase transition,
+% and every model satisfies the clauses it was found for.
+%
+%     swipl -g run_tests -t halt tests/test_cdcl.pl
+
+:- ensure_loaded('../sat/dp_sat').
+:- ensure_loaded(sat_instances).
+:- use_module(library(plunit)).
+
+:- begin_tests(cdcl_vs_dp).
+
+agrees_with_cdcl(Clauses) :-
+    once(davis_putnam(Clauses, cdcl, Expected, _)),
+    verdict(Expected, Verdict),
+    forall(
+        dp_strategy(Strategy),
+        (
+            once(davis_putnam(Clauses, Strategy, Result, _)),
+            verdict(Result, Verdict),
+            (Result = yes(Model) -> model_satisfies(Model, Clauses) ; true)
+        )
+    ).
+
+test(example_kbs, [forall(example_kb(Path))]) :-
+    read_kb_from_file(Path, Clauses),
+    agrees_with_cdcl(Clauses).
+
+test(random_3sat, [forall(between(1, 40, Seed))]) :-
+    NClauses is 40 + Seed,
+    random_3sat(Seed, 12, NClauses, Clauses),
+    agrees_with_cdcl(Clauses).
+
+test(both_verdicts_covered) :-
+    findall(
+        Verdict,
+        (
+            between(1, 40, Seed),
+            NClauses is 40 + Seed,
+            random_3sat(Seed, 12, NClauses, Clauses),
+            davis_putnam(Clauses, cdcl, Result, _),
+            verdict(Result, Verdict)
+        ),
+        Verdicts
+    ),
+    memberchk(sat, Verdicts),
+    memberchk(unsat, Verdicts).
+
+% With the threshold at one clause every list strategy runs on the trail
+% engine, with its own heuristic.
+test(
+    large_instance,
+    [
+        forall((between(1, 20, Seed), member(Strategy, [select_atom_most_balanced, select_atom_shortest_clause]))),
+        setup((current_prolog_flag(dp_large_instance_threshold, Old), set_large_instance_threshold(1))),
+        cleanup(set_large_instance_threshold(Old))
+    ]
+) :-
+    NClauses is 40 + 2 * Seed,
+    random_3sat(Seed, 12, NClauses, Clauses),
+    once(davis_putnam(Clauses, cdcl, Expected, _)),
+    verdict(Expected, Verdict),
+    once(davis_putnam(Clauses, Strategy, Result, _)),
+    verdict(Result, Verdict),
+    (Result = yes(Model) -> model_satisfies(Model, Clauses) ; true).
+
+:- end_tests(cdcl_vs_dp).
@@ -0,0 +1,67 @@
+% Each preprocessing pass on its own: it keeps the SAT/UNSAT verdict, a
+% model of its output extends to a model of the original CNF, and its
+% report line accounts for the literal counts without negative numbers.
+%
+%     swipl -g run_tests -t halt tests/test_preprocess.pl
+
+:- ensure_loaded('../sat/dp_sat').
+:- ensure_loaded(sat_instances).
+:- use_module(library(plunit)).
+
+:- begin_tests(preprocess).
+
+instance(kb(Path), Clauses) :-
+    example_kb(Path),
+    read_kb_from_file(Path, Clauses).
+instance(random(Seed), Clauses) :-
+    between(1, 30, Seed),
+    NClauses is 20 + 2 * Seed,
+    random_3sat(Seed, 12, NClauses, Clauses).
+
+pass_case(Pass, Name, Clauses) :-
+    preprocess_passes(Passes),
+    member(Pass, Passes),
+    instance(Name, Clauses).
+
+clause_atoms(Clauses, Atoms) :-
+    findall(Atom, (member(Clause, Clauses), member(Lit, Clause), pre_atom(Lit, Atom)), Found),
+    sort(Found, Atoms).
+
+test(model_extends, [forall(pass_case(Pass, _, Clauses))]) :-
+    pre_run_passes([Pass], Clauses, [], Simplified, Eliminated, _),
+    once(davis_putnam(Clauses, cdcl, Expected, _)),
+    once(davis_putnam(Simplified, cdcl, Result, _)),
+    verdict(Expected, Verdict),
+    verdict(Result, Verdict),
+    (
+        Result = yes(Model0) ->
+        clause_atoms(Clauses, Atoms),
+        preprocess_extend_model(Eliminated, Atoms, Model0, Model),
+        model_satisfies(Model, Clauses) ;
+        true
+    ).
+
+test(all_passes, [forall(instance(_, Clauses))]) :-
+    preprocess(Clauses, Simplified, Eliminated, _),
+    once(davis_putnam(Clauses, cdcl, Expected, _)),
+    once(davis_putnam(Simplified, cdcl, Result, _)),
+    verdict(Expected, Verdict),
+    verdict(Result, Verdict),
+    (
+        Result = yes(Model0) ->
+        clause_atoms(Clauses, Atoms),
+        preprocess_extend_model(Eliminated, Atoms, Model0, Model),
+        model_satisfies(Model, Clauses) ;
+        true
+    ).
+
+test(literal_counts, [forall(pass_case(Pass, _, Clauses))]) :-
+    pre_run_passes([Pass], Clauses, [], Simplified, _, [pass(Pass, Removed, RemovedLits, AddedLits)]),
+    pre_size(Clauses, Count0, Lits0),
+    pre_size(Simplified, Count1, Lits1),
+    Removed =:= Count0 - Count1,
+    RemovedLits >= 0,
+    AddedLits >= 0,
+    RemovedLits - AddedLits =:= Lits0 - Lits1.
+
+:- end_tests(preprocess).
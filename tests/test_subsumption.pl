@@ -0,0 +1,92 @@
+% subsumes/2 and the forward and backward deletion built on the
+% feature-vector index of the resolution engine.
+%
+%     swipl -g run_tests -t halt tests/test_subsumption.pl
+
+:- ensure_loaded('../resolution/resolution').
+:- use_module(library(plunit)).
+
+:- begin_tests(subsumes).
+
+test(instance) :-
+    subsumes([p(X)], [p(a), q(b)]),
+    var(X).
+
+test(shared_variable) :-
+    subsumes([p(X), q(X)], [p(a), q(a), r]).
+
+test(shared_variable_mismatch, [fail]) :-
+    subsumes([p(X), q(X)], [p(a), q(b)]).
+
+test(specific_variables_are_constants, [fail]) :-
+    subsumes([p(a)], [p(_)]).
+
+test(specific_repeated_variable) :-
+    subsumes([p(_, _)], [p(Z, Z)]).
+
+test(general_repeated_variable, [fail]) :-
+    subsumes([p(X, X)], [p(_, _)]).
+
+test(longer_general_clause, [fail]) :-
+    subsumes([p(_), p(_)], [p(a)]).
+
+test(two_literals_onto_two) :-
+    subsumes([p(_), p(_)], [p(a), p(b)]).
+
+test(leaves_clauses_unbound) :-
+    General = [p(X), q(Y)],
+    Specific = [p(a), q(Z), r],
+    subsumes(General, Specific),
+    var(X),
+    var(Y),
+    var(Z).
+
+:- end_tests(subsumes).
+
+:- begin_tests(subsumption_index).
+
+index_of(Clauses, Index) :-
+    empty_feature_index(Index0),
+    foldl(index_add, Clauses, 1-Index0, _-Index).
+
+index_add(Clause, Id-Index0, Next-Index) :-
+    feature_index_add(Id, Clause, Index0, Index),
+    Next is Id + 1.
+
+test(forward_by_instance) :-
+    index_of([[q(c)], [p(X)]], Index),
+    forward_subsumed([p(a), q(b)], Index),
+    var(X).
+
+test(forward_by_variant) :-
+    index_of([[p(X), neg(q(X))]], Index),
+    forward_subsumed([p(Y), neg(q(Y))], Index).
+
+test(forward_polarity, [fail]) :-
+    index_of([[p(_)]], Index),
+    forward_subsumed([neg(p(a)), q(b)], Index).
+
+test(forward_longer_clause, [fail]) :-
+    index_of([[p(X), p(Y)]], Index),
+    forward_subsumed([p(a)], Index),
+    var(X),
+    var(Y).
+
+test(backward, Subsumed == [1, 3]) :-
+    index_of([[p(a), q(b)], [q(c)], [p(b)], [neg(p(a))]], Index),
+    backward_subsumed([p(_)], Index, Subsumed).
+
+test(backward_shared_variable, Subsumed == [2]) :-
+    index_of([[p(a), q(b)], [p(a), q(a), r]], Index),
+    backward_subsumed([p(X), q(X)], Index, Subsumed).
+
+test(backward_missing_feature, Subsumed == []) :-
+    index_of([[p(a)], [p(b), r]], Index),
+    backward_subsumed([p(_), q(_)], Index, Subsumed).
+
+test(backward_after_removal, Subsumed == [3]) :-
+    index_of([[p(a)], [q(b)], [p(c), q(d)]], Index0),
+    feature_index_remove(1, Index0, Index),
+    backward_subsumed([p(_)], Index, Subsumed).
+
+:- end_tests(subsumption_index).